@@ -0,0 +1,55 @@
+"""add materialized rank sort columns to users
+
+Revision ID: 0027_users_rank_sort_columns
+Revises: 0026_add_donation_links_title_zh
+Create Date: 2026-03-12 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0027_users_rank_sort_columns"
+down_revision = "0026_add_donation_links_title_zh"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("rank_tier", sa.Integer(), nullable=False, server_default="5"))
+    op.add_column("users", sa.Column("rank_division", sa.Integer(), nullable=False, server_default="999999"))
+    # Повторяем app/services/rank.py::rank_sort_key для уже зарегистрированных участников.
+    op.execute(
+        """
+        UPDATE users
+        SET rank_tier = CASE
+                WHEN highest_rank LIKE 'Queen%' THEN 0
+                WHEN highest_rank LIKE 'King%' THEN 1
+                WHEN highest_rank LIKE 'Rook%' THEN 2
+                WHEN highest_rank LIKE 'Bishop%' THEN 3
+                WHEN highest_rank LIKE 'Knight%' OR highest_rank LIKE 'Pawn%' THEN 4
+                ELSE 5
+            END,
+            rank_division = CASE
+                WHEN highest_rank ~ '^Queen#[0-9]{1,9}$' THEN CAST(substring(highest_rank FROM 7) AS INTEGER)
+                WHEN highest_rank LIKE 'Queen#%' THEN 999999
+                WHEN highest_rank = 'Queen' THEN 999999
+                WHEN highest_rank ~ '^(King|Rook|Bishop|Knight|Pawn)-[0-9]{1,9}$'
+                    THEN CAST(substring(highest_rank FROM '-([0-9]+)$') AS INTEGER)
+                WHEN highest_rank ~ '^(King|Rook|Bishop|Knight|Pawn)' THEN 0
+                ELSE 999999
+            END
+        """
+    )
+    op.create_index(
+        "ix_users_rank_sort",
+        "users",
+        ["rank_tier", "rank_division", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_rank_sort", table_name="users")
+    op.drop_column("users", "rank_division")
+    op.drop_column("users", "rank_tier")
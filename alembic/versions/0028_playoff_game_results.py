@@ -0,0 +1,39 @@
+"""add per-game playoff results log
+
+Revision ID: 0028_playoff_game_results
+Revises: 0027_users_rank_sort_columns
+Create Date: 2026-03-13 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0028_playoff_game_results"
+down_revision = "0027_users_rank_sort_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "playoff_game_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("stage_id", sa.Integer(), sa.ForeignKey("playoff_stages.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("group_number", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("game_number", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("place", sa.Integer(), nullable=False),
+        sa.Column("points_awarded", sa.Integer(), nullable=False),
+        sa.Column("previous_last_place", sa.Integer(), nullable=False, server_default="8"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.UniqueConstraint("stage_id", "group_number", "game_number", "place", name="uq_playoff_game_place"),
+    )
+    op.create_index("ix_playoff_game_results_stage_id", "playoff_game_results", ["stage_id"])
+    op.create_index("ix_playoff_game_results_user_id", "playoff_game_results", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playoff_game_results_user_id", table_name="playoff_game_results")
+    op.drop_index("ix_playoff_game_results_stage_id", table_name="playoff_game_results")
+    op.drop_table("playoff_game_results")
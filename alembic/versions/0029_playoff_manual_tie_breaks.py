@@ -0,0 +1,37 @@
+"""add manual tie-breaks for playoff groups
+
+Revision ID: 0029_playoff_manual_tie_breaks
+Revises: 0028_playoff_game_results
+Create Date: 2026-03-14 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0029_playoff_manual_tie_breaks"
+down_revision = "0028_playoff_game_results"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "playoff_manual_tie_breaks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("stage_id", sa.Integer(), sa.ForeignKey("playoff_stages.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("group_number", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.UniqueConstraint("stage_id", "group_number", "user_id", name="uq_playoff_manual_tie_break_user"),
+        sa.UniqueConstraint("stage_id", "group_number", "priority", name="uq_playoff_manual_tie_break_priority"),
+    )
+    op.create_index("ix_playoff_manual_tie_breaks_stage_id", "playoff_manual_tie_breaks", ["stage_id"])
+    op.create_index("ix_playoff_manual_tie_breaks_user_id", "playoff_manual_tie_breaks", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playoff_manual_tie_breaks_user_id", table_name="playoff_manual_tie_breaks")
+    op.drop_index("ix_playoff_manual_tie_breaks_stage_id", table_name="playoff_manual_tie_breaks")
+    op.drop_table("playoff_manual_tie_breaks")
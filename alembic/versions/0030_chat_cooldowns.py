@@ -0,0 +1,30 @@
+"""add chat cooldown windows for the shared chat rate limiter
+
+Revision ID: 0030_chat_cooldowns
+Revises: 0029_playoff_manual_tie_breaks
+Create Date: 2026-03-15 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0030_chat_cooldowns"
+down_revision = "0029_playoff_manual_tie_breaks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_cooldowns",
+        sa.Column("key", sa.String(length=200), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.create_index("ix_chat_cooldowns_expires_at", "chat_cooldowns", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_cooldowns_expires_at", table_name="chat_cooldowns")
+    op.drop_table("chat_cooldowns")
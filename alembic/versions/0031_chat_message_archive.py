@@ -0,0 +1,39 @@
+"""add chat retention settings and the chat message archive
+
+Revision ID: 0031_chat_message_archive
+Revises: 0030_chat_cooldowns
+Create Date: 2026-03-16 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0031_chat_message_archive"
+down_revision = "0030_chat_cooldowns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_settings", sa.Column("retention_days", sa.Integer(), nullable=False, server_default="30"))
+    op.add_column("chat_settings", sa.Column("archive_batch_size", sa.Integer(), nullable=False, server_default="500"))
+    op.create_table(
+        "chat_message_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("temp_nick", sa.String(length=120), nullable=False),
+        sa.Column("nick_color", sa.String(length=7), nullable=False, server_default="#00d4ff"),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("ip_address", sa.String(length=64), nullable=False),
+        sa.Column("sender_token", sa.String(length=160), nullable=False, server_default=""),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.create_index("ix_chat_message_archive_created_at", "chat_message_archive", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_archive_created_at", table_name="chat_message_archive")
+    op.drop_table("chat_message_archive")
+    op.drop_column("chat_settings", "archive_batch_size")
+    op.drop_column("chat_settings", "retention_days")
@@ -0,0 +1,60 @@
+"""add basket counters maintained by a trigger on users
+
+Revision ID: 0032_basket_counters
+Revises: 0031_chat_message_archive
+Create Date: 2026-03-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0032_basket_counters"
+down_revision = "0031_chat_message_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "basket_counters",
+        sa.Column("basket", sa.String(length=50), primary_key=True),
+        sa.Column("members", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        INSERT INTO basket_counters (basket, members)
+        SELECT basket, count(id) FROM users WHERE basket IS NOT NULL GROUP BY basket
+        """
+    )
+    # Счётчик меняется в транзакции, которая меняет users: регистрация, смена корзины, удаление, сброс.
+    op.execute(
+        """
+        CREATE FUNCTION users_basket_counters() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.basket IS NOT NULL THEN
+                UPDATE basket_counters SET members = members - 1 WHERE basket = OLD.basket;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.basket IS NOT NULL THEN
+                INSERT INTO basket_counters (basket, members) VALUES (NEW.basket, 1)
+                ON CONFLICT (basket) DO UPDATE SET members = basket_counters.members + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_basket_counters
+        AFTER INSERT OR DELETE OR UPDATE OF basket ON users
+        FOR EACH ROW
+        EXECUTE FUNCTION users_basket_counters()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_basket_counters ON users")
+    op.execute("DROP FUNCTION IF EXISTS users_basket_counters()")
+    op.drop_table("basket_counters")
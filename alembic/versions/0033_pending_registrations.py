@@ -0,0 +1,42 @@
+"""add pending registrations enriched in the background
+
+Revision ID: 0033_pending_registrations
+Revises: 0032_basket_counters
+Create Date: 2026-03-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0033_pending_registrations"
+down_revision = "0032_basket_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pending_registrations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("token", sa.String(length=32), nullable=False),
+        sa.Column("steam_input", sa.String(length=255), nullable=False),
+        sa.Column("steam_id", sa.String(length=32), nullable=True),
+        sa.Column("nickname", sa.String(length=120), nullable=False),
+        sa.Column("telegram", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column("error", sa.String(length=64), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("token", name="uq_pending_registrations_token"),
+    )
+    op.create_index("ix_pending_registrations_steam_id", "pending_registrations", ["steam_id"])
+    op.create_index("ix_pending_registrations_status", "pending_registrations", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pending_registrations_status", table_name="pending_registrations")
+    op.drop_index("ix_pending_registrations_steam_id", table_name="pending_registrations")
+    op.drop_table("pending_registrations")
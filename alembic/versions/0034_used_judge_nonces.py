@@ -0,0 +1,29 @@
+"""add used judge login nonces shared between workers
+
+Revision ID: 0034_used_judge_nonces
+Revises: 0033_pending_registrations
+Create Date: 2026-03-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0034_used_judge_nonces"
+down_revision = "0033_pending_registrations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "used_judge_nonces",
+        sa.Column("nonce", sa.String(length=64), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_used_judge_nonces_expires_at", "used_judge_nonces", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_used_judge_nonces_expires_at", table_name="used_judge_nonces")
+    op.drop_table("used_judge_nonces")
@@ -0,0 +1,34 @@
+"""add manual playoff point adjustments replayed by standings diagnostics
+
+Revision ID: 0035_playoff_point_adjustments
+Revises: 0034_used_judge_nonces
+Create Date: 2026-03-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0035_playoff_point_adjustments"
+down_revision = "0034_used_judge_nonces"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "playoff_point_adjustments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("stage_id", sa.Integer(), sa.ForeignKey("playoff_stages.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("points_delta", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.create_index("ix_playoff_point_adjustments_stage_id", "playoff_point_adjustments", ["stage_id"])
+    op.create_index("ix_playoff_point_adjustments_user_id", "playoff_point_adjustments", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playoff_point_adjustments_user_id", table_name="playoff_point_adjustments")
+    op.drop_index("ix_playoff_point_adjustments_stage_id", table_name="playoff_point_adjustments")
+    op.drop_table("playoff_point_adjustments")
@@ -1,16 +1,24 @@
 """Определяет управление сессией администратора для веб-интерфейса."""
 
 import base64
+from collections import OrderedDict
 import hashlib
 import hmac
 import json
 import time
 import uuid
 
+from starlette.requests import Request
+
 from app.core.config import settings
 
 ADMIN_SESSION_COOKIE = "admin_session"
-_USED_JUDGE_LOGIN_NONCES: set[str] = set()
+# Совпадает с max_age cookie: подписанная сессия сама по себе старше не живёт.
+ADMIN_SESSION_TTL_SECONDS = 60 * 60 * 12
+# Сколько недавно проверенных сессий помнит процесс: повторная проверка — поиск по подписи без HMAC и JSON.
+ADMIN_SESSION_CACHE_SIZE = 256
+
+_verified_admin_sessions: OrderedDict[str, tuple[str, dict]] = OrderedDict()
 
 
 def _b64_encode(value: str) -> str:
@@ -28,8 +36,10 @@ def _sign(payload: str) -> str:
     return base64.urlsafe_b64encode(digest).decode("utf-8").rstrip("=")
 
 
-def create_admin_session_cookie() -> str:
-    payload = _b64_encode(json.dumps({"is_admin": True}, separators=(",", ":")))
+def create_admin_session_cookie(ttl_seconds: int = ADMIN_SESSION_TTL_SECONDS) -> str:
+    payload = _b64_encode(
+        json.dumps({"is_admin": True, "expires_at": int(time.time()) + ttl_seconds}, separators=(",", ":"))
+    )
     signature = _sign(payload)
     return f"{payload}.{signature}"
 
@@ -49,47 +59,86 @@ def create_judge_login_token(ttl_seconds: int = 60 * 10) -> str:
     return f"{payload}.{_sign(payload)}"
 
 
-def consume_judge_login_token(token: str | None) -> bool:
+def read_judge_login_token(token: str | None) -> tuple[str, int] | None:
+    """Проверяет подпись и срок judge-токена и возвращает ``(nonce, expires_at)``.
+
+    Одноразовость здесь не проверяется: использованные nonce хранит app/services/judge_nonces.py.
+    """
     if not token or "." not in token:
-        return False
+        return None
 
     payload, signature = token.rsplit(".", 1)
     expected_signature = _sign(payload)
     if not hmac.compare_digest(signature, expected_signature):
-        return False
+        return None
 
     try:
         data = json.loads(_b64_decode(payload))
     except (ValueError, json.JSONDecodeError):
-        return False
+        return None
 
     if data.get("purpose") != "judge_login":
-        return False
+        return None
 
     expires_at = data.get("expires_at")
     nonce = data.get("nonce")
     if not isinstance(expires_at, int) or not isinstance(nonce, str):
-        return False
+        return None
     if int(time.time()) > expires_at:
-        return False
-    if nonce in _USED_JUDGE_LOGIN_NONCES:
-        return False
-
-    _USED_JUDGE_LOGIN_NONCES.add(nonce)
-    return True
+        return None
+    return nonce, expires_at
 
 
-def is_admin_session(cookie_value: str | None) -> bool:
-    if not cookie_value or "." not in cookie_value:
-        return False
-
-    payload, signature = cookie_value.rsplit(".", 1)
+def _verify_admin_session(payload: str, signature: str) -> dict | None:
     expected_signature = _sign(payload)
     if not hmac.compare_digest(signature, expected_signature):
-        return False
+        return None
 
     try:
         data = json.loads(_b64_decode(payload))
     except (ValueError, json.JSONDecodeError):
-        return False
-    return bool(data.get("is_admin"))
+        return None
+    if not isinstance(data, dict) or not data.get("is_admin") or not isinstance(data.get("expires_at"), int):
+        return None
+    return data
+
+
+def read_admin_session(cookie_value: str | None) -> dict | None:
+    """Расшифрованная сессия администратора или None; проверенные сессии кэшируются по подписи (LRU)."""
+    if not cookie_value or "." not in cookie_value:
+        return None
+
+    payload, signature = cookie_value.rsplit(".", 1)
+    cached = _verified_admin_sessions.get(signature)
+    if cached and cached[0] == payload:
+        _verified_admin_sessions.move_to_end(signature)
+        data = cached[1]
+    else:
+        data = _verify_admin_session(payload, signature)
+        if data is None:
+            return None
+        _verified_admin_sessions[signature] = (payload, data)
+        if len(_verified_admin_sessions) > ADMIN_SESSION_CACHE_SIZE:
+            _verified_admin_sessions.popitem(last=False)
+
+    if time.time() > data["expires_at"]:
+        _verified_admin_sessions.pop(signature, None)
+        return None
+    return data
+
+
+def is_admin_session(cookie_value: str | None) -> bool:
+    return read_admin_session(cookie_value) is not None
+
+
+def request_is_admin(request: Request) -> bool:
+    """Результат проверки сессии, сделанной middleware для этого запроса; без middleware — проверяет сам."""
+    is_admin = getattr(request.state, "is_admin", None)
+    if is_admin is None:
+        is_admin = is_admin_session(request.cookies.get(ADMIN_SESSION_COOKIE))
+        request.state.is_admin = is_admin
+    return is_admin
+
+
+def clear_admin_session_cache() -> None:
+    _verified_admin_sessions.clear()
@@ -20,6 +20,17 @@ class Settings(BaseSettings):
     steam_api_key: str = ""
     secret_key: str = "change_me"
     tiny_mce_api_key: str = "no-api-key"
+    # memory — счётчики частоты чата в процессе; postgres — общая таблица для нескольких воркеров.
+    chat_rate_limit_backend: str = "memory"
+    # memory — использованные judge-nonce в процессе; postgres — общая таблица для нескольких воркеров.
+    judge_nonce_backend: str = "memory"
+    # Лимиты SSE-подключений чата на один воркер.
+    sse_max_connections: int = 5000
+    sse_max_connections_per_ip: int = 20
+    sse_queue_size: int = 16
+    sse_heartbeat_seconds: float = 25.0
+    # Сколько заявок на регистрацию одновременно обращаются к Steam/AutoChess API в одном воркере.
+    registration_enrichment_concurrency: int = 4
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -6,15 +6,16 @@ from fastapi.staticfiles import StaticFiles
 
 from app.core.admin_session import (
     ADMIN_SESSION_COOKIE,
-    consume_judge_login_token,
+    ADMIN_SESSION_TTL_SECONDS,
     create_admin_session_cookie,
-    is_admin_session,
+    request_is_admin,
 )
 from sqlalchemy import select
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.settings import SiteSetting
 from app.routers.web import router as web_router
+from app.services.judge_nonces import consume_judge_login_token
 
 app = FastAPI(title=settings.app_name)
 
@@ -28,7 +29,7 @@ async def consume_persisted_judge_token(token: str | None) -> bool:
         if not row or row.value != token:
             return False
 
-        if not consume_judge_login_token(token):
+        if not await consume_judge_login_token(session, token):
             return False
 
         row.value = ""
@@ -52,7 +53,7 @@ async def admin_auth_middleware(request: Request, call_next):
             if await is_technical_works_enabled():
                 return RedirectResponse(url="/technical-works", status_code=303)
 
-    if normalized_path == "/admin" and not is_admin_session(request.cookies.get(ADMIN_SESSION_COOKIE)):
+    if normalized_path == "/admin" and not request_is_admin(request):
         admin_key = request.query_params.get("admin_key")
         judge_token = request.query_params.get("judge_token")
 
@@ -64,7 +65,7 @@ async def admin_auth_middleware(request: Request, call_next):
                 create_admin_session_cookie(),
                 httponly=True,
                 samesite="lax",
-                max_age=60 * 60 * 12,
+                max_age=ADMIN_SESSION_TTL_SECONDS,
             )
             return response
 
@@ -73,7 +74,7 @@ async def admin_auth_middleware(request: Request, call_next):
         return HTMLResponse("Forbidden", status_code=403)
 
     if normalized_path.startswith("/admin") and normalized_path not in {"/admin/login", "/admin/logout"}:
-        if not is_admin_session(request.cookies.get(ADMIN_SESSION_COOKIE)):
+        if not request_is_admin(request):
             if request.method == "GET":
                 return RedirectResponse(url="/admin/login", status_code=303)
             return HTMLResponse("Forbidden", status_code=403)
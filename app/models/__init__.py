@@ -1,6 +1,6 @@
 """Собирает ORM-модели приложения в одном пространстве импорта."""
 
-from app.models.chat import ChatMessage
+from app.models.chat import ChatCooldown, ChatMessage, ChatMessageArchive
 from app.models.settings import (
     ArchiveEntry,
     ChatSetting,
@@ -12,15 +12,19 @@ from app.models.settings import (
     RulesContent,
     SiteSetting,
     TournamentStage,
+    UsedJudgeNonce,
 )
 from app.models.tournament_archive import TournamentArchive
 from app.models.tournament import EmergencyOperationLog, GroupGameResult, GroupManualTieBreak, GroupMember, TournamentGroup
-from app.models.user import User
+from app.models.user import BasketCounter, PendingRegistration, User
 
 __all__ = [
     "User",
+    "BasketCounter",
+    "PendingRegistration",
     "TournamentStage",
     "SiteSetting",
+    "UsedJudgeNonce",
     "DonationLink",
     "DonationMethod",
     "CryptoWallet",
@@ -30,6 +34,8 @@ __all__ = [
     "ArchiveEntry",
     "ChatSetting",
     "ChatMessage",
+    "ChatCooldown",
+    "ChatMessageArchive",
     "TournamentGroup",
     "GroupMember",
     "GroupGameResult",
@@ -18,3 +18,28 @@ class ChatMessage(Base):
     ip_address: Mapped[str] = mapped_column(String(64), nullable=False)
     sender_token: Mapped[str] = mapped_column(String(160), default="")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ChatMessageArchive(Base):
+    """Сообщения старше окна хранения: переносятся из chat_messages пачками с тем же id."""
+
+    __tablename__ = "chat_message_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    temp_nick: Mapped[str] = mapped_column(String(120), nullable=False)
+    nick_color: Mapped[str] = mapped_column(String(7), default="#00d4ff")
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    ip_address: Mapped[str] = mapped_column(String(64), nullable=False)
+    sender_token: Mapped[str] = mapped_column(String(160), default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ChatCooldown(Base):
+    """Окно частоты сообщений для общего (Postgres) ограничителя чата: ключ — токен отправителя или IP."""
+
+    __tablename__ = "chat_cooldowns"
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
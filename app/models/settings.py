@@ -27,6 +27,15 @@ class SiteSetting(Base):
     value: Mapped[str] = mapped_column(Text, default="")
 
 
+class UsedJudgeNonce(Base):
+    """Использованный nonce judge-токена; строка живёт до истечения токена, общая для всех воркеров."""
+
+    __tablename__ = "used_judge_nonces"
+
+    nonce: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
 class DonationLink(Base):
     __tablename__ = "donation_links"
 
@@ -116,3 +125,6 @@ class ChatSetting(Base):
     cooldown_seconds: Mapped[int] = mapped_column(Integer, default=10)
     max_length: Mapped[int] = mapped_column(Integer, default=1000)
     is_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Сообщения старше retention_days уходят в архив пачками по archive_batch_size; 0 — хранить всё.
+    retention_days: Mapped[int] = mapped_column(Integer, default=30)
+    archive_batch_size: Mapped[int] = mapped_column(Integer, default=500)
@@ -138,6 +138,51 @@ class PlayoffMatch(Base):
     stage: Mapped[PlayoffStage] = relationship("PlayoffStage", back_populates="matches")
 
 
+class PlayoffGameResult(Base):
+    __tablename__ = "playoff_game_results"
+    __table_args__ = (
+        UniqueConstraint("stage_id", "group_number", "game_number", "place", name="uq_playoff_game_place"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    stage_id: Mapped[int] = mapped_column(ForeignKey("playoff_stages.id", ondelete="CASCADE"), index=True)
+    group_number: Mapped[int] = mapped_column(Integer, default=1)
+    game_number: Mapped[int] = mapped_column(Integer)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    place: Mapped[int] = mapped_column(Integer)
+    points_awarded: Mapped[int] = mapped_column(Integer)
+    # last_place участника до этой игры: без него отмену нельзя сделать без пересчёта всей истории.
+    previous_last_place: Mapped[int] = mapped_column(Integer, default=8)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class PlayoffPointAdjustment(Base):
+    """Ручная правка очков участника этапа вне журнала игр; сверка агрегатов прибавляет её к воспроизведению."""
+
+    __tablename__ = "playoff_point_adjustments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    stage_id: Mapped[int] = mapped_column(ForeignKey("playoff_stages.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    points_delta: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class PlayoffManualTieBreak(Base):
+    __tablename__ = "playoff_manual_tie_breaks"
+    __table_args__ = (
+        UniqueConstraint("stage_id", "group_number", "user_id", name="uq_playoff_manual_tie_break_user"),
+        UniqueConstraint("stage_id", "group_number", "priority", name="uq_playoff_manual_tie_break_priority"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    stage_id: Mapped[int] = mapped_column(ForeignKey("playoff_stages.id", ondelete="CASCADE"), index=True)
+    group_number: Mapped[int] = mapped_column(Integer, default=1)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    priority: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class EmergencyOperationLog(Base):
     __tablename__ = "emergency_operation_logs"
 
@@ -3,7 +3,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -26,6 +26,7 @@ class Basket(str, Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_rank_sort", "rank_tier", "rank_division", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     nickname: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -34,11 +35,46 @@ class User(Base):
     game_nickname: Mapped[str] = mapped_column(String(255), nullable=False)
     current_rank: Mapped[str] = mapped_column(String(120), nullable=False)
     highest_rank: Mapped[str] = mapped_column(String(120), nullable=False)
+    # Материализованный ключ сортировки по highest_rank, см. app/services/rank.py::rank_sort_key.
+    rank_tier: Mapped[int] = mapped_column(Integer, nullable=False, default=5, server_default="5")
+    rank_division: Mapped[int] = mapped_column(Integer, nullable=False, default=999999, server_default="999999")
     telegram: Mapped[str | None] = mapped_column(String(255), nullable=True)
     # Legacy field: kept in schema for backward compatibility, no longer populated in public registration.
     discord: Mapped[str | None] = mapped_column(String(255), nullable=True)
     basket: Mapped[str] = mapped_column(String(50), default=Basket.LOW_RANK.value, index=True)
     direct_invite_stage: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True)
     direct_invite_group_number: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
-    extra_data: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Сырой профиль AutoChess нигде не рендерится: грузим его только при явном обращении к атрибуту.
+    extra_data: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class BasketCounter(Base):
+    """Число участников в корзине; поддерживается триггером на users (миграция 0032) в той же транзакции."""
+
+    __tablename__ = "basket_counters"
+
+    basket: Mapped[str] = mapped_column(String(50), primary_key=True)
+    members: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class PendingRegistration(Base):
+    """Принятая заявка на регистрацию: профиль AutoChess подтягивается в фоне, затем создаётся User."""
+
+    __tablename__ = "pending_registrations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Ключ для опроса статуса из браузера заявителя.
+    token: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
+    steam_input: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Заполняется сразу, если Steam64 выводится из ввода без запросов к Steam, иначе — фоновой обработкой.
+    steam_id: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    nickname: Mapped[str] = mapped_column(String(120), nullable=False)
+    telegram: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # pending — ждёт обработки, done — участник создан, failed — см. error (ключ i18n).
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", index=True)
+    error: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,6 +1,7 @@
 """Содержит веб-маршруты для страниц турнира, админки и пользовательских действий."""
 
 import asyncio
+import base64
 import ipaddress
 import json
 import logging
@@ -15,21 +16,23 @@ from decimal import Decimal, InvalidOperation
 
 from fastapi import APIRouter, Depends, Form, Query, Request
 from pydantic import BaseModel
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import Integer, case, delete, desc, func, or_, select, update
+from starlette.background import BackgroundTask
+from sqlalchemy import case, delete, desc, func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.admin_session import (
     ADMIN_SESSION_COOKIE,
+    ADMIN_SESSION_TTL_SECONDS,
     create_admin_session_cookie,
     create_judge_login_token,
-    is_admin_session,
+    request_is_admin,
 )
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.chat import ChatMessage
+from app.db.session import SessionLocal, get_db
+from app.models.chat import ChatMessage, ChatMessageArchive
 from app.models.settings import (
     ArchiveEntry,
     ChatSetting,
@@ -53,17 +56,59 @@ from app.models.tournament import (
     TournamentGroup,
 )
 from app.models.tournament_archive import TournamentArchive
-from app.models.user import Basket, User
-from app.services.basket_allocator import allocate_basket
+from app.models.user import Basket, PendingRegistration, User
+from app.services.advancement_odds import load_advancement_inputs, simulate_stage_advancement
+from app.services.final_stage_analytics import get_final_stage_analytics
+from app.services.standings_cache import (
+    get_group_stage_standings,
+    get_playoff_group_standings,
+    invalidate_group_stage_standings,
+    invalidate_playoff_standings,
+    invalidate_standings,
+    load_stage_tie_breaks,
+    preload_tie_breaks,
+    rank_playoff_participants,
+    standings_generation,
+)
+from app.services.chat_rate_limit import acquire_chat_send_slot
+from app.services.content_html_cache import sanitized_content_cache
+from app.services.prize_pool_cache import (
+    DONATE_HIGHLIGHT_AMOUNT_SETTING_KEY,
+    get_prize_pool_totals,
+    invalidate_prize_pool_totals,
+)
+from app.services.registration_queue import (
+    REGISTRATION_PENDING,
+    accept_registration,
+    enrich_pending_registration,
+    queue_enrichment,
+    registration_status_message,
+    revive_stale_registration,
+)
+from app.services.sse_hub import (
+    CHAT_CLEARED_EVENT,
+    CHAT_CREATED_EVENT,
+    CHAT_DELETED_EVENT,
+    CHAT_UPDATED_EVENT,
+    SseHub,
+)
+from app.services.chat_retention import (
+    archive_expired_chat_messages,
+    claim_chat_retention_run,
+    load_chat_archive_page,
+    run_chat_retention,
+)
 from app.services.i18n import get_lang, t
-from app.services.rank import pick_basket
+from app.services.rank import RANK_TIER_UNKNOWN, apply_rank_sort_columns
 from app.services.steam import fetch_autochess_data, normalize_steam_id
 from app.services.tournament import (
     apply_game_results,
     apply_playoff_match_results,
+    clear_playoff_stage_log,
     create_auto_draw,
     create_manual_draw,
     create_manual_draw_from_layout,
+    find_playoff_standings_mismatches,
     ManualDrawValidationError,
     generate_playoff_from_groups,
     finalize_limited_playoff_stage_if_ready,
@@ -71,14 +116,16 @@ from app.services.tournament import (
     get_playoff_stages_with_data,
     get_current_tournament_profile_key,
     get_current_tournament_profile_spec,
+    import_playoff_stage_results,
     override_playoff_match_winner,
+    parse_playoff_results_import,
     parse_manual_draw_user_ids,
     move_user_to_stage,
     promote_top_between_stages,
     promote_group_member_to_stage,
+    reassign_playoff_game_results,
+    set_playoff_participant_points,
     replace_stage_player,
-    sort_members_for_table,
-    playoff_sort_key,
     start_playoff_stage,
     adjust_stage_points,
     get_stage_group_number_by_seed,
@@ -89,6 +136,15 @@ from app.services.tournament import (
     simulate_three_random_games_for_stage,
     snapshot_tournament_archive,
     reset_tournament_cycle_after_finish,
+    save_group_manual_tie_break,
+    save_playoff_manual_tie_break,
+    undo_last_playoff_game,
+)
+from app.services.user_directory import (
+    get_user_directory,
+    invalidate_user_directory,
+    refresh_user_directory_entry,
+    remove_user_directory_entry,
 )
 from app.services.tournament_view import (
     _apply_stage_highlight_rules,
@@ -100,6 +156,7 @@ from app.services.tournament_view import (
 from app.services.tournament_stage_config import (
     get_tournament_profile_spec,
     FINAL_STAGE_SCORING_MODES,
+    FINAL_WIN_POINTS,
     GROUP_STAGE_GAME_LIMIT,
     LEGACY_STAGE_KEY_ALIASES,
     TOURNAMENT_PROFILE_SPECS,
@@ -119,7 +176,6 @@ from app.services.tournament_stage_config import (
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
-DONATE_HIGHLIGHT_AMOUNT_SETTING_KEY = "donate_highlight_amount"
 DONATE_SUPPORT_AUTHOR_VISIBLE_SETTING_KEY = "donate_support_author_visible"
 RUB_PER_USD_RATE = Decimal("79")
 MSK_TIMEZONE = timezone(timedelta(hours=3))
@@ -152,6 +208,7 @@ ADMIN_CHAT_SENDERS = {
     "@Loyrensss": "#b084ff",
 }
 ADMIN_CHAT_SENDER_COOKIE = "admin_chat_sender"
+REGISTRATION_TOKEN_COOKIE = "registration_token"
 CHAT_SENDER_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
 SITE_VIEW_COOKIE = "site_view"
 SITE_VIEW_MODES = {"mobile", "full", "auto"}
@@ -263,26 +320,12 @@ def get_request_ip_address(request: Request) -> str:
     return _parse_forwarded_ip_candidate(direct_ip) or direct_ip
 
 
-class ChatEventBroker:
-    """Публикует события чата и позволяет подписчикам ждать появления новых сообщений."""
-
-    def __init__(self) -> None:
-        self._version = 0
-        self._condition = asyncio.Condition()
-
-    async def publish(self) -> None:
-        async with self._condition:
-            self._version += 1
-            self._condition.notify_all()
-
-    async def wait_for_update(self, last_seen_version: int) -> int:
-        async with self._condition:
-            while self._version <= last_seen_version:
-                await self._condition.wait()
-            return self._version
-
-
-chat_event_broker = ChatEventBroker()
+chat_event_broker = SseHub(
+    queue_size=settings.sse_queue_size,
+    max_connections=settings.sse_max_connections,
+    max_connections_per_ip=settings.sse_max_connections_per_ip,
+    heartbeat_seconds=settings.sse_heartbeat_seconds,
+)
 logger = logging.getLogger(__name__)
 
 
@@ -427,15 +470,20 @@ class _ContentHtmlSanitizer(HTMLParser):
         return "".join(self._chunks)
 
 
-def sanitize_content_html(raw_html: str | None) -> str:
-    if not raw_html:
-        return ""
+def _sanitize_content_html_uncached(raw_html: str) -> str:
     sanitizer = _ContentHtmlSanitizer()
     sanitizer.feed(raw_html)
     sanitizer.close()
     return sanitizer.get_html()
 
 
+def sanitize_content_html(raw_html: str | None) -> str:
+    # Разбор HTML — только при первом показе или сохранении текста, дальше ответ берётся из кэша по хешу.
+    if not raw_html:
+        return ""
+    return sanitized_content_cache.get_or_compute(raw_html, _sanitize_content_html_uncached)
+
+
 def _strip_html_tags(raw: str) -> str:
     text = re.sub(r"<[^>]+>", "", raw)
     return unescape(text).strip()
@@ -1098,6 +1146,22 @@ async def _log_emergency_action(
     )
 
 
+async def _load_admin_user_directory(db: AsyncSession) -> tuple[list[User], dict[int, str]]:
+    """Загружает участников для ручной жеребьёвки и словарь id → ник для админских страниц."""
+    manual_draw_users = list(
+        (
+            await db.scalars(
+                select(User)
+                .where(User.basket != Basket.INVITED.value)
+                .order_by(User.nickname.asc(), User.created_at.desc())
+            )
+        ).all()
+    )
+    user_directory = await get_user_directory(db)
+    users_by_id = {user_id: entry.nickname for user_id, entry in user_directory.items()}
+    return manual_draw_users, users_by_id
+
+
 async def _render_admin_emergency_page(
     request: Request,
     db: AsyncSession,
@@ -1113,16 +1177,8 @@ async def _render_admin_emergency_page(
     registration_open = await get_registration_open(db)
     technical_works_enabled = await get_technical_works_enabled(db)
 
-    manual_draw_users = (
-        await db.scalars(
-            select(User)
-            .where(User.basket != Basket.INVITED.value)
-            .order_by(User.nickname.asc(), User.created_at.desc())
-        )
-    ).all()
+    manual_draw_users, users_by_id = await _load_admin_user_directory(db)
     manual_draw_reserve_users = [user for user in manual_draw_users if str(user.basket or "").endswith("_reserve")]
-    user_rows = (await db.execute(select(User.id, User.nickname))).all()
-    users_by_id = {user_id: nickname for user_id, nickname in user_rows}
     playoff_stages = await get_playoff_stages_with_data(db)
     group_stages = list((await db.scalars(select(TournamentGroup).order_by(TournamentGroup.name.asc(), TournamentGroup.id.asc()))).all())
     emergency_stages = playoff_stages if playoff_stages else group_stages
@@ -1140,24 +1196,22 @@ async def _render_admin_emergency_page(
                 }
                 for participant in participants
             ]
-    else:
-        for group in group_stages:
-            members = list(
-                (
-                    await db.scalars(
-                        select(GroupMember)
-                        .where(GroupMember.group_id == group.id)
-                        .order_by(GroupMember.seat.asc(), GroupMember.id.asc())
-                    )
-                ).all()
+    elif group_stages:
+        emergency_stage_members = {group.id: [] for group in group_stages}
+        members = (
+            await db.scalars(
+                select(GroupMember)
+                .where(GroupMember.group_id.in_(list(emergency_stage_members.keys())))
+                .order_by(GroupMember.group_id.asc(), GroupMember.seat.asc(), GroupMember.id.asc())
             )
-            emergency_stage_members[group.id] = [
+        ).all()
+        for member in members:
+            emergency_stage_members[member.group_id].append(
                 {
                     "user_id": member.user_id,
                     "nickname": users_by_id.get(member.user_id, f"#{member.user_id}"),
                 }
-                for member in members
-            ]
+            )
 
     emergency_stages_payload = [
         {
@@ -1291,14 +1345,14 @@ async def get_chat_settings(db: AsyncSession) -> ChatSetting:
     row = await db.scalar(select(ChatSetting).where(ChatSetting.id == 1))
     if row:
         return row
-    return ChatSetting(id=1, cooldown_seconds=10, max_length=1000, is_enabled=True)
+    return ChatSetting(id=1, cooldown_seconds=10, max_length=1000, is_enabled=True, retention_days=30, archive_batch_size=500)
 
 
 async def get_or_create_chat_settings(db: AsyncSession) -> ChatSetting:
     row = await db.scalar(select(ChatSetting).where(ChatSetting.id == 1))
     if row:
         return row
-    row = ChatSetting(id=1, cooldown_seconds=10, max_length=1000, is_enabled=True)
+    row = ChatSetting(id=1, cooldown_seconds=10, max_length=1000, is_enabled=True, retention_days=30, archive_batch_size=500)
     db.add(row)
     await db.flush()
     return row
@@ -1654,11 +1708,7 @@ async def index(request: Request, db: AsyncSession = Depends(get_db)):
     registration_open = await get_registration_open(db)
     tournament_started = await get_tournament_started(db)
     chat_settings = await get_chat_settings(db)
-    donors = (await db.scalars(select(Donor.amount))).all()
-    total_sponsors_amount = parse_donor_amount("0")
-    for donor_amount in donors:
-        total_sponsors_amount += parse_donor_amount(str(donor_amount))
-
+    total_sponsors_amount = (await get_prize_pool_totals(db)).donor_total
     total_sponsors_amount_rub, total_sponsors_amount_usd = to_rub_and_usd_display_amounts(total_sponsors_amount)
     prize_pool_wave_enabled = total_sponsors_amount >= Decimal("1000")
     return templates.TemplateResponse(
@@ -1691,7 +1741,7 @@ async def register(
     rules_ack: str | None = Form(default=None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Регистрирует пользователя, если по steam_id запись в БД отсутствует."""
+    """Принимает заявку на регистрацию; профиль AutoChess и корзина дозаполняются в фоне."""
     if await get_tournament_started(db):
         return redirect_with_msg("/", "registration_closed")
 
@@ -1705,40 +1755,40 @@ async def register(
     if not cleaned_nickname or len(cleaned_nickname) > 120:
         return redirect_with_msg("/", "msg_invalid_request")
 
-    steam_id = await normalize_steam_id(steam_input)
-    if not steam_id:
-        return redirect_with_msg("/", "msg_invalid_steam_id")
-
-    exists = await db.scalar(select(User).where(User.steam_id == steam_id))
-    if exists:
-        return redirect_with_msg("/", "already_registered")
+    accepted = await accept_registration(
+        db, steam_input=steam_input, nickname=cleaned_nickname, telegram=telegram
+    )
+    if isinstance(accepted, str):
+        return redirect_with_msg("/", accepted)
+
+    # Профиль AutoChess и корзина — после ответа; страница опрашивает /register/status по cookie.
+    redirect = redirect_with_msg("/", "msg_registration_pending")
+    redirect.set_cookie(REGISTRATION_TOKEN_COOKIE, accepted.token, max_age=60 * 60 * 24, samesite="lax")
+    # Повторная отправка формы возвращает ту же заявку — вторая задача для неё не нужна.
+    if queue_enrichment(accepted.id):
+        redirect.background = BackgroundTask(enrich_pending_registration, SessionLocal, accepted.id)
+    return redirect
 
-    profile = await fetch_autochess_data(steam_id)
-    target_basket = pick_basket(profile["highest_rank"], profile["current_rank"])
-    basket_counts_rows = (
-        await db.execute(
-            select(User.basket, func.count(User.id))
-            .where(User.basket.isnot(None))
-            .group_by(User.basket)
-        )
-    ).all()
-    basket_counts = {basket_name: basket_count for basket_name, basket_count in basket_counts_rows}
-    basket = allocate_basket(target_basket=target_basket, basket_counts=basket_counts)
 
-    user = User(
-        nickname=cleaned_nickname,
-        steam_input=steam_input,
-        steam_id=steam_id,
-        game_nickname=profile["game_nickname"],
-        current_rank=profile["current_rank"],
-        highest_rank=profile["highest_rank"],
-        telegram=telegram or None,
-        basket=basket,
-        extra_data=json.dumps(profile["raw"], ensure_ascii=False),
-    )
-    db.add(user)
-    await db.commit()
-    return redirect_with_msg("/", "registered_ok")
+@router.get("/register/status")
+async def register_status(request: Request, db: AsyncSession = Depends(get_db)):
+    """Статус заявки на регистрацию по cookie; итоговый статус снимает cookie."""
+    lang = get_lang(request.cookies.get("lang"))
+    token = request.cookies.get(REGISTRATION_TOKEN_COOKIE) or ""
+    registration = await db.scalar(select(PendingRegistration).where(PendingRegistration.token == token)) if token else None
+    if not registration:
+        response = JSONResponse({"status": "unknown"}, status_code=404)
+        response.delete_cookie(REGISTRATION_TOKEN_COOKIE)
+        return response
+
+    requeue = await revive_stale_registration(db, registration)
+    message_key = registration_status_message(registration)
+    response = JSONResponse({"status": registration.status, "message": t(lang, message_key)})
+    if registration.status != REGISTRATION_PENDING:
+        response.delete_cookie(REGISTRATION_TOKEN_COOKIE)
+    elif requeue:
+        response.background = BackgroundTask(enrich_pending_registration, SessionLocal, registration.id)
+    return response
 
 
 @router.post("/register/preview")
@@ -1764,6 +1814,8 @@ async def register_preview(
     if exists:
         return JSONResponse({"ok": False, "error": t(lang, "already_registered")}, status_code=409)
 
+    # Возвращаем соединение в пул на время запроса к AutoChess API (до 20 с).
+    await db.rollback()
     try:
         profile = await fetch_autochess_data(steam_id)
     except Exception as exc:
@@ -1804,23 +1856,23 @@ async def send_chat(
 
     ip = get_request_ip_address(request)
     chat_sender, should_set_chat_sender_cookie = resolve_chat_sender_token(request.cookies.get("chat_sender"))
-    last_msg = await db.scalar(
-        select(ChatMessage)
-        .where(ChatMessage.sender_token == chat_sender)
-        .order_by(desc(ChatMessage.created_at))
-        .limit(1)
-    )
-    if last_msg and datetime.utcnow() - last_msg.created_at < timedelta(seconds=chat_settings.cooldown_seconds):
+    if not await acquire_chat_send_slot(
+        db, sender_token=chat_sender, ip_address=ip, cooldown_seconds=chat_settings.cooldown_seconds
+    ):
         return redirect_with_msg("/", "msg_cooldown_active")
 
-    db.add(ChatMessage(temp_nick=safe_nick, nick_color=safe_color, message=message, ip_address=ip, sender_token=chat_sender))
+    chat_message = ChatMessage(temp_nick=safe_nick, nick_color=safe_color, message=message, ip_address=ip, sender_token=chat_sender)
+    db.add(chat_message)
     await db.commit()
-    await chat_event_broker.publish()
+    await chat_event_broker.publish(CHAT_CREATED_EVENT, _build_chat_messages_payload([chat_message])[0])
     redirect = RedirectResponse(url="/#chat", status_code=303)
     redirect.set_cookie("chat_nick", quote(safe_nick, safe=""), max_age=60 * 60 * 24 * 365, samesite="lax")
     redirect.set_cookie("chat_nick_color", safe_color, max_age=60 * 60 * 24 * 365, samesite="lax")
     if should_set_chat_sender_cookie:
         redirect.set_cookie("chat_sender", chat_sender, max_age=60 * 60 * 24 * 365, samesite="lax")
+    if claim_chat_retention_run():
+        # Перенос старых сообщений в архив — после ответа, своей сессией и короткими пачками.
+        redirect.background = BackgroundTask(run_chat_retention, SessionLocal)
     return redirect
 
 
@@ -1833,23 +1885,116 @@ async def chat_messages_api(db: AsyncSession = Depends(get_db)):
 
 @router.get("/chat/stream")
 async def chat_stream(request: Request):
-    async def event_stream():
-        last_seen_version = -1
-        while True:
-            if await request.is_disconnected():
-                break
-
-            try:
-                last_seen_version = await asyncio.wait_for(chat_event_broker.wait_for_update(last_seen_version), timeout=25)
-                yield "event: chat_update\ndata: {}\n\n"
-            except asyncio.TimeoutError:
-                yield "event: ping\ndata: {}\n\n"
+    subscription = chat_event_broker.subscribe(get_request_ip_address(request))
+    if subscription is None:
+        return Response(status_code=503, headers={"Retry-After": "30"})
 
     headers = {
         "Cache-Control": "no-cache",
         "Connection": "keep-alive",
     }
-    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+    # Если поток так и не начнётся, подписку всё равно снимет фоновая задача ответа.
+    return StreamingResponse(
+        chat_event_broker.events(subscription),
+        media_type="text/event-stream",
+        headers=headers,
+        background=BackgroundTask(chat_event_broker.unsubscribe, subscription),
+    )
+
+
+PARTICIPANTS_PAGE_SIZE = 50
+PARTICIPANTS_RANK_ORDER = [
+    Basket.QUEEN.value,
+    Basket.KING.value,
+    Basket.ROOK.value,
+    Basket.BISHOP.value,
+    Basket.LOW_RANK.value,
+]
+
+
+def _resolve_participants_priority(rank_priority: str | None, basket: str | None) -> str:
+    selected_priority = rank_priority or basket
+    if selected_priority not in PARTICIPANTS_RANK_ORDER:
+        return Basket.QUEEN.value
+    return selected_priority
+
+
+def _participants_basket_order_map(selected_priority: str) -> dict[str, int]:
+    ordered_base_ranks = [selected_priority, *[rank for rank in PARTICIPANTS_RANK_ORDER if rank != selected_priority]]
+    basket_order: list[str] = []
+    for rank_name in ordered_base_ranks:
+        for main_basket, reserve_basket in BASKET_PAIRS:
+            if rank_name == main_basket:
+                basket_order.extend([main_basket, reserve_basket])
+                break
+    return {basket_name: index for index, basket_name in enumerate(basket_order)}
+
+
+def _participants_order_columns(selected_priority: str) -> list:
+    """Возвращает ключ сортировки participants: (группа ранга, дивизион, корзина, created_at, id)."""
+    # Группы рангов хранятся в users.rank_tier в порядке PARTICIPANTS_RANK_ORDER, поэтому приоритет — это сдвиг по кругу.
+    priority_tier = PARTICIPANTS_RANK_ORDER.index(selected_priority)
+    rank_tier_order = User.rank_tier
+    if priority_tier:
+        rank_tier_order = case(
+            (User.rank_tier == RANK_TIER_UNKNOWN, RANK_TIER_UNKNOWN),
+            else_=(User.rank_tier + RANK_TIER_UNKNOWN - priority_tier) % RANK_TIER_UNKNOWN,
+        )
+    basket_order_map = _participants_basket_order_map(selected_priority)
+    basket_order_case = case(
+        *((User.basket == basket_name, index) for basket_name, index in basket_order_map.items()),
+        else_=len(basket_order_map),
+    )
+    return [rank_tier_order, User.rank_division, basket_order_case, User.created_at, User.id]
+
+
+def _participants_sort_values(user: User, selected_priority: str) -> tuple[int, int, int, datetime, int]:
+    """Считает в Python те же значения, что и `_participants_order_columns`, для курсора следующей страницы."""
+    priority_tier = PARTICIPANTS_RANK_ORDER.index(selected_priority)
+    rank_tier = user.rank_tier
+    if rank_tier != RANK_TIER_UNKNOWN:
+        rank_tier = (rank_tier + RANK_TIER_UNKNOWN - priority_tier) % RANK_TIER_UNKNOWN
+    basket_order_map = _participants_basket_order_map(selected_priority)
+    basket_index = basket_order_map.get(user.basket, len(basket_order_map))
+    return rank_tier, user.rank_division, basket_index, user.created_at, user.id
+
+
+def _encode_participants_cursor(values: tuple[int, int, int, datetime, int]) -> str:
+    rank_tier, rank_division, basket_index, created_at, user_id = values
+    raw = json.dumps([rank_tier, rank_division, basket_index, created_at.isoformat(), user_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_participants_cursor(cursor: str | None) -> tuple[int, int, int, datetime, int] | None:
+    # Битый курсор — ошибка клиента, а не первая страница: иначе прокрутка начнётся сначала и задублирует строки.
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        rank_tier, rank_division, basket_index, created_at, user_id = json.loads(raw)
+        return int(rank_tier), int(rank_division), int(basket_index), datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid_cursor") from exc
+
+
+async def _load_participants_page(
+    db: AsyncSession,
+    selected_priority: str,
+    cursor: str | None = None,
+    limit: int = PARTICIPANTS_PAGE_SIZE,
+) -> tuple[list[User], str | None]:
+    """Загружает страницу участников по keyset-курсору и возвращает курсор следующей страницы."""
+    order_columns = _participants_order_columns(selected_priority)
+    statement = select(User).order_by(*order_columns).limit(limit + 1)
+    cursor_values = _decode_participants_cursor(cursor)
+    if cursor_values is not None:
+        statement = statement.where(tuple_(*order_columns) > tuple_(*cursor_values))
+
+    users = list((await db.scalars(statement)).all())
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, _encode_participants_cursor(_participants_sort_values(users[-1], selected_priority))
 
 
 @router.get("/participants", response_class=HTMLResponse)
@@ -1869,71 +2014,11 @@ async def participants(
         {"main_basket": Basket.LOW_RANK.value, "reserve_basket": Basket.LOW_RANK_RESERVE.value, "label": "Low Rank"},
     ]
     basket_pairs = BASKET_PAIRS
-    base_rank_order = [
-        Basket.QUEEN.value,
-        Basket.KING.value,
-        Basket.ROOK.value,
-        Basket.BISHOP.value,
-        Basket.LOW_RANK.value,
-    ]
-    allowed_priorities = set(base_rank_order)
-
-    selected_priority = rank_priority or basket
-    if selected_priority not in allowed_priorities:
-        selected_priority = Basket.QUEEN.value
-
-    ordered_base_ranks = [selected_priority, *[rank for rank in base_rank_order if rank != selected_priority]]
-    basket_order: list[str] = []
-    for rank_name in ordered_base_ranks:
-        for main_basket, reserve_basket in basket_pairs:
-            if rank_name == main_basket:
-                basket_order.extend([main_basket, reserve_basket])
-                break
-    basket_order_map = {basket_name: index for index, basket_name in enumerate(basket_order)}
-    basket_order_case = case(
-        *( (User.basket == basket_name, index) for basket_name, index in basket_order_map.items() ),
-        else_=len(basket_order_map),
-    )
-
-    rank_group_tokens_by_priority = {
-        Basket.QUEEN.value: (("Queen",), ("King",), ("Rook",), ("Bishop",), ("Knight", "Pawn")),
-        Basket.KING.value: (("King",), ("Rook",), ("Bishop",), ("Knight", "Pawn"), ("Queen",)),
-        Basket.ROOK.value: (("Rook",), ("Bishop",), ("Knight", "Pawn"), ("Queen",), ("King",)),
-        Basket.BISHOP.value: (("Bishop",), ("Knight", "Pawn"), ("Queen",), ("King",), ("Rook",)),
-        Basket.LOW_RANK.value: (("Knight", "Pawn"), ("Queen",), ("King",), ("Rook",), ("Bishop",)),
-    }
-    ordered_rank_groups = rank_group_tokens_by_priority.get(
-        selected_priority,
-        rank_group_tokens_by_priority[Basket.QUEEN.value],
-    )
-    rank_tier_order_case = case(
-        *[
-            (
-                or_(*[User.highest_rank.like(f"{token}%") for token in tokens]),
-                group_index,
-            )
-            for group_index, tokens in enumerate(ordered_rank_groups)
-        ],
-        else_=999,
-    )
-    rank_division_order_case = case(
-        (User.highest_rank.like("Queen#%"), func.coalesce(func.cast(func.replace(User.highest_rank, "Queen#", ""), Integer), 999999)),
-        (User.highest_rank == "Queen", 999999),
-        (User.highest_rank.like("King-%"), func.coalesce(func.cast(func.replace(User.highest_rank, "King-", ""), Integer), 0)),
-        (User.highest_rank.like("King%"), 0),
-        (User.highest_rank.like("Rook-%"), func.coalesce(func.cast(func.replace(User.highest_rank, "Rook-", ""), Integer), 0)),
-        (User.highest_rank.like("Rook%"), 0),
-        (User.highest_rank.like("Bishop-%"), func.coalesce(func.cast(func.replace(User.highest_rank, "Bishop-", ""), Integer), 0)),
-        (User.highest_rank.like("Bishop%"), 0),
-        (User.highest_rank.like("Knight-%"), func.coalesce(func.cast(func.replace(User.highest_rank, "Knight-", ""), Integer), 0)),
-        (User.highest_rank.like("Knight%"), 0),
-        (User.highest_rank.like("Pawn-%"), func.coalesce(func.cast(func.replace(User.highest_rank, "Pawn-", ""), Integer), 0)),
-        (User.highest_rank.like("Pawn%"), 0),
-        else_=999999,
-    )
+    selected_priority = _resolve_participants_priority(rank_priority, basket)
 
     direct_invite_users: list[User] = []
     users: list[User] = []
+    next_cursor: str | None = None
 
     if view == "direct_invites":
         invited_users = (
@@ -1948,17 +2033,7 @@ async def participants(
         direct_invite_users = list(invited_users)
     else:
         view = "baskets"
-        users = (
-            await db.scalars(
-                select(User).order_by(
-                    rank_tier_order_case,
-                    rank_division_order_case,
-                    basket_order_case,
-                    User.created_at,
-                    User.id,
-                )
-            )
-        ).all()
+        users, next_cursor = await _load_participants_page(db, selected_priority)
 
     is_empty = not direct_invite_users if view == "direct_invites" else not users
 
@@ -1973,15 +2048,71 @@ async def participants(
             basket_pairs=basket_pairs,
             basket_tabs=rank_tabs,
             users=users,
+            next_cursor=next_cursor,
             direct_invite_users=direct_invite_users,
             is_empty=is_empty,
         ),
     )
 
 
-@router.get("/tournament", response_class=HTMLResponse)
-async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
-    # Отдаем единую турнирную сетку со всеми этапами.
+@router.get("/participants/list")
+async def participants_list_api(
+    rank_priority: str | None = Query(None),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Отдаём следующую страницу участников для бесконечной прокрутки.
+    selected_priority = _resolve_participants_priority(rank_priority, None)
+    try:
+        users, next_cursor = await _load_participants_page(db, selected_priority, cursor)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    return {
+        "users": [
+            {
+                "nickname": user.nickname,
+                "steam_id": user.steam_id,
+                "game_nickname": user.game_nickname,
+                "current_rank": user.current_rank,
+                "highest_rank": user.highest_rank,
+            }
+            for user in users
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/tournament/advancement-odds")
+async def tournament_advancement_odds(
+    stage_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Шансы выхода из групп для трансляций: без stage_id — I этап, иначе лимитированная стадия плей-офф.
+    try:
+        inputs = await load_advancement_inputs(db, stage_id)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=404 if str(exc) == "Stage not found" else 400)
+    # Симуляция занимает процессор на сотни миллисекунд — не держим event loop.
+    odds = await asyncio.to_thread(simulate_stage_advancement, inputs)
+    user_by_id = await get_user_directory(db)
+    return {
+        **odds,
+        "groups": [
+            {
+                **group,
+                "players": [
+                    {**player, "nickname": user_by_id[player["user_id"]].nickname if player["user_id"] in user_by_id else None}
+                    for player in group["players"]
+                ],
+            }
+            for group in odds["groups"]
+        ],
+    }
+
+
+async def _load_public_tournament_tree(db: AsyncSession, lang: str) -> dict[str, object]:
+    # Собирает данные единой турнирной сетки: общий источник для HTML-страницы и JSON.
+    generation = standings_generation()
     tournament_started = await get_tournament_started(db)
 
     groups = list(
@@ -1995,6 +2126,7 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
         ).all()
     )
     playoff_stages = await get_playoff_stages_with_data(db) if tournament_started else []
+    await preload_tie_breaks(db, playoff_stages)
 
     direct_invite_users = list(
         (
@@ -2013,8 +2145,7 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
     }
     tournament_profile_spec = await get_current_tournament_profile_spec(db)
 
-    users = list((await db.scalars(select(User))).all())
-    user_by_id = {user.id: user for user in users}
+    user_by_id = await get_user_directory(db)
 
     winner_settings = list(
         (
@@ -2046,6 +2177,7 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
             direct_invite_ids,
             winner_user_id,
             direct_invite_groups=direct_invite_groups,
+            standings_generation=generation,
         )
     except TypeError:
         stage_columns = build_bracket_columns(
@@ -2056,9 +2188,9 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
             stage_1_promoted_count=int(tournament_profile_spec["stage_1_promoted_count"]),
             stage_2_size=int(tournament_profile_spec["stage_2_size"]),
             direct_invite_groups=direct_invite_groups,
+            standings_generation=generation,
         )
 
-    lang = get_lang(request.cookies.get("lang"))
     active_playoff_stage = next((stage for stage in playoff_stages if stage.is_started), None)
     active_stage_key = active_playoff_stage.key if active_playoff_stage else "group_stage"
     current_stage_display = resolve_current_stage_label(lang, playoff_stages, tournament_started)
@@ -2071,6 +2203,7 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
             winner_user_id,
             active_stage_key=active_stage_key,
             direct_invite_groups=direct_invite_groups,
+            standings_generation=generation,
         )
     except TypeError:
         tournament_tree = build_tournament_tree_vm(
@@ -2080,6 +2213,7 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
             direct_invite_ids,
             winner_user_id,
             direct_invite_groups=direct_invite_groups,
+            standings_generation=generation,
         )
     stage_title_keys = {
         "group_stage": "tournament_stage_1_8_label",
@@ -2092,25 +2226,68 @@ async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
         if title_key:
             stage["title"] = t(lang, title_key)
 
-    playoff_empty_active_stage_alert = get_empty_active_stage_alert(playoff_stages)
+    final_stage = next((stage for stage in playoff_stages if stage.key == "stage_final" and stage.is_started), None)
+    final_stage_analytics = await asyncio.to_thread(get_final_stage_analytics, final_stage) if final_stage else None
+
+    return {
+        "groups": groups,
+        "playoff_stages": playoff_stages,
+        "stage_columns": stage_columns,
+        "tournament_tree": tournament_tree,
+        "current_stage_display": current_stage_display,
+        "final_stage_analytics": final_stage_analytics,
+        "user_by_id": user_by_id,
+        "winner_user_id": winner_user_id,
+        "winner_nickname": winner_nickname,
+    }
+
+
+@router.get("/tournament", response_class=HTMLResponse)
+async def tournament_page(request: Request, db: AsyncSession = Depends(get_db)):
+    # Отдаем единую турнирную сетку со всеми этапами.
+    tree_data = await _load_public_tournament_tree(db, get_lang(request.cookies.get("lang")))
+    playoff_empty_active_stage_alert = get_empty_active_stage_alert(tree_data["playoff_stages"])
 
     return templates.TemplateResponse(
         request,
         "tournament.html",
         template_context(
             request,
-            groups=groups,
-            playoff_stages=playoff_stages,
-            stage_columns=stage_columns,
-            tournament_tree=tournament_tree,
-            current_stage_display=current_stage_display,
+            groups=tree_data["groups"],
+            playoff_stages=tree_data["playoff_stages"],
+            stage_columns=tree_data["stage_columns"],
+            tournament_tree=tree_data["tournament_tree"],
+            current_stage_display=tree_data["current_stage_display"],
             playoff_empty_active_stage_alert=playoff_empty_active_stage_alert,
-            tournament_winner_user_id=winner_user_id,
-            tournament_winner_nickname=winner_nickname,
+            tournament_winner_user_id=tree_data["winner_user_id"],
+            tournament_winner_nickname=tree_data["winner_nickname"],
         ),
     )
 
 
+@router.get("/tournament/tree.json")
+async def tournament_tree_json(request: Request, db: AsyncSession = Depends(get_db)):
+    # Сетка для трансляций и виджетов; в финале — кто может победить и кто уже гарантировал топ-3.
+    tree_data = await _load_public_tournament_tree(db, get_lang(request.cookies.get("lang")))
+    final_stage_analytics = tree_data["final_stage_analytics"]
+    user_by_id = tree_data["user_by_id"]
+    if final_stage_analytics:
+        final_stage_analytics = {
+            **final_stage_analytics,
+            "players": [
+                {**player, "nickname": user_by_id[player["user_id"]].nickname if player["user_id"] in user_by_id else None}
+                for player in final_stage_analytics["players"]
+            ],
+        }
+    return {
+        "current_stage": tree_data["current_stage_display"],
+        "tournament_winner_user_id": tree_data["winner_user_id"],
+        "tournament_winner_nickname": tree_data["winner_nickname"] or None,
+        "stages": tree_data["tournament_tree"].get("stages", []),
+        "final_analytics": final_stage_analytics,
+    }
+
+
 @router.get("/donate", response_class=HTMLResponse)
 async def donate_page(request: Request, db: AsyncSession = Depends(get_db)):
     # Отдаем страницу донатов.
@@ -2118,20 +2295,15 @@ async def donate_page(request: Request, db: AsyncSession = Depends(get_db)):
     donation_links = (await db.scalars(select(DonationLink).where(DonationLink.is_active.is_(True)).order_by(DonationLink.sort_order, DonationLink.id))).all()
     crypto_wallets = (await db.scalars(select(CryptoWallet).where(CryptoWallet.is_active.is_(True)).order_by(CryptoWallet.sort_order, CryptoWallet.id))).all()
     donors = (await db.scalars(select(Donor).order_by(Donor.sort_order, Donor.id))).all()
-    total_sponsors_amount = parse_donor_amount("0")
-    for donor in donors:
-        total_sponsors_amount += parse_donor_amount(str(donor.amount))
-    highlight_amount_setting = await db.scalar(
-        select(SiteSetting).where(SiteSetting.key == DONATE_HIGHLIGHT_AMOUNT_SETTING_KEY)
-    )
+    prize_pool_totals = await get_prize_pool_totals(db)
     support_author_visible_setting = await db.scalar(
         select(SiteSetting).where(SiteSetting.key == DONATE_SUPPORT_AUTHOR_VISIBLE_SETTING_KEY)
     )
     show_support_author_block = True
     if support_author_visible_setting:
         show_support_author_block = (support_author_visible_setting.value or "").strip().lower() in {"1", "true", "yes", "on"}
-    highlight_amount = (highlight_amount_setting.value or "").strip() if highlight_amount_setting else ""
-    display_total_amount = parse_donor_amount(highlight_amount) if highlight_amount else total_sponsors_amount
+    highlight_amount = prize_pool_totals.highlight_amount
+    display_total_amount = parse_donor_amount(highlight_amount) if highlight_amount else prize_pool_totals.donor_total
     total_sponsors_amount_rub, total_sponsors_amount_usd = to_rub_and_usd_display_amounts(display_total_amount)
     prize_pool_display_mode = "rub" if lang == "ru" else "usd"
 
@@ -2245,7 +2417,7 @@ async def freak_page(request: Request):
 
 @router.get("/admin/login", response_class=HTMLResponse)
 async def admin_login_page(request: Request):
-    if is_admin_session(request.cookies.get(ADMIN_SESSION_COOKIE)):
+    if request_is_admin(request):
         return RedirectResponse(url="/admin", status_code=303)
     return templates.TemplateResponse(request, "admin_login.html", template_context(request))
 
@@ -2260,7 +2432,7 @@ async def admin_login(request: Request, admin_key: str = Form(...)):
         create_admin_session_cookie(),
         httponly=True,
         samesite="lax",
-        max_age=60 * 60 * 12,
+        max_age=ADMIN_SESSION_TTL_SECONDS,
     )
     return response
 
@@ -2275,6 +2447,7 @@ async def admin_logout():
 
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
+    generation = standings_generation()
     judge_setting = await db.scalar(select(SiteSetting).where(SiteSetting.key == "judge_login_token"))
     tournament_finished_setting = await db.scalar(select(SiteSetting).where(SiteSetting.key == "tournament_finished"))
     tournament_winner_nickname_setting = await db.scalar(select(SiteSetting).where(SiteSetting.key == "tournament_winner_nickname"))
@@ -2285,19 +2458,12 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
     if judge_login_token:
         judge_login_url = str(request.url_for("admin_page")).rstrip("/") + f"?judge_token={judge_login_token}"
 
-    manual_draw_users = (
-        await db.scalars(
-            select(User)
-            .where(User.basket != Basket.INVITED.value)
-            .order_by(User.nickname.asc(), User.created_at.desc())
-        )
-    ).all()
+    manual_draw_users, users_by_id = await _load_admin_user_directory(db)
     manual_draw_main_users = [user for user in manual_draw_users if not str(user.basket or "").endswith("_reserve")]
     manual_draw_reserve_users = [user for user in manual_draw_users if str(user.basket or "").endswith("_reserve")]
-    user_rows = (await db.execute(select(User.id, User.nickname))).all()
-    users_by_id = {user_id: nickname for user_id, nickname in user_rows}
     stages = (await db.scalars(select(TournamentStage).order_by(TournamentStage.id))).all()
     playoff_stages = await get_playoff_stages_with_data(db)
+    await preload_tie_breaks(db, playoff_stages)
     active_playoff_stage = get_active_playoff_stage(playoff_stages)
 
     playoff_stage_by_key = {stage.key: stage for stage in playoff_stages}
@@ -2371,7 +2537,7 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
                 "top2_4_finishes": max((member.top4_finishes or 0) - (member.first_places or 0), 0),
                 "eighth_places": member.eighth_places or 0,
             }
-            for member in sort_members_for_table(list(group.members))
+            for member in get_group_stage_standings(group, group.members, generation=generation).order(group.members)
         ]
         for group in groups
     }
@@ -2416,6 +2582,9 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
         for group_number in stage_group_numbers:
             group_matches = [match for match in stage.matches if match.group_number == group_number]
             active_match = max(group_matches, key=lambda match: match.game_number, default=None)
+            group_participants = [
+                item for item in stage.participants if get_stage_group_number_by_seed(item.seed) == group_number
+            ]
             groups_payload.append(
                 {
                     "group_number": group_number,
@@ -2436,7 +2605,7 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
                             "user_id": participant.user_id,
                             "nickname": users_by_id.get(participant.user_id, f"#{participant.user_id}"),
                             "points": participant.points,
-                            "is_winner_eligible": (participant.points or 0) >= 22,
+                            "is_winner_eligible": (participant.points or 0) >= FINAL_WIN_POINTS,
                             "total_points": participant.points or 0,
                             "first_places": participant.wins or 0,
                             "top2_4_finishes": max((participant.top4_finishes or 0) - (participant.wins or 0), 0),
@@ -2444,15 +2613,9 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
                             "group_number": group_number,
                             "group_label": get_stage_group_label(stage.key, group_number),
                         }
-                        for participant in sorted(
-                            [
-                                item
-                                for item in stage.participants
-                                if get_stage_group_number_by_seed(item.seed) == group_number
-                            ],
-                            key=playoff_sort_key,
-                            reverse=True,
-                        )
+                        for participant in get_playoff_group_standings(
+                            stage, group_number, group_participants, active_match, generation=generation
+                        ).order(group_participants)
                     ],
                 }
             )
@@ -2469,6 +2632,16 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
     current_playoff_stage_can_submit_results = current_playoff_stage_submit_status["can_submit"]
     current_playoff_stage_is_final = is_stage_allowed_for_manual_winner(current_playoff_stage)
     current_stage_groups = playoff_stage_groups.get(current_playoff_stage.id, []) if current_playoff_stage else []
+    final_stage_analytics = (
+        await asyncio.to_thread(get_final_stage_analytics, current_playoff_stage) if current_playoff_stage_is_final else None
+    )
+    if final_stage_analytics:
+        analytics_by_user = {player["user_id"]: player for player in final_stage_analytics["players"]}
+        for group in current_stage_groups:
+            for participant in group["participants"]:
+                player = analytics_by_user.get(participant["user_id"], {})
+                participant["min_games_to_win"] = player.get("min_games_to_win")
+                participant["clinched_top3"] = bool(player.get("clinched_top3"))
     current_stage_participants = playoff_stage_participants.get(current_playoff_stage.id, []) if current_playoff_stage else []
     playoff_stage_finish_progress: list[dict[str, int | str]] = []
     playoff_stage_finish_ready = False
@@ -2536,6 +2709,7 @@ async def admin_page(request: Request, db: AsyncSession = Depends(get_db)):
             current_playoff_stage_can_submit_results=current_playoff_stage_can_submit_results,
             current_playoff_stage_is_final=current_playoff_stage_is_final,
             current_stage_groups=current_stage_groups,
+            final_stage_analytics=final_stage_analytics,
             current_stage_participants=current_stage_participants,
             playoff_stage_finish_progress=playoff_stage_finish_progress,
             playoff_stage_finish_ready=playoff_stage_finish_ready,
@@ -2685,6 +2859,7 @@ async def admin_reassign_user(
 
     if not target_stage_id:
         await db.commit()
+        refresh_user_directory_entry(user)
         return redirect_with_admin_users_msg("msg_status_ok")
 
     target_stage = await db.get(PlayoffStage, target_stage_id)
@@ -2737,6 +2912,7 @@ async def admin_reassign_user(
             )
 
         await db.commit()
+        refresh_user_directory_entry(user)
         return redirect_with_admin_users_msg("msg_player_moved")
     except ValueError as exc:
         await db.rollback()
@@ -2784,9 +2960,12 @@ async def _update_user_allowed_fields(
 
         playoff_participants = list((await db.scalars(select(PlayoffParticipant).where(PlayoffParticipant.user_id == user_id))).all())
         for participant in playoff_participants:
-            participant.points = normalized_points
+            set_playoff_participant_points(db, participant, normalized_points)
 
     await db.commit()
+    if manual_points is not None:
+        invalidate_standings()
+    refresh_user_directory_entry(user)
     return redirect_with_admin_users_msg("msg_status_ok")
 
 
@@ -2819,8 +2998,17 @@ async def _delete_user_with_dependencies(db: AsyncSession, *, user: User) -> Non
 
 
 @router.get("/admin/chat", response_class=HTMLResponse)
-async def admin_chat_page(request: Request, db: AsyncSession = Depends(get_db)):
+async def admin_chat_page(
+    request: Request,
+    archive: bool = Query(default=False),
+    archive_before: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
     chat_settings = await get_or_create_chat_settings(db)
+    archive_messages: list[ChatMessageArchive] = []
+    archive_next_before: int | None = None
+    if archive or archive_before is not None:
+        archive_messages, archive_next_before = await load_chat_archive_page(db, before_id=archive_before)
     chat_messages = (
         await db.scalars(select(ChatMessage).order_by(desc(ChatMessage.id)).limit(100))
     ).all()
@@ -2847,6 +3035,9 @@ async def admin_chat_page(request: Request, db: AsyncSession = Depends(get_db)):
             request,
             chat_settings=chat_settings,
             chat_messages=chat_messages,
+            show_chat_archive=archive or archive_before is not None,
+            archive_messages=archive_messages,
+            archive_next_before=archive_next_before,
             admin_chat_senders=list(ADMIN_CHAT_SENDERS.keys()),
             admin_selected_sender=selected_sender,
         ),
@@ -2955,6 +3146,7 @@ async def admin_delete_user(
         logger.exception("Failed to delete user %s from admin panel", user_id)
         return redirect_with_admin_users_msg("msg_user_delete_failed")
 
+    remove_user_directory_entry(user_id)
     return redirect_with_admin_users_msg("msg_user_deleted")
 
 
@@ -2976,6 +3168,7 @@ async def admin_refresh_users_ranks(db: AsyncSession = Depends(get_db)):
             profile = await fetch_autochess_data(user.steam_id)
             user.current_rank = profile["current_rank"]
             user.highest_rank = profile["highest_rank"]
+            apply_rank_sort_columns(user)
             updated_count += 1
         except Exception:
             failed_count += 1
@@ -2985,6 +3178,7 @@ async def admin_refresh_users_ranks(db: AsyncSession = Depends(get_db)):
             await asyncio.sleep(1.5)
 
     await db.commit()
+    invalidate_user_directory()
     return redirect_with_admin_users_msg(
         "msg_status_ok",
         details=f"ranks_refreshed:{updated_count};failed:{failed_count}",
@@ -3158,8 +3352,10 @@ async def admin_invite_user(
         direct_invite_group_number=direct_invite_group_number,
         extra_data=json.dumps(profile["raw"], ensure_ascii=False),
     )
+    apply_rank_sort_columns(user)
     db.add(user)
     await db.commit()
+    refresh_user_directory_entry(user)
     return redirect_with_admin_emergency_msg("msg_invited_added")
 
 
@@ -3191,6 +3387,7 @@ async def admin_emergency_update_player_identity(
     user.steam_id = steam_id
 
     await db.commit()
+    refresh_user_directory_entry(user)
     return redirect_with_admin_emergency_msg("msg_status_ok")
 
 
@@ -3418,6 +3615,20 @@ async def admin_group_score(
         return redirect_with_admin_msg("msg_operation_failed")
 
 
+@router.post("/admin/group/tie-break")
+async def admin_group_tie_break(
+    group_id: int = Form(...),
+    user_ids: str = Form(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Сохраняет ручной порядок равных игроков группы I этапа: ID через запятую, первый — выше."""
+    try:
+        await save_group_manual_tie_break(db, group_id, parse_manual_draw_user_ids(user_ids))
+    except ValueError as exc:
+        return redirect_with_admin_msg("msg_operation_failed", details=str(exc))
+    return redirect_with_admin_msg("msg_manual_tie_break_saved")
+
+
 @router.post("/admin/group-stage/finish")
 async def admin_finish_group_stage(db: AsyncSession = Depends(get_db)):
     is_completed, status, _ = await get_group_stage_completion_status(db)
@@ -3533,6 +3744,8 @@ async def admin_emergency_rebuild_stage(
     }
 
     if not dry_run:
+        # Счётчики участников обнуляются — прежний журнал этапа больше не описывает их очки.
+        await clear_playoff_stage_log(db, stage_id)
         await db.execute(delete(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id))
         for seed, user_id in enumerate(ordered_user_ids, start=1):
             db.add(PlayoffParticipant(stage_id=stage_id, user_id=user_id, seed=seed))
@@ -3550,6 +3763,7 @@ async def admin_emergency_rebuild_stage(
         await db.flush()
         return await _render_admin_emergency_page(request, db, preview_title="Dry-run: rebuild stage", preview_payload=preview)
     await db.commit()
+    invalidate_playoff_standings(stage_id)
     return redirect_with_admin_msg("msg_status_ok", details="stage_rebuilt")
 
 
@@ -3598,6 +3812,7 @@ async def admin_emergency_stage_config(
         await db.flush()
         return await _render_admin_emergency_page(request, db, preview_title="Dry-run: stage config", preview_payload=preview)
     await db.commit()
+    invalidate_playoff_standings(stage_id)
     return redirect_with_admin_msg("msg_status_ok", details="stage_config_updated")
 
 
@@ -3641,6 +3856,8 @@ async def admin_emergency_bulk_move(
         await db.flush()
         return await _render_admin_emergency_page(request, db, preview_title="Dry-run: bulk move", preview_payload=preview)
     await db.commit()
+    invalidate_playoff_standings(from_stage_id)
+    invalidate_playoff_standings(to_stage_id)
     return redirect_with_admin_msg("msg_status_ok", details=f"bulk_moved:{len(moved)}")
 
 
@@ -3703,6 +3920,7 @@ async def admin_emergency_replace_player(
 
     if stage_is_playoff:
         participant.user_id = reserve_user_id
+        await reassign_playoff_game_results(db, stage_id, from_user_id, reserve_user_id)
     else:
         group_member.user_id = reserve_user_id
     _promote_reserve_user_to_main_basket(reserve_user)
@@ -3716,6 +3934,11 @@ async def admin_emergency_replace_player(
         details=preview,
     )
     await db.commit()
+    if stage_is_playoff:
+        invalidate_playoff_standings(stage_id)
+    else:
+        invalidate_group_stage_standings(stage_id)
+    refresh_user_directory_entry(reserve_user)
     return redirect_with_admin_emergency_msg("msg_player_replaced")
 
 
@@ -3792,6 +4015,8 @@ async def admin_emergency_swap_participants(
             preview_payload=preview,
         )
     await db.commit()
+    invalidate_playoff_standings(left_stage_id)
+    invalidate_playoff_standings(right_stage_id)
     return redirect_with_admin_emergency_msg("msg_player_moved", details="participants_swapped")
 
 
@@ -3810,7 +4035,8 @@ async def admin_emergency_diagnostics(
         expected_groups = max(1, math.ceil(int(stage.stage_size or 0) / 8))
         group_numbers = {m.group_number for m in matches}
         missing_groups = [number for number in range(1, expected_groups + 1) if number not in group_numbers]
-        if len(participants) != int(stage.stage_size or 0) or duplicate_users or missing_groups:
+        standings_mismatches = await find_playoff_standings_mismatches(db, stage.id)
+        if len(participants) != int(stage.stage_size or 0) or duplicate_users or missing_groups or standings_mismatches:
             diagnostics.append({
                 "stage_id": stage.id,
                 "stage_key": stage.key,
@@ -3818,6 +4044,7 @@ async def admin_emergency_diagnostics(
                 "participants": len(participants),
                 "missing_groups": missing_groups,
                 "duplicate_users": duplicate_users,
+                "standings_mismatches": standings_mismatches,
             })
 
     payload = {"dry_run": dry_run, "issues": diagnostics}
@@ -3876,6 +4103,9 @@ async def admin_move_playoff_player(
             },
         )
         await db.commit()
+        if action_type == "group_move":
+            invalidate_group_stage_standings(from_stage_id)
+            invalidate_group_stage_standings(to_stage_id)
         return redirect_with_admin_msg("msg_player_moved")
     except Exception as exc:  # noqa: BLE001
         return redirect_with_admin_msg("msg_operation_failed")
@@ -3946,6 +4176,25 @@ async def admin_playoff_score(
         return redirect_with_admin_msg("msg_operation_failed")
 
 
+@router.post("/admin/playoff/undo")
+async def admin_playoff_undo_last_game(
+    stage_id: int = Form(...),
+    group_number: int = Form(default=1),
+    confirm_final: bool = Form(default=False),
+    db: AsyncSession = Depends(get_db),
+):
+    allowed, reason = await _check_emergency_safety_lock(db, confirm_final=confirm_final)
+    if not allowed:
+        return redirect_with_admin_msg("msg_operation_failed", details=reason)
+    if not await _playoff_stage_exists(db, stage_id):
+        return redirect_with_admin_msg("msg_invalid_playoff_stage")
+    try:
+        await undo_last_playoff_game(db, stage_id, group_number=group_number)
+    except ValueError as exc:
+        return redirect_with_admin_msg("msg_operation_failed", details=str(exc))
+    return redirect_with_admin_msg("msg_playoff_game_undone")
+
+
 @router.post("/admin/playoff/group/finish")
 async def admin_finish_playoff_group(
     stage_id: int = Form(...),
@@ -3971,7 +4220,10 @@ async def admin_finish_playoff_group(
     if is_limited_stage(stage.key) and match.game_number <= GROUP_STAGE_GAME_LIMIT:
         return redirect_with_admin_msg("msg_operation_failed", details="group_games_not_completed")
 
-    ranked = sorted(group_participants, key=playoff_sort_key, reverse=True)
+    tie_breaks = await load_stage_tie_breaks(db, stage.id)
+    ranked = rank_playoff_participants(stage, group_participants, match, tie_breaks.get(group_number, {})).order(
+        group_participants
+    )
     promote_n = get_promote_top_n(stage.key)
     promoted_ids = {p.user_id for p in ranked[:promote_n]}
     for participant in group_participants:
@@ -3994,6 +4246,21 @@ async def admin_finish_playoff_group(
     return redirect_with_admin_msg("msg_status_ok")
 
 
+@router.post("/admin/playoff/tie-break")
+async def admin_playoff_tie_break(
+    stage_id: int = Form(...),
+    group_number: int = Form(...),
+    user_ids: str = Form(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Сохраняет ручной порядок равных игроков группы плей-офф: ID через запятую, первый — выше."""
+    try:
+        await save_playoff_manual_tie_break(db, stage_id, group_number, parse_manual_draw_user_ids(user_ids))
+    except ValueError as exc:
+        return redirect_with_admin_msg("msg_operation_failed", details=str(exc))
+    return redirect_with_admin_msg("msg_manual_tie_break_saved")
+
+
 @router.post("/admin/playoff/stage/finish")
 async def admin_finish_playoff_stage(
     stage_id: int = Form(...),
@@ -4074,6 +4341,31 @@ async def admin_playoff_results_batch(
 
 
 
+@router.post("/admin/playoff/results/import")
+async def admin_playoff_results_import(
+    stage_id: int = Form(...),
+    payload: str = Form(default=""),
+    db: AsyncSession = Depends(get_db),
+):
+    stage = await _get_playoff_stage(db, stage_id)
+    if not stage:
+        return redirect_with_admin_msg("msg_invalid_playoff_stage")
+    submit_status = get_playoff_stage_submit_status(stage)
+    if not submit_status["can_submit"] and not await can_submit_playoff_stage_results_with_db(db, stage):
+        return redirect_with_admin_msg("msg_operation_failed", details=str(submit_status["reason"]))
+    try:
+        games = parse_playoff_results_import(payload)
+        imported_count, finalized = await import_playoff_stage_results(db, stage_id, games)
+    except ValueError as exc:
+        await db.rollback()
+        return redirect_with_admin_msg("msg_operation_failed", details=str(exc))
+    except Exception as exc:  # noqa: BLE001
+        await db.rollback()
+        return redirect_with_admin_msg("msg_operation_failed")
+    details = f"{imported_count}" + (", stage_finished" if finalized else "")
+    return redirect_with_admin_msg("msg_playoff_results_imported", details=details)
+
+
 @router.post("/admin/playoff/override")
 async def admin_playoff_override(
     stage_id: int = Form(...),
@@ -4158,6 +4450,7 @@ async def admin_finish_tournament(
         winner_nickname = await finalize_tournament_with_winner(db, winner_user_id)
         await reset_tournament_cycle_after_finish(db)
         await db.commit()
+        invalidate_user_directory()
         return redirect_with_admin_msg("msg_status_ok", details=f"tournament_finished_and_archived:{winner_nickname}")
     except Exception:
         await db.rollback()
@@ -4189,6 +4482,8 @@ async def admin_save_donation_links(
         await db.delete(row)
 
     await db.commit()
+    for parts in rows:
+        sanitize_content_html(parts[0])
     return RedirectResponse(url=f"/admin/content?msg=msg_donation_links_saved&content_lang={lang}", status_code=303)
 
 
@@ -4201,6 +4496,7 @@ async def admin_create_sponsor(
     max_sort_order = await db.scalar(select(func.max(Donor.sort_order)))
     db.add(Donor(name=(name or "").strip(), amount=max(0, amount), sort_order=(max_sort_order or -1) + 1))
     await db.commit()
+    invalidate_prize_pool_totals()
     return RedirectResponse(url="/admin/content?msg=msg_donors_saved", status_code=303)
 
 
@@ -4217,6 +4513,7 @@ async def admin_update_sponsor(
     sponsor.name = (name or "").strip()
     sponsor.amount = max(0, amount)
     await db.commit()
+    invalidate_prize_pool_totals()
     return RedirectResponse(url="/admin/content?msg=msg_donors_saved", status_code=303)
 
 
@@ -4229,6 +4526,7 @@ async def admin_delete_sponsor(
     if sponsor:
         await db.delete(sponsor)
         await db.commit()
+        invalidate_prize_pool_totals()
     return RedirectResponse(url="/admin/content?msg=msg_donors_saved", status_code=303)
 
 
@@ -4245,6 +4543,7 @@ async def admin_update_donate_highlight_amount(
     else:
         row.value = normalized_amount
     await db.commit()
+    invalidate_prize_pool_totals()
     return RedirectResponse(url="/admin/content?msg=msg_prize_pool_saved", status_code=303)
 
 
@@ -4274,6 +4573,7 @@ async def admin_create_crypto_wallet(
     max_sort_order = await db.scalar(select(func.max(CryptoWallet.sort_order)))
     db.add(CryptoWallet(wallet_name=(wallet_name or "").strip(), requisites=(requisites or "").strip(), is_active=is_active, sort_order=(max_sort_order or -1) + 1))
     await db.commit()
+    sanitize_content_html((requisites or "").strip())
     return RedirectResponse(url="/admin/content?msg=msg_donation_methods_saved", status_code=303)
 
 
@@ -4292,6 +4592,7 @@ async def admin_update_crypto_wallet(
     wallet.requisites = (requisites or "").strip()
     wallet.is_active = is_active
     await db.commit()
+    sanitize_content_html(wallet.requisites)
     return RedirectResponse(url="/admin/content?msg=msg_donation_methods_saved", status_code=303)
 
 
@@ -4326,6 +4627,7 @@ async def admin_create_donation_link(
     setattr(row, f"title_{lang}", (label or "").strip())
     db.add(row)
     await db.commit()
+    sanitize_content_html((label or "").strip())
     return RedirectResponse(url=f"/admin/content?msg=msg_donation_links_saved&content_lang={lang}", status_code=303)
 
 
@@ -4352,6 +4654,7 @@ async def admin_update_donation_link(
     row.is_active = is_active
     setattr(row, f"title_{lang}", (label or "").strip())
     await db.commit()
+    sanitize_content_html((label or "").strip())
     return RedirectResponse(url=f"/admin/content?msg=msg_donation_links_saved&content_lang={lang}", status_code=303)
 
 
@@ -4380,6 +4683,8 @@ async def admin_save_rules(
     row = await get_or_create_rules_content(db)
     setattr(row, f"body_{lang}", body)
     await db.commit()
+    # Прогреваем кэш очищенного HTML: первый посетитель /rules уже не разбирает правила.
+    sanitize_content_html(body)
     return RedirectResponse(url=f"/admin/content?msg=msg_rules_saved&content_lang={lang}", status_code=303)
 
 
@@ -4401,16 +4706,33 @@ async def admin_save_chat_settings(
     cooldown_seconds: int = Form(...),
     max_length: int = Form(...),
     is_enabled: bool = Form(default=False),
+    retention_days: int | None = Form(default=None),
+    archive_batch_size: int | None = Form(default=None),
     db: AsyncSession = Depends(get_db),
 ):
     row = await get_or_create_chat_settings(db)
     row.cooldown_seconds = max(0, cooldown_seconds)
     row.max_length = max(1, max_length)
     row.is_enabled = is_enabled
+    if retention_days is not None:
+        row.retention_days = max(0, retention_days)
+    if archive_batch_size is not None:
+        row.archive_batch_size = min(max(1, archive_batch_size), 5000)
     await db.commit()
     return redirect_with_admin_msg("msg_chat_settings_saved")
 
 
+@router.post("/admin/chat/archive")
+async def admin_archive_chat_messages(db: AsyncSession = Depends(get_db)):
+    chat_settings = await get_chat_settings(db)
+    archived = await archive_expired_chat_messages(
+        db, retention_days=chat_settings.retention_days or 0, batch_size=chat_settings.archive_batch_size or 0
+    )
+    if archived:
+        await chat_event_broker.publish()
+    return redirect_with_admin_msg("msg_chat_archived", details=str(archived))
+
+
 @router.post("/admin/chat/send")
 async def admin_send_chat_message(
     request: Request,
@@ -4418,7 +4740,7 @@ async def admin_send_chat_message(
     sender_nick: str = Form(default="@Admin"),
     db: AsyncSession = Depends(get_db),
 ):
-    if not is_admin_session(request.cookies.get(ADMIN_SESSION_COOKIE)):
+    if not request_is_admin(request):
         return RedirectResponse(url="/admin/login", status_code=303)
 
     chat_settings = await get_chat_settings(db)
@@ -4430,22 +4752,21 @@ async def admin_send_chat_message(
     if message.strip() == "/clear":
         await db.execute(delete(ChatMessage))
         await db.commit()
-        await chat_event_broker.publish()
+        await chat_event_broker.publish(CHAT_CLEARED_EVENT)
         return redirect_with_admin_msg("msg_admin_chat_messages_cleared")
 
     safe_sender_nick = normalize_admin_chat_sender(sender_nick)
     admin_ip = get_request_ip_address(request)
-    db.add(
-        ChatMessage(
-            temp_nick=safe_sender_nick,
-            nick_color=ADMIN_CHAT_SENDERS[safe_sender_nick],
-            message=message,
-            ip_address=admin_ip,
-            sender_token="admin",
-        )
+    chat_message = ChatMessage(
+        temp_nick=safe_sender_nick,
+        nick_color=ADMIN_CHAT_SENDERS[safe_sender_nick],
+        message=message,
+        ip_address=admin_ip,
+        sender_token="admin",
     )
+    db.add(chat_message)
     await db.commit()
-    await chat_event_broker.publish()
+    await chat_event_broker.publish(CHAT_CREATED_EVENT, _build_chat_messages_payload([chat_message])[0])
     redirect = redirect_with_admin_msg("msg_admin_chat_message_saved")
     redirect.set_cookie(
         ADMIN_CHAT_SENDER_COOKIE,
@@ -4460,7 +4781,7 @@ async def admin_send_chat_message(
 async def admin_clear_chat_messages(db: AsyncSession = Depends(get_db)):
     await db.execute(delete(ChatMessage))
     await db.commit()
-    await chat_event_broker.publish()
+    await chat_event_broker.publish(CHAT_CLEARED_EVENT)
     return redirect_with_admin_msg("msg_admin_chat_messages_cleared")
 
 
@@ -4484,6 +4805,7 @@ async def admin_update_chat_message(
     chat_message.temp_nick = temp_nick[:120]
     chat_message.message = message
     await db.commit()
+    await chat_event_broker.publish(CHAT_UPDATED_EVENT, _build_chat_messages_payload([chat_message])[0])
     return redirect_with_admin_msg("msg_admin_chat_message_saved")
 
 
@@ -4498,4 +4820,5 @@ async def admin_delete_chat_message(
 
     await db.delete(chat_message)
     await db.commit()
+    await chat_event_broker.publish(CHAT_DELETED_EVENT, {"id": message_id})
     return redirect_with_admin_msg("msg_admin_chat_message_deleted")
@@ -0,0 +1,261 @@
+"""Оценивает шансы выхода из группы методом Монте-Карло по текущей таблице и оставшимся играм."""
+
+from collections import defaultdict
+from collections.abc import Mapping
+from itertools import permutations
+import random
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tournament import GroupMember, PlayoffMatch, PlayoffParticipant, PlayoffStage, TournamentGroup
+from app.services.standings_cache import GROUP_STAGE_SCOPE, UNSET_TIE_BREAK_PRIORITY, load_stage_tie_breaks
+from app.services.tournament import (
+    POINTS_BY_PLACE,
+    get_current_tournament_profile_spec,
+    get_stage_group_number_by_seed,
+)
+from app.services.tournament_stage_config import GROUP_STAGE_GAME_LIMIT, get_promote_top_n, is_limited_stage
+
+DEFAULT_SIMULATIONS = 10000
+LOBBY_SIZE = 8
+# Основание позиционного кодирования счётчиков в одно целое: больше любого числа побед/топ-4/топ-8 за этап.
+COUNTER_BASE = 1024
+PLAYOFF_ORDERING = "playoff"
+GROUP_ORDERING = "group"
+
+_LOBBY_PERMUTATIONS: list[tuple[int, ...]] = []
+_odds_cache: dict[tuple[object, ...], dict[str, object]] = {}
+
+
+def _lobby_permutations() -> list[tuple[int, ...]]:
+    # 8! = 40320 раскладок мест: выбрать готовую быстрее, чем перемешивать список в каждой игре.
+    if not _LOBBY_PERMUTATIONS:
+        _LOBBY_PERMUTATIONS.extend(permutations(range(LOBBY_SIZE)))
+    return _LOBBY_PERMUTATIONS
+
+
+def _encode_counters(points: int, wins: int, top4: int, top8: int, eighth: int, last_place: int | None, ordering: str) -> int:
+    """Кодирует ключ сортировки таблицы в одно целое: больше — выше в таблице.
+
+    ``playoff`` повторяет playoff_sort_key, ``group`` — sort_members_for_table (там ещё учитываются 8-е места).
+    ``last_place=None`` оставляет младший разряд пустым, его заполнит последняя разыгранная игра.
+    """
+    encoded = ((points * COUNTER_BASE + wins) * COUNTER_BASE + top4) * COUNTER_BASE + top8
+    if ordering == GROUP_ORDERING:
+        encoded = encoded * COUNTER_BASE + (COUNTER_BASE - 1 - eighth)
+    return encoded * COUNTER_BASE + (0 if last_place is None else COUNTER_BASE - 1 - last_place)
+
+
+def _place_delta(place: int, ordering: str) -> int:
+    # Разность кодов даёт прирост каждого разряда, включая обратный разряд 8-х мест.
+    return _encode_counters(
+        POINTS_BY_PLACE[place], int(place == 1), int(place <= 4), 1, int(place == 8), None, ordering
+    ) - _encode_counters(0, 0, 0, 0, 0, None, ordering)
+
+
+def simulate_group_advancement(
+    players: list[tuple[int, int, int, int, int, int, int]],
+    *,
+    remaining_games: int,
+    advance_count: int,
+    ordering: str,
+    tie_breaks: Mapping[int, int] | None = None,
+    simulations: int = DEFAULT_SIMULATIONS,
+    rng: random.Random | None = None,
+) -> dict[int, float]:
+    """Возвращает вероятность выхода каждого игрока группы по ``user_id``.
+
+    ``players`` — кортежи ``(user_id, points, wins, top4, top8, eighth, last_place)``. Оставшиеся игры
+    разыгрываются случайными перестановками мест с очками POINTS_BY_PLACE, проходят ``advance_count``
+    лучших по тем же ключам, что и в реальной таблице; равенство разрешает ручной приоритет судьи
+    из ``tie_breaks`` (``{user_id: priority}``), затем меньший user_id.
+    """
+    rng = rng or random.Random()
+    player_count = len(players)
+    if player_count != LOBBY_SIZE or remaining_games <= 0:
+        remaining_games = 0
+        simulations = 1
+
+    # Младший разряд — последние ключи сортировки таблицы: приоритет судьи, затем user_id (меньше — выше).
+    tie_breaks = tie_breaks or {}
+    tie_order = sorted(
+        (player[0] for player in players),
+        key=lambda user_id: (tie_breaks.get(user_id, UNSET_TIE_BREAK_PRIORITY), user_id),
+        reverse=True,
+    )
+    tie_rank = {user_id: rank for rank, user_id in enumerate(tie_order)}
+    base_scores = [
+        _encode_counters(*player[1:6], None if remaining_games else player[6], ordering) * player_count + tie_rank[player[0]]
+        for player in players
+    ]
+    game_deltas = [_place_delta(place, ordering) * player_count for place in range(1, LOBBY_SIZE + 1)]
+    last_game_deltas = [
+        delta + (COUNTER_BASE - 1 - place) * player_count for place, delta in enumerate(game_deltas, start=1)
+    ]
+
+    lobby_permutations = _lobby_permutations()
+    advanced_counts = [0] * player_count
+    cutoff_index = min(advance_count, player_count) - 1
+    for _ in range(simulations):
+        scores = base_scores
+        for game_index in range(remaining_games):
+            deltas = last_game_deltas if game_index == remaining_games - 1 else game_deltas
+            # Перестановка задаёт место каждого игрока: scores[i] получает прирост за место placement[i].
+            placement = rng.choice(lobby_permutations)
+            scores = [score + deltas[place_index] for score, place_index in zip(scores, placement)]
+        if cutoff_index < 0:
+            continue
+        cutoff = sorted(scores, reverse=True)[cutoff_index]
+        for index, score in enumerate(scores):
+            if score >= cutoff:
+                advanced_counts[index] += 1
+
+    return {player[0]: advanced_counts[index] / simulations for index, player in enumerate(players)}
+
+
+def _playoff_counters(participant: PlayoffParticipant) -> tuple[int, int, int, int, int, int, int]:
+    return (
+        participant.user_id,
+        participant.points or 0,
+        participant.wins or 0,
+        participant.top4_finishes or 0,
+        participant.top8_finishes or 0,
+        participant.eighth_places or 0,
+        participant.last_place or LOBBY_SIZE,
+    )
+
+
+def _group_counters(member: GroupMember) -> tuple[int, int, int, int, int, int, int]:
+    return (
+        member.user_id,
+        member.total_points or 0,
+        member.first_places or 0,
+        member.top4_finishes or 0,
+        member.top8_finishes or 0,
+        member.eighth_places or 0,
+        member.last_game_place or LOBBY_SIZE,
+    )
+
+
+async def load_advancement_inputs(db: AsyncSession, stage_id: int | None) -> dict[str, object]:
+    """Собирает снимок групп этапа для симуляции; ``stage_id=None`` — групповой (I) этап."""
+    groups: list[dict[str, object]] = []
+    if stage_id is None:
+        profile_spec = await get_current_tournament_profile_spec(db)
+        advance_count = max(
+            1, int(profile_spec["stage_1_promoted_count"]) // max(int(profile_spec["stage_1_groups_count"]), 1)
+        )
+        tournament_groups = list(
+            (
+                await db.scalars(
+                    select(TournamentGroup).where(TournamentGroup.stage == "group_stage").order_by(TournamentGroup.id)
+                )
+            ).all()
+        )
+        members = list(
+            (
+                await db.scalars(select(GroupMember).where(GroupMember.group_id.in_([group.id for group in tournament_groups])))
+            ).all()
+        )
+        members_by_group: dict[int, list[GroupMember]] = defaultdict(list)
+        for member in members:
+            members_by_group[member.group_id].append(member)
+        tie_breaks = await load_stage_tie_breaks(db, GROUP_STAGE_SCOPE)
+        for group_number, group in enumerate(tournament_groups, start=1):
+            groups.append(
+                {
+                    "group_number": group_number,
+                    "name": group.name,
+                    "remaining_games": max(GROUP_STAGE_GAME_LIMIT - (group.current_game - 1), 0),
+                    "players": [_group_counters(member) for member in members_by_group[group.id]],
+                    "tie_breaks": dict(tie_breaks.get(group.id, {})),
+                }
+            )
+        return {"stage_key": "group_stage", "ordering": GROUP_ORDERING, "advance_count": advance_count, "groups": groups}
+
+    stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.id == stage_id))
+    if not stage:
+        raise ValueError("Stage not found")
+    if not is_limited_stage(stage.key):
+        raise ValueError("stage_not_supported")
+    participants = list((await db.scalars(select(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id))).all())
+    matches = list((await db.scalars(select(PlayoffMatch).where(PlayoffMatch.stage_id == stage_id))).all())
+    match_by_group = {match.group_number: match for match in matches}
+    participants_by_group: dict[int, list[PlayoffParticipant]] = defaultdict(list)
+    for participant in participants:
+        participants_by_group[get_stage_group_number_by_seed(participant.seed)].append(participant)
+    tie_breaks = await load_stage_tie_breaks(db, stage_id)
+    for group_number in sorted(participants_by_group):
+        match = match_by_group.get(group_number)
+        games_played = max((match.game_number if match else 1) - 1, 0)
+        groups.append(
+            {
+                "group_number": group_number,
+                "name": str(group_number),
+                "remaining_games": 0 if match and match.state == "finished" else max(GROUP_STAGE_GAME_LIMIT - games_played, 0),
+                "players": [_playoff_counters(participant) for participant in participants_by_group[group_number]],
+                "tie_breaks": dict(tie_breaks.get(group_number, {})),
+            }
+        )
+    return {"stage_key": stage.key, "ordering": PLAYOFF_ORDERING, "advance_count": get_promote_top_n(stage.key), "groups": groups}
+
+
+def clear_advancement_odds_cache() -> None:
+    _odds_cache.clear()
+
+
+def simulate_stage_advancement(
+    inputs: dict[str, object],
+    *,
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: int | None = None,
+) -> dict[str, object]:
+    """Считает шансы выхода для всех групп снимка; одинаковый снимок берётся из кэша."""
+    cache_key = (
+        inputs["stage_key"],
+        simulations,
+        seed,
+        tuple(
+            (group["remaining_games"], tuple(sorted(group["players"])), tuple(sorted((group.get("tie_breaks") or {}).items())))
+            for group in inputs["groups"]
+        ),
+    )
+    cached = _odds_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rng = random.Random(seed)
+    result_groups = []
+    for group in inputs["groups"]:
+        odds = simulate_group_advancement(
+            group["players"],
+            remaining_games=group["remaining_games"],
+            advance_count=int(inputs["advance_count"]),
+            ordering=str(inputs["ordering"]),
+            tie_breaks=group.get("tie_breaks"),
+            simulations=simulations,
+            rng=rng,
+        )
+        result_groups.append(
+            {
+                "group_number": group["group_number"],
+                "name": group["name"],
+                "remaining_games": group["remaining_games"],
+                "players": [
+                    {"user_id": user_id, "probability": round(probability, 4)}
+                    for user_id, probability in sorted(odds.items(), key=lambda item: (-item[1], item[0]))
+                ],
+            }
+        )
+    result = {
+        "stage_key": inputs["stage_key"],
+        "advance_count": inputs["advance_count"],
+        "simulations": simulations,
+        "groups": result_groups,
+    }
+    # Держим только свежие снимки: после каждой новой игры ключ меняется.
+    if len(_odds_cache) >= 32:
+        _odds_cache.clear()
+    _odds_cache[cache_key] = result
+    return result
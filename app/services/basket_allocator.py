@@ -2,7 +2,14 @@
 
 from collections.abc import Mapping
 
-from app.models.user import Basket
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Basket, BasketCounter
+
+# Сколько участников помещается в ограниченную корзину до перехода в reserve.
+BASKET_LIMIT = 8
 
 LIMITED_BASKET_RESERVES: dict[str, str] = {
     Basket.QUEEN.value: Basket.QUEEN_RESERVE.value,
@@ -13,7 +20,7 @@ LIMITED_BASKET_RESERVES: dict[str, str] = {
 }
 
 
-def allocate_basket(target_basket: str, basket_counts: Mapping[str, int], limit: int = 8) -> str:
+def allocate_basket(target_basket: str, basket_counts: Mapping[str, int], limit: int = BASKET_LIMIT) -> str:
     """Возвращает итоговую корзину с учетом лимитов и reserve-корзин."""
     reserve_basket = LIMITED_BASKET_RESERVES.get(target_basket)
     if not reserve_basket:
@@ -23,3 +30,26 @@ def allocate_basket(target_basket: str, basket_counts: Mapping[str, int], limit:
     if current_count >= limit:
         return reserve_basket
     return target_basket
+
+
+async def lock_basket_counter(db: AsyncSession, basket: str) -> int:
+    """Блокирует строку счётчика корзины до конца транзакции и возвращает текущее число участников."""
+    await db.execute(
+        pg_insert(BasketCounter)
+        .values(basket=basket, members=0)
+        .on_conflict_do_nothing(index_elements=[BasketCounter.basket])
+    )
+    members = await db.scalar(select(BasketCounter.members).where(BasketCounter.basket == basket).with_for_update())
+    return int(members or 0)
+
+
+async def reserve_basket(db: AsyncSession, target_basket: str, limit: int = BASKET_LIMIT) -> str:
+    """Выбирает корзину для нового участника под блокировкой счётчика ограниченной корзины.
+
+    Блокировка держится до commit вставки пользователя, а счётчик увеличивает триггер на users,
+    поэтому параллельные регистрации в одну корзину видят уже учтённых участников и не переполняют её.
+    """
+    if target_basket not in LIMITED_BASKET_RESERVES:
+        return target_basket
+    members = await lock_basket_counter(db, target_basket)
+    return allocate_basket(target_basket, {target_basket: members}, limit=limit)
@@ -0,0 +1,141 @@
+"""Ограничивает частоту сообщений чата по токену отправителя и IP без запроса к истории сообщений."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+import time
+
+from sqlalchemy import case, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.chat import ChatCooldown
+
+# Один отправитель — одно сообщение за окно; с одного IP (NAT, общий Wi-Fi) — несколько.
+CHAT_SENDER_MESSAGES_PER_WINDOW = 1
+CHAT_IP_MESSAGES_PER_WINDOW = 5
+# Потолок числа ключей в памяти: флуд новыми токенами вытесняет самые старые окна, а не растит словарь.
+MEMORY_LIMITER_MAX_KEYS = 50_000
+# Общий бэкенд чистит истёкшие окна раз в столько проверок процесса.
+POSTGRES_CLEANUP_EVERY = 500
+
+Limits = Sequence[tuple[str, int]]
+
+
+def chat_send_limits(sender_token: str, ip_address: str) -> tuple[tuple[str, int], ...]:
+    return (
+        (f"sender:{sender_token}", CHAT_SENDER_MESSAGES_PER_WINDOW),
+        (f"ip:{ip_address}", CHAT_IP_MESSAGES_PER_WINDOW),
+    )
+
+
+class MemoryChatCooldownLimiter:
+    """Счётчики фиксированного окна в памяти процесса: ``{ключ: [конец окна, сообщений в окне]}``.
+
+    Окна лежат в порядке открытия, истёкшие снимаются с головы при каждой проверке, поэтому память
+    ограничена активными отправителями и ``max_keys``. Состояние своё у каждого воркера.
+    """
+
+    def __init__(self, max_keys: int = MEMORY_LIMITER_MAX_KEYS, clock: Callable[[], float] = time.monotonic) -> None:
+        self._windows: OrderedDict[str, list[float]] = OrderedDict()
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    async def try_acquire(self, db: AsyncSession | None, limits: Limits, window_seconds: int) -> bool:
+        if window_seconds <= 0:
+            return True
+        now = self._clock()
+        windows = self._windows
+        for key, limit in limits:
+            window = windows.get(key)
+            if window is not None and window[0] > now and window[1] >= limit:
+                return False
+
+        for key, _limit in limits:
+            window = windows.get(key)
+            if window is None or window[0] <= now:
+                windows[key] = [now + window_seconds, 1]
+                windows.move_to_end(key)
+            else:
+                window[1] += 1
+        self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        windows = self._windows
+        while windows:
+            expires_at = next(iter(windows.values()))[0]
+            if expires_at > now and len(windows) <= self._max_keys:
+                break
+            windows.popitem(last=False)
+
+    def reset(self) -> None:
+        self._windows = OrderedDict()
+
+
+class PostgresChatCooldownLimiter:
+    """Общие для всех воркеров окна в таблице ``chat_cooldowns``: одна атомарная вставка с ON CONFLICT.
+
+    Счётчики обновляются в точке сохранения внутри транзакции отправки: при отказе откатывается только она,
+    и отклонённая попытка не занимает окно, а остальная работа сессии запроса не теряется; при успехе окно
+    фиксируется вместе с сообщением.
+    """
+
+    def __init__(self, cleanup_every: int = POSTGRES_CLEANUP_EVERY) -> None:
+        self._cleanup_every = cleanup_every
+        self._checks = 0
+
+    async def try_acquire(self, db: AsyncSession, limits: Limits, window_seconds: int) -> bool:
+        if window_seconds <= 0:
+            return True
+        now = datetime.utcnow()
+        insert_statement = pg_insert(ChatCooldown).values(
+            [{"key": key, "expires_at": now + timedelta(seconds=window_seconds), "hits": 1} for key, _limit in limits]
+        )
+        window_expired = ChatCooldown.expires_at <= now
+        statement = insert_statement.on_conflict_do_update(
+            index_elements=[ChatCooldown.key],
+            set_={
+                "expires_at": case((window_expired, insert_statement.excluded.expires_at), else_=ChatCooldown.expires_at),
+                "hits": case((window_expired, 1), else_=ChatCooldown.hits + 1),
+            },
+        ).returning(ChatCooldown.key, ChatCooldown.hits)
+        limit_by_key = dict(limits)
+        savepoint = await db.begin_nested()
+        rows = (await db.execute(statement)).all()
+        if any(hits > limit_by_key[key] for key, hits in rows):
+            await savepoint.rollback()
+            return False
+        await savepoint.commit()
+
+        self._checks += 1
+        if self._checks % self._cleanup_every == 0:
+            await db.execute(delete(ChatCooldown).where(ChatCooldown.expires_at <= now))
+        return True
+
+    def reset(self) -> None:
+        self._checks = 0
+
+
+memory_chat_cooldown_limiter = MemoryChatCooldownLimiter()
+postgres_chat_cooldown_limiter = PostgresChatCooldownLimiter()
+
+
+def get_chat_cooldown_limiter() -> MemoryChatCooldownLimiter | PostgresChatCooldownLimiter:
+    if settings.chat_rate_limit_backend == "postgres":
+        return postgres_chat_cooldown_limiter
+    return memory_chat_cooldown_limiter
+
+
+async def acquire_chat_send_slot(db: AsyncSession, *, sender_token: str, ip_address: str, cooldown_seconds: int) -> bool:
+    """Занимает место в окне ``cooldown_seconds`` для отправителя и его IP; False — сообщение отклоняется."""
+    return await get_chat_cooldown_limiter().try_acquire(db, chat_send_limits(sender_token, ip_address), cooldown_seconds)
+
+
+def reset_chat_cooldowns() -> None:
+    memory_chat_cooldown_limiter.reset()
+    postgres_chat_cooldown_limiter.reset()
@@ -0,0 +1,119 @@
+"""Переносит старые сообщения чата в архив короткими пачками и отдаёт архив страницами по id."""
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chat import ChatMessage, ChatMessageArchive
+from app.models.settings import ChatSetting
+
+logger = logging.getLogger(__name__)
+
+# Не больше стольких пачек за один проход: остальное доберёт следующий запуск.
+MAX_BATCHES_PER_RUN = 20
+# Как часто /chat/send запускает перенос в фоне (секунды, на процесс).
+RETENTION_RUN_INTERVAL_SECONDS = 600
+CHAT_ARCHIVE_PAGE_SIZE = 50
+
+_ARCHIVED_COLUMNS = ("id", "temp_nick", "nick_color", "message", "ip_address", "sender_token", "created_at")
+
+_retention_lock = asyncio.Lock()
+# Первый запуск — через интервал после старта процесса, а не на первом сообщении.
+_last_run_started = time.monotonic()
+
+
+async def archive_chat_batch(db: AsyncSession, *, cutoff: datetime, batch_size: int) -> int:
+    """Переносит до ``batch_size`` самых старых сообщений до ``cutoff`` одним запросом и фиксирует транзакцию.
+
+    DELETE ... RETURNING внутри INSERT ... SELECT: строки блокируются только на время пачки, а занятые
+    параллельной правкой пропускаются (SKIP LOCKED) и уйдут в следующий раз.
+    """
+    batch_ids = (
+        select(ChatMessage.id)
+        .where(ChatMessage.created_at < cutoff)
+        .order_by(ChatMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(ChatMessage)
+        .where(ChatMessage.id.in_(batch_ids))
+        .returning(*(getattr(ChatMessage, column) for column in _ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    result = await db.execute(
+        insert(ChatMessageArchive).from_select(
+            list(_ARCHIVED_COLUMNS), select(*(moved.c[column] for column in _ARCHIVED_COLUMNS))
+        )
+    )
+    await db.commit()
+    return max(result.rowcount or 0, 0)
+
+
+async def archive_expired_chat_messages(
+    db: AsyncSession,
+    *,
+    retention_days: int,
+    batch_size: int,
+    max_batches: int = MAX_BATCHES_PER_RUN,
+    now: datetime | None = None,
+) -> int:
+    """Переносит сообщения старше ``retention_days`` пачками; возвращает число перенесённых строк."""
+    if retention_days <= 0 or batch_size <= 0:
+        return 0
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    archived = 0
+    for _ in range(max_batches):
+        moved = await archive_chat_batch(db, cutoff=cutoff, batch_size=batch_size)
+        archived += moved
+        if moved < batch_size:
+            break
+    return archived
+
+
+async def run_chat_retention(session_factory: Callable[[], AsyncSession]) -> int:
+    """Фоновый проход переноса со своей сессией: настройки берутся из ChatSetting, ошибки только логируются."""
+    if _retention_lock.locked():
+        return 0
+    async with _retention_lock:
+        try:
+            async with session_factory() as db:
+                chat_settings = await db.scalar(select(ChatSetting).where(ChatSetting.id == 1))
+                if not chat_settings:
+                    return 0
+                return await archive_expired_chat_messages(
+                    db,
+                    retention_days=chat_settings.retention_days or 0,
+                    batch_size=chat_settings.archive_batch_size or 0,
+                )
+        except Exception:  # noqa: BLE001
+            logger.exception("Chat retention run failed")
+            return 0
+
+
+def claim_chat_retention_run(interval_seconds: int = RETENTION_RUN_INTERVAL_SECONDS) -> bool:
+    """True не чаще раза в ``interval_seconds`` на процесс — тогда вызывающий запускает run_chat_retention."""
+    global _last_run_started
+    now = time.monotonic()
+    if now - _last_run_started < interval_seconds:
+        return False
+    _last_run_started = now
+    return True
+
+
+async def load_chat_archive_page(
+    db: AsyncSession, *, before_id: int | None = None, limit: int = CHAT_ARCHIVE_PAGE_SIZE
+) -> tuple[list[ChatMessageArchive], int | None]:
+    """Страница архива по убыванию id (keyset): сообщения с id меньше ``before_id`` и курсор следующей."""
+    statement = select(ChatMessageArchive).order_by(ChatMessageArchive.id.desc()).limit(limit + 1)
+    if before_id is not None:
+        statement = statement.where(ChatMessageArchive.id < before_id)
+    rows = list((await db.scalars(statement)).all())
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
@@ -0,0 +1,45 @@
+"""Кэширует очищенный HTML контента (правила, ссылки и реквизиты доната) по хешу исходного текста."""
+
+from collections import OrderedDict
+from collections.abc import Callable
+import hashlib
+
+# Локализованные тексты правил, ссылки, кошельки и сообщения доноров — десятки строк; запас на правки.
+CONTENT_HTML_CACHE_SIZE = 512
+
+
+class SanitizedHtmlCache:
+    """LRU ``sha256(исходный HTML) → очищенный HTML``.
+
+    Ключ — хеш содержимого, поэтому инвалидация не нужна: изменённый текст просто даёт новый ключ,
+    а старый вытесняется по LRU. Сохранение в админке прогревает кэш, публичные страницы только читают.
+    """
+
+    def __init__(self, max_entries: int = CONTENT_HTML_CACHE_SIZE) -> None:
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._max_entries = max_entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, raw_html: str, sanitize: Callable[[str], str]) -> str:
+        key = hashlib.sha256(raw_html.encode("utf-8")).digest()
+        sanitized = self._entries.get(key)
+        if sanitized is not None:
+            self._entries.move_to_end(key)
+            return sanitized
+        sanitized = sanitize(raw_html)
+        self._entries[key] = sanitized
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return sanitized
+
+    def clear(self) -> None:
+        self._entries = OrderedDict()
+
+
+sanitized_content_cache = SanitizedHtmlCache()
+
+
+def clear_sanitized_content_cache() -> None:
+    sanitized_content_cache.clear()
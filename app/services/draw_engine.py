@@ -0,0 +1,67 @@
+"""Раскладывает участников по группам жеребьёвки за линейное время для любого формата групп."""
+
+import random
+from collections import defaultdict
+from collections.abc import Callable, Mapping, Sequence
+from typing import TypeVar
+
+PlayerT = TypeVar("PlayerT")
+
+
+def draw_groups(
+    players: Sequence[PlayerT],
+    *,
+    group_count: int,
+    group_size: int,
+    basket_of: Callable[[PlayerT], str],
+    quota_baskets: Mapping[str, str],
+    pool_baskets: Sequence[str],
+    rng: random.Random,
+) -> list[list[PlayerT]]:
+    """Возвращает `group_count` групп до `group_size` игроков, равномерно распределяя корзины.
+
+    Сначала каждая группа по кругу добирает квоту из корзин `quota_baskets` (основная → reserve,
+    если основная пуста), затем свободные места заполняются случайной выборкой из `pool_baskets`,
+    разложенной по корзинам и раздаваемой по кругу. Все шаги линейны по числу игроков.
+    """
+    buckets: dict[str, list[PlayerT]] = defaultdict(list)
+    for player in players:
+        buckets[basket_of(player)].append(player)
+    # Перемешиваем в фиксированном порядке корзин, чтобы один seed давал одну и ту же жеребьёвку.
+    for basket in sorted(buckets):
+        rng.shuffle(buckets[basket])
+
+    groups: list[list[PlayerT]] = [[] for _ in range(group_count)]
+    picks_per_basket = group_size // len(quota_baskets) if quota_baskets else 0
+    for basket, reserve_basket in quota_baskets.items():
+        for _ in range(picks_per_basket):
+            for group in groups:
+                if len(group) >= group_size:
+                    continue
+                source = buckets[basket] if buckets[basket] else buckets[reserve_basket]
+                if not source:
+                    break
+                group.append(source.pop())
+
+    open_seats = sum(group_size - len(group) for group in groups)
+    pool = [player for basket in pool_baskets for player in buckets.get(basket, [])]
+    if len(pool) > open_seats:
+        rng.shuffle(pool)
+        pool = pool[:open_seats]
+
+    basket_rank = {basket: index for index, basket in enumerate(pool_baskets)}
+    pool_by_basket: list[list[PlayerT]] = [[] for _ in pool_baskets]
+    for player in pool:
+        pool_by_basket[basket_rank[basket_of(player)]].append(player)
+
+    # Свободные места по кругу: соседние игроки одной корзины попадают в разные группы.
+    seat_order = [
+        group_index
+        for seat_round in range(group_size)
+        for group_index, group in enumerate(groups)
+        if len(group) <= seat_round
+    ]
+    ordered_pool = (player for bucket in pool_by_basket for player in bucket)
+    for group_index, player in zip(seat_order, ordered_pool):
+        groups[group_index].append(player)
+    return groups
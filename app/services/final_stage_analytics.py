@@ -0,0 +1,213 @@
+"""Считает границы финала «22 + топ-1»: кто может победить, кто гарантировал топ-3 и сколько игр минимум осталось."""
+
+from collections.abc import Sequence
+from itertools import permutations
+
+from app.models.tournament import PlayoffParticipant, PlayoffStage
+from app.services.tournament import POINTS_BY_PLACE, playoff_sort_key
+from app.services.tournament_stage_config import FINAL_STAGE_SCORING_MODE, FINAL_WIN_POINTS
+
+LOBBY_SIZE = 8
+# Сколько различных таблиц перебирает поиск на одного игрока; дальше ответ «не доказано», а не «гарантировано».
+CLINCH_SEARCH_BUDGET = 3000
+WIN_GAME_POINTS = POINTS_BY_PLACE[1]
+# Очки за 2–7 места: проверяемый игрок в худшем случае всегда восьмой и ничего не добирает.
+FOLLOWER_POINTS = tuple(POINTS_BY_PLACE[place] for place in range(2, LOBBY_SIZE))
+
+_analytics_cache: dict[tuple[object, ...], dict[str, object]] = {}
+
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+
+def min_games_to_win(points: int) -> int:
+    """Минимум игр до победы: добрать 22 очка первыми местами и затем выиграть ещё одну игру."""
+    if points >= FINAL_WIN_POINTS:
+        return 1
+    return -(-(FINAL_WIN_POINTS - points) // WIN_GAME_POINTS) + 1
+
+
+def _games_to_threshold(points: int) -> int:
+    return -(-(FINAL_WIN_POINTS - points) // WIN_GAME_POINTS) if points < FINAL_WIN_POINTS else 0
+
+
+def _can_finish_above(state: tuple[int, ...], winner_index: int, target: int) -> bool:
+    # Завершающая игра: победитель берёт 1-е место, хватит ли 2–7 мест, чтобы ещё двое догнали target.
+    needs = sorted(max(target - points, 0) for index, points in enumerate(state) if index != winner_index)
+    gains = sorted(FOLLOWER_POINTS)
+    caught_up = 0
+    for need in needs:
+        gain = next((gain for gain in gains if gain >= need), None)
+        if gain is None:
+            continue
+        gains.remove(gain)
+        caught_up += 1
+    return caught_up >= 2
+
+
+def can_be_pushed_out_of_top3(points: int, other_points: Sequence[int], *, budget: int = CLINCH_SEARCH_BUDGET) -> bool | None:
+    """Ищет расклад оставшихся игр, в котором игрок с ``points`` очками не попадает в топ-3.
+
+    Ветви и границы по очкам: проверяемый игрок всегда занимает 8-е место, равенство очков считается
+    обгоном (тай-брейки не моделируются), финал заканчивается, когда 1-е место берёт игрок с 22+.
+    Возвращает True/False, если ответ доказан, и None, если перебор упёрся в ``budget`` таблиц.
+    """
+    target = points
+    cap = max(target, FINAL_WIN_POINTS)
+    start = tuple(sorted(min(value, cap) for value in other_points))
+    seen: dict[tuple[int, ...], bool] = {}
+
+    def search(state: tuple[int, ...]) -> bool:
+        if state in seen:
+            return seen[state]
+        if len(seen) >= budget:
+            raise _SearchBudgetExceeded
+        seen[state] = False
+        if sum(1 for value in state if value >= target) >= 3:
+            seen[state] = True
+            return True
+
+        # Каждая незавершающая игра снижает суммарный недобор до 22 хотя бы на одну «победу»,
+        # поэтому таких игр осталось не больше games_left — отсюда верхняя граница прироста очков.
+        games_left = sum(_games_to_threshold(value) for value in state)
+        needs = sorted(
+            target - value
+            for value in state
+            if value >= target
+            or value
+            + WIN_GAME_POINTS * min(_games_to_threshold(value), games_left)
+            + FOLLOWER_POINTS[0] * (games_left - min(_games_to_threshold(value), games_left) + 1)
+            >= target
+        )
+        pair_gain = WIN_GAME_POINTS + FOLLOWER_POINTS[0]
+        if len(needs) < 2 or needs[0] + needs[1] > pair_gain * games_left + FOLLOWER_POINTS[0] + FOLLOWER_POINTS[1]:
+            return False
+
+        next_states: set[tuple[int, ...]] = set()
+        for winner_index, winner_points in enumerate(state):
+            if winner_index and winner_points == state[winner_index - 1]:
+                continue
+            if winner_points >= FINAL_WIN_POINTS:
+                if _can_finish_above(state, winner_index, target):
+                    seen[state] = True
+                    return True
+                continue
+            rest = [value for index, value in enumerate(state) if index != winner_index]
+            # Игрокам, уже упёршимся в потолок, достаются оставшиеся места: очки им больше ничего не дают.
+            open_rest = [value for value in rest if value < cap]
+            capped_count = len(rest) - len(open_rest)
+            for gains in permutations(FOLLOWER_POINTS, len(open_rest)):
+                next_states.add(
+                    tuple(
+                        sorted(
+                            [min(winner_points + WIN_GAME_POINTS, cap)]
+                            + [min(value + gain, cap) for value, gain in zip(open_rest, gains)]
+                            + [cap] * capped_count
+                        )
+                    )
+                )
+        for next_state in sorted(
+            next_states, key=lambda item: (-sum(1 for value in item if value >= target), -sum(item))
+        ):
+            if search(next_state):
+                seen[state] = True
+                return True
+        return False
+
+    try:
+        return search(start)
+    except _SearchBudgetExceeded:
+        return None
+
+
+def analyze_final_standings(
+    participants: Sequence[PlayoffParticipant],
+    *,
+    winner_user_id: int | None = None,
+    budget: int = CLINCH_SEARCH_BUDGET,
+) -> dict[str, object]:
+    """Возвращает аналитику финала по текущим агрегатам участников.
+
+    ``clinched_top3`` выставляется только когда перебор доказал, что игрока не обойти;
+    при исчерпании бюджета поиска игрок считается негарантированным.
+    """
+    players: list[dict[str, object]] = []
+    if winner_user_id is not None:
+        # Финал решён: топ-3 — победитель и двое лучших из остальных по ключу таблицы.
+        runners_up = sorted(
+            (participant for participant in participants if participant.user_id != winner_user_id),
+            key=playoff_sort_key,
+            reverse=True,
+        )[:2]
+        podium = {winner_user_id, *(participant.user_id for participant in runners_up)}
+        for participant in sorted(participants, key=playoff_sort_key, reverse=True):
+            players.append(
+                {
+                    "user_id": participant.user_id,
+                    "points": participant.points or 0,
+                    "min_games_to_win": 0 if participant.user_id == winner_user_id else None,
+                    "can_win_next_game": False,
+                    "can_still_win": participant.user_id == winner_user_id,
+                    "clinched_top3": participant.user_id in podium,
+                }
+            )
+        return {"is_finished": True, "winner_user_id": winner_user_id, "min_games_remaining": 0, "players": players}
+
+    for participant in sorted(participants, key=playoff_sort_key, reverse=True):
+        points = participant.points or 0
+        other_points = [other.points or 0 for other in participants if other is not participant]
+        if len(other_points) < 3:
+            clinched = True
+        elif len(participants) != LOBBY_SIZE:
+            clinched = False
+        else:
+            clinched = can_be_pushed_out_of_top3(points, other_points, budget=budget) is False
+        players.append(
+            {
+                "user_id": participant.user_id,
+                "points": points,
+                "min_games_to_win": min_games_to_win(points),
+                "can_win_next_game": points >= FINAL_WIN_POINTS,
+                # Первое место в каждой игре доступно любому, поэтому до победы шанс сохраняют все.
+                "can_still_win": True,
+                "clinched_top3": clinched,
+            }
+        )
+    return {
+        "is_finished": False,
+        "winner_user_id": None,
+        "min_games_remaining": min((player["min_games_to_win"] for player in players), default=0),
+        "players": players,
+    }
+
+
+def get_final_stage_analytics(stage: PlayoffStage) -> dict[str, object] | None:
+    """Аналитика для загруженного финала с участниками и матчами; None для других стадий.
+
+    Результат кэшируется по номеру игры и очкам участников — пересчёт только после новой игры.
+    """
+    if stage.key != "stage_final" or (stage.scoring_mode or FINAL_STAGE_SCORING_MODE) != FINAL_STAGE_SCORING_MODE:
+        return None
+    match = next((item for item in stage.matches if item.group_number == 1), None)
+    winner_user_id = (match.manual_winner_user_id or match.winner_user_id) if match else None
+    cache_key = (
+        stage.id,
+        match.game_number if match else 1,
+        winner_user_id,
+        tuple(sorted((participant.user_id, participant.points or 0) for participant in stage.participants)),
+    )
+    cached = _analytics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = {
+        "stage_id": stage.id,
+        "games_played": max((match.game_number if match else 1) - 1, 0),
+        **analyze_final_standings(stage.participants, winner_user_id=winner_user_id),
+    }
+    # После каждой игры ключ меняется, старые снимки не нужны.
+    if len(_analytics_cache) >= 32:
+        _analytics_cache.clear()
+    _analytics_cache[cache_key] = result
+    return result
@@ -14,6 +14,8 @@ TRANSLATIONS = {
         "submit": "Submit",
         "already_registered": "You are already registered",
         "registered_ok": "Registration completed",
+        "msg_registration_pending": "Application accepted, loading your AutoChess profile…",
+        "msg_registration_profile_failed": "Could not load your AutoChess profile, please try again later",
         "registration_closed": "Registration closed, tournament started",
         "msg_invalid_steam_id": "Invalid Steam ID",
         "msg_chat_disabled": "Chat is disabled",
@@ -36,6 +38,8 @@ TRANSLATIONS = {
         "msg_player_replaced": "Player replaced",
         "msg_points_adjusted": "Points adjusted",
         "msg_playoff_game_saved": "Playoff game saved",
+        "msg_playoff_game_undone": "Last playoff game undone",
+        "msg_playoff_results_imported": "Playoff results imported, games",
         "msg_invalid_playoff_stage": "Invalid playoff stage selected",
         "msg_donation_links_saved": "Donation links saved",
         "msg_donation_methods_saved": "Donation methods saved",
@@ -44,6 +48,7 @@ TRANSLATIONS = {
         "msg_rules_saved": "Rules saved",
         "msg_archive_saved": "Archive saved",
         "msg_chat_settings_saved": "Chat settings saved",
+        "msg_chat_archived": "Old chat messages archived",
         "msg_admin_chat_message_saved": "Chat message saved",
         "msg_admin_chat_message_deleted": "Chat message deleted",
         "msg_admin_chat_message_not_found": "Chat message not found",
@@ -69,6 +74,7 @@ TRANSLATIONS = {
         "participants_game": "Game",
         "participants_current": "Current",
         "participants_highest": "Highest",
+        "participants_load_more": "Load more",
         "participants_telegram": "Telegram",
         "participants_telegram_optional": "(optional)",
         "participants_discord": "Discord",
@@ -157,6 +163,14 @@ TRANSLATIONS = {
         "admin_delete": "Delete",
         "admin_confirm_delete_user": "Delete this participant and related tournament data?",
         "admin_chat_messages_empty": "No chat messages yet.",
+        "admin_chat_retention_days": "Move messages older than, days (0 — keep all)",
+        "admin_chat_archive_batch_size": "Archive batch size",
+        "admin_chat_archive_now": "Archive old messages",
+        "admin_chat_archive": "Chat archive",
+        "admin_chat_archive_open": "Open archive",
+        "admin_chat_archive_empty": "The archive is empty.",
+        "admin_chat_archive_newest": "Newest",
+        "admin_chat_archive_older": "Older",
         "admin_rules_content": "Rules content",
         "admin_rules_text": "Rules text",
         "admin_rules_html_hint": "Rules support HTML formatting. Allowed tags are filtered for safety.",
@@ -177,8 +191,16 @@ TRANSLATIONS = {
         "admin_save_pw": "Save PW",
         "admin_generate_pin": "Generate PIN",
         "admin_save_game_result": "Save game result",
+        "admin_undo_last_game": "Undo last game",
+        "admin_final_analytics": "Final analytics",
+        "admin_final_min_games_remaining": "Minimum games left",
+        "admin_final_min_games_to_win": "Min. games to win",
+        "admin_final_clinched_top3": "Top-3 clinched",
+        "admin_import_results": "Import results (CSV or JSON)",
+        "admin_import_results_hint": "One game per line: group_number,id1,...,id8 — or JSON [{\"group_number\": 1, \"placements\": [...]}]. All games are validated first and saved together.",
         "admin_save_tie_break": "Save tie-break",
         "admin_save_tie_break_help": "Use only for completely tied participants: points, 1st places, top-4 finishes, 8th places, and last game place must all be equal.",
+        "admin_tie_break_user_ids": "Player IDs from higher to lower, comma-separated",
         "admin_help_examples_title": "Examples",
         "admin_save_tie_break_example": "Example: two players have identical points and all tie-break stats; use this action to set their final order.",
         "admin_groups_not_created": "Groups are not created yet",
@@ -319,6 +341,8 @@ TRANSLATIONS = {
         "submit": "提交",
         "already_registered": "您已经报名",
         "registered_ok": "报名成功",
+        "msg_registration_pending": "报名申请已受理，正在获取 AutoChess 资料…",
+        "msg_registration_profile_failed": "无法获取 AutoChess 资料，请稍后重试",
         "registration_closed": "报名已关闭，比赛已开始",
         "msg_invalid_steam_id": "Steam ID 无效",
         "msg_chat_disabled": "聊天已关闭",
@@ -341,6 +365,8 @@ TRANSLATIONS = {
         "msg_player_replaced": "选手已替换",
         "msg_points_adjusted": "积分已调整",
         "msg_playoff_game_saved": "淘汰赛结果已保存",
+        "msg_playoff_game_undone": "已撤销最近一场淘汰赛结果",
+        "msg_playoff_results_imported": "淘汰赛结果已批量导入，场次",
         "msg_invalid_playoff_stage": "所选淘汰赛阶段无效",
         "msg_donation_links_saved": "赞助链接已保存",
         "msg_donation_methods_saved": "支付方式已保存",
@@ -349,6 +375,7 @@ TRANSLATIONS = {
         "msg_rules_saved": "规则已保存",
         "msg_archive_saved": "历史记录已保存",
         "msg_chat_settings_saved": "聊天设置已保存",
+        "msg_chat_archived": "旧聊天消息已归档",
         "msg_admin_chat_message_saved": "聊天消息已保存",
         "msg_admin_chat_message_deleted": "聊天消息已删除",
         "msg_admin_chat_message_not_found": "未找到聊天消息",
@@ -374,6 +401,7 @@ TRANSLATIONS = {
         "participants_game": "游戏昵称",
         "participants_current": "当前段位",
         "participants_highest": "最高段位",
+        "participants_load_more": "加载更多",
         "participants_telegram": "Telegram",
         "participants_telegram_optional": "（可选）",
         "participants_discord": "Discord",
@@ -490,6 +518,8 @@ TRANSLATIONS = {
         "submit": "Отправить",
         "already_registered": "Вы уже зарегистрированы",
         "registered_ok": "Регистрация завершена",
+        "msg_registration_pending": "Заявка принята, загружаем профиль AutoChess…",
+        "msg_registration_profile_failed": "Не удалось загрузить профиль AutoChess, попробуйте позже",
         "registration_closed": "Регистрация закрыта, турнир начался",
         "msg_invalid_steam_id": "Неверный Steam ID",
         "msg_chat_disabled": "Чат отключен",
@@ -512,6 +542,8 @@ TRANSLATIONS = {
         "msg_player_replaced": "Игрок заменен",
         "msg_points_adjusted": "Очки скорректированы",
         "msg_playoff_game_saved": "Результат плей-офф сохранен",
+        "msg_playoff_game_undone": "Последняя игра плей-офф отменена",
+        "msg_playoff_results_imported": "Результаты плей-офф импортированы, игр",
         "msg_invalid_playoff_stage": "Выбран некорректный этап плей-офф",
         "msg_donation_links_saved": "Ссылки на донат сохранены",
         "msg_donation_methods_saved": "Методы доната сохранены",
@@ -520,6 +552,7 @@ TRANSLATIONS = {
         "msg_rules_saved": "Правила сохранены",
         "msg_archive_saved": "Архив сохранен",
         "msg_chat_settings_saved": "Настройки чата сохранены",
+        "msg_chat_archived": "Старые сообщения чата перенесены в архив",
         "msg_admin_chat_message_saved": "Сообщение чата сохранено",
         "msg_admin_chat_message_deleted": "Сообщение чата удалено",
         "msg_admin_chat_message_not_found": "Сообщение чата не найдено",
@@ -545,6 +578,7 @@ TRANSLATIONS = {
         "participants_game": "Игра",
         "participants_current": "Текущий",
         "participants_highest": "Максимальный",
+        "participants_load_more": "Показать ещё",
         "participants_telegram": "Telegram",
         "participants_telegram_optional": "(необязательно)",
         "participants_discord": "Discord",
@@ -633,6 +667,14 @@ TRANSLATIONS = {
         "admin_delete": "Удалить",
         "admin_confirm_delete_user": "Удалить участника и связанные турнирные данные?",
         "admin_chat_messages_empty": "Сообщений чата пока нет.",
+        "admin_chat_retention_days": "Переносить сообщения старше, дней (0 — хранить все)",
+        "admin_chat_archive_batch_size": "Размер пачки архивации",
+        "admin_chat_archive_now": "Архивировать старые сообщения",
+        "admin_chat_archive": "Архив чата",
+        "admin_chat_archive_open": "Открыть архив",
+        "admin_chat_archive_empty": "Архив пуст.",
+        "admin_chat_archive_newest": "Новые",
+        "admin_chat_archive_older": "Старее",
         "admin_rules_content": "Содержимое правил",
         "admin_rules_text": "Текст правил",
         "admin_rules_html_hint": "Правила поддерживают HTML-форматирование. Разрешённые теги фильтруются для безопасности.",
@@ -653,8 +695,16 @@ TRANSLATIONS = {
         "admin_save_pw": "Сохранить PW",
         "admin_generate_pin": "Сгенерировать PIN",
         "admin_save_game_result": "Сохранить результат игры",
+        "admin_undo_last_game": "Отменить последнюю игру",
+        "admin_final_analytics": "Аналитика финала",
+        "admin_final_min_games_remaining": "Минимум игр до конца",
+        "admin_final_min_games_to_win": "Мин. игр до победы",
+        "admin_final_clinched_top3": "Гарантирован топ-3",
+        "admin_import_results": "Импорт результатов (CSV или JSON)",
+        "admin_import_results_hint": "По игре на строку: group_number,id1,...,id8 — или JSON [{\"group_number\": 1, \"placements\": [...]}]. Все игры проверяются заранее и сохраняются вместе.",
         "admin_save_tie_break": "Сохранить тай-брейк",
         "admin_save_tie_break_help": "Работает только для полностью равных участников: очки, 1-е места, top-4, 8-е места и место в последней игре должны совпадать.",
+        "admin_tie_break_user_ids": "ID игроков сверху вниз через запятую",
         "admin_help_examples_title": "Примеры",
         "admin_save_tie_break_example": "Пример: у двух игроков полностью совпали очки и все tie-break показатели; этой кнопкой задайте итоговый порядок.",
         "admin_groups_not_created": "Группы пока не созданы",
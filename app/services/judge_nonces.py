@@ -0,0 +1,108 @@
+"""Делает judge-токены одноразовыми: хранит использованные nonce до истечения токена."""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admin_session import read_judge_login_token
+from app.core.config import settings
+from app.models.settings import UsedJudgeNonce
+
+# Потолок числа nonce в памяти: при переполнении вытесняются самые старые, а не растёт множество.
+MEMORY_NONCE_STORE_MAX_KEYS = 10_000
+# Общий бэкенд чистит истёкшие nonce раз в столько входов процесса.
+POSTGRES_CLEANUP_EVERY = 50
+
+
+class MemoryJudgeNonceStore:
+    """Использованные nonce в памяти процесса: ``{nonce: expires_at}`` в порядке использования.
+
+    Истёкшие снимаются с головы при каждом входе; токен с истёкшим nonce и так отвергнет проверка срока.
+    Состояние своё у каждого воркера.
+    """
+
+    def __init__(self, max_keys: int = MEMORY_NONCE_STORE_MAX_KEYS, clock: Callable[[], float] = time.time) -> None:
+        self._nonces: OrderedDict[str, int] = OrderedDict()
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._nonces)
+
+    async def try_consume(self, db: AsyncSession | None, nonce: str, expires_at: int) -> bool:
+        now = self._clock()
+        self._evict(now)
+        if nonce in self._nonces:
+            return False
+        self._nonces[nonce] = expires_at
+        self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        nonces = self._nonces
+        while nonces:
+            expires_at = next(iter(nonces.values()))
+            if expires_at >= now and len(nonces) <= self._max_keys:
+                break
+            nonces.popitem(last=False)
+
+    def reset(self) -> None:
+        self._nonces = OrderedDict()
+
+
+class PostgresJudgeNonceStore:
+    """Общие для всех воркеров nonce в таблице ``used_judge_nonces``: вставка с ON CONFLICT DO NOTHING.
+
+    Вставка идёт в транзакции входа, поэтому nonce фиксируется вместе с очисткой сохранённого токена.
+    """
+
+    def __init__(self, cleanup_every: int = POSTGRES_CLEANUP_EVERY) -> None:
+        self._cleanup_every = cleanup_every
+        self._consumed = 0
+
+    async def try_consume(self, db: AsyncSession, nonce: str, expires_at: int) -> bool:
+        statement = (
+            pg_insert(UsedJudgeNonce)
+            .values(nonce=nonce, expires_at=datetime.utcfromtimestamp(expires_at))
+            .on_conflict_do_nothing(index_elements=[UsedJudgeNonce.nonce])
+            .returning(UsedJudgeNonce.nonce)
+        )
+        if (await db.execute(statement)).first() is None:
+            return False
+
+        self._consumed += 1
+        if self._consumed % self._cleanup_every == 0:
+            await db.execute(delete(UsedJudgeNonce).where(UsedJudgeNonce.expires_at < datetime.utcnow()))
+        return True
+
+    def reset(self) -> None:
+        self._consumed = 0
+
+
+memory_judge_nonce_store = MemoryJudgeNonceStore()
+postgres_judge_nonce_store = PostgresJudgeNonceStore()
+
+
+def get_judge_nonce_store() -> MemoryJudgeNonceStore | PostgresJudgeNonceStore:
+    if settings.judge_nonce_backend == "postgres":
+        return postgres_judge_nonce_store
+    return memory_judge_nonce_store
+
+
+async def consume_judge_login_token(db: AsyncSession, token: str | None) -> bool:
+    """True — токен подписан, не истёк и предъявлен впервые; nonce помечается использованным."""
+    parsed = read_judge_login_token(token)
+    if not parsed:
+        return False
+    nonce, expires_at = parsed
+    return await get_judge_nonce_store().try_consume(db, nonce, expires_at)
+
+
+def reset_judge_nonces() -> None:
+    memory_judge_nonce_store.reset()
+    postgres_judge_nonce_store.reset()
@@ -0,0 +1,61 @@
+"""Кэширует сумму призового фонда: SUM(amount) по донорам и ручную сумму для страницы доната."""
+
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.settings import Donor, SiteSetting
+
+DONATE_HIGHLIGHT_AMOUNT_SETTING_KEY = "donate_highlight_amount"
+
+
+class PrizePoolTotals:
+    """Итоги призового фонда: сумма взносов доноров и заданная в админке сумма для показа (или пустая строка)."""
+
+    __slots__ = ("donor_total", "highlight_amount")
+
+    def __init__(self, donor_total: Decimal, highlight_amount: str) -> None:
+        self.donor_total = donor_total
+        self.highlight_amount = highlight_amount
+
+
+class PrizePoolTotalsCache:
+    """Процессный кэш итогов призового фонда; сбрасывается ручками доноров и суммы доната."""
+
+    def __init__(self) -> None:
+        self._totals: PrizePoolTotals | None = None
+        # Растёт при каждом сбросе: загрузка, пересекшаяся с правкой доноров, не кладётся в кэш.
+        self._generation = 0
+
+    async def get(self, db: AsyncSession) -> PrizePoolTotals:
+        if self._totals is not None:
+            return self._totals
+
+        generation = self._generation
+        donor_total = await db.scalar(select(func.coalesce(func.sum(Donor.amount), 0)))
+        highlight_setting = await db.scalar(
+            select(SiteSetting).where(SiteSetting.key == DONATE_HIGHLIGHT_AMOUNT_SETTING_KEY)
+        )
+        totals = PrizePoolTotals(
+            donor_total=Decimal(donor_total or 0),
+            highlight_amount=(highlight_setting.value or "").strip() if highlight_setting else "",
+        )
+        if generation == self._generation:
+            self._totals = totals
+        return totals
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._totals = None
+
+
+prize_pool_totals_cache = PrizePoolTotalsCache()
+
+
+async def get_prize_pool_totals(db: AsyncSession) -> PrizePoolTotals:
+    return await prize_pool_totals_cache.get(db)
+
+
+def invalidate_prize_pool_totals() -> None:
+    prize_pool_totals_cache.invalidate()
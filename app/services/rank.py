@@ -1,6 +1,6 @@
 """Считает рейтинговые показатели и сортировку участников."""
 
-from app.models.user import Basket
+from app.models.user import Basket, User
 
 
 MMR_THRESHOLDS: list[tuple[str, int]] = [
@@ -44,6 +44,18 @@ MMR_THRESHOLDS: list[tuple[str, int]] = [
     ("Pawn-1", 0),
 ]
 
+# Порядок групп рангов для сортировки участников; Knight и Pawn делят одну группу Low Rank.
+RANK_TIER_PREFIXES: list[tuple[str, ...]] = [
+    ("Queen",),
+    ("King",),
+    ("Rook",),
+    ("Bishop",),
+    ("Knight", "Pawn"),
+]
+RANK_TIER_UNKNOWN = len(RANK_TIER_PREFIXES)
+RANK_DIVISION_UNKNOWN = 999999
+RANK_DIVISION_TITLES = ("King", "Rook", "Bishop", "Knight", "Pawn")
+
 
 def mmr_to_rank(mmr: int, queen_rank: int | None = None) -> str:
     # Конвертируем MMR в текстовый ранг.
@@ -73,3 +85,34 @@ def pick_basket(highest_rank: str, current_rank: str) -> str:
     if highest_rank.startswith("Bishop"):
         return Basket.BISHOP.value
     return Basket.LOW_RANK.value
+
+
+def rank_sort_key(highest_rank: str | None) -> tuple[int, int]:
+    # Считаем (группа ранга, дивизион) для ORDER BY по целым колонкам users.rank_tier/rank_division.
+    rank = highest_rank or ""
+    rank_tier = next(
+        (tier for tier, prefixes in enumerate(RANK_TIER_PREFIXES) if rank.startswith(prefixes)),
+        RANK_TIER_UNKNOWN,
+    )
+
+    if rank.startswith("Queen#"):
+        try:
+            return rank_tier, int(rank.replace("Queen#", ""))
+        except ValueError:
+            return rank_tier, RANK_DIVISION_UNKNOWN
+    if rank == "Queen":
+        return rank_tier, RANK_DIVISION_UNKNOWN
+    for title in RANK_DIVISION_TITLES:
+        if rank.startswith(f"{title}-"):
+            try:
+                return rank_tier, int(rank.replace(f"{title}-", ""))
+            except ValueError:
+                return rank_tier, 0
+        if rank.startswith(title):
+            return rank_tier, 0
+    return rank_tier, RANK_DIVISION_UNKNOWN
+
+
+def apply_rank_sort_columns(user: User) -> None:
+    # Синхронизируем материализованный ключ сортировки после изменения highest_rank.
+    user.rank_tier, user.rank_division = rank_sort_key(user.highest_rank)
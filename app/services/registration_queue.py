@@ -0,0 +1,234 @@
+"""Принимает заявки на регистрацию сразу, а профиль AutoChess и корзину дозаполняет в фоне."""
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import json
+import logging
+import uuid
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.settings import SiteSetting
+from app.models.user import PendingRegistration, User
+from app.services.basket_allocator import reserve_basket
+from app.services.rank import apply_rank_sort_columns, pick_basket
+from app.services.steam import fetch_autochess_data, normalize_steam_id, steam_id_without_lookup
+from app.services.user_directory import refresh_user_directory_entry
+
+logger = logging.getLogger(__name__)
+
+REGISTRATION_PENDING = "pending"
+REGISTRATION_DONE = "done"
+REGISTRATION_FAILED = "failed"
+# Заявка в pending дольше этого времени считается потерянной (рестарт воркера) и ставится в обработку заново.
+STALE_PENDING_AFTER = timedelta(minutes=2)
+MAX_ENRICHMENT_ATTEMPTS = 3
+
+# Ограничивает число одновременных обращений к внешним API, а не число принятых заявок.
+_enrichment_slots = asyncio.Semaphore(max(1, settings.registration_enrichment_concurrency))
+# Заявки, задача обработки которых уже ждёт слота или выполняется в этом процессе.
+_queued_registrations: set[int] = set()
+
+
+def queue_enrichment(registration_id: int) -> bool:
+    """Отмечает заявку поставленной в обработку; False — задача для неё в этом процессе уже есть."""
+    if registration_id in _queued_registrations:
+        return False
+    _queued_registrations.add(registration_id)
+    return True
+
+
+def reset_registration_queue() -> None:
+    _queued_registrations.clear()
+
+
+async def accept_registration(
+    db: AsyncSession,
+    *,
+    steam_input: str,
+    nickname: str,
+    telegram: str | None,
+) -> PendingRegistration | str:
+    """Быстрая фаза: проверки без внешних API и запись заявки. Строка вместо заявки — ключ ошибки i18n."""
+    steam_id = steam_id_without_lookup(steam_input)
+    if steam_id:
+        if await db.scalar(select(User.id).where(User.steam_id == steam_id)):
+            return "already_registered"
+        active = await db.scalar(
+            select(PendingRegistration).where(
+                PendingRegistration.steam_id == steam_id,
+                PendingRegistration.status == REGISTRATION_PENDING,
+            )
+        )
+        if active:
+            return active
+
+    registration = PendingRegistration(
+        token=uuid.uuid4().hex,
+        steam_input=steam_input,
+        steam_id=steam_id,
+        nickname=nickname,
+        telegram=telegram or None,
+        status=REGISTRATION_PENDING,
+        attempts=0,
+    )
+    db.add(registration)
+    await db.commit()
+    return registration
+
+
+async def revive_stale_registration(db: AsyncSession, registration: PendingRegistration, now: datetime | None = None) -> bool:
+    """True — заявка застряла в pending (воркер перезапускался) и поставлена в обработку заново.
+
+    Заявка, задача которой ещё ждёт слота в этом процессе, не ставится повторно. Задачи с других воркеров
+    отсекает условный захват в ``enrich_pending_registration``. После MAX_ENRICHMENT_ATTEMPTS застрявшая
+    заявка закрывается с ошибкой, чтобы опрос статуса не шёл вечно.
+    """
+    if registration.status != REGISTRATION_PENDING or registration.id in _queued_registrations:
+        return False
+    updated_at = registration.updated_at or registration.created_at
+    if updated_at and (now or datetime.utcnow()) - updated_at <= STALE_PENDING_AFTER:
+        return False
+    if (registration.attempts or 0) < MAX_ENRICHMENT_ATTEMPTS:
+        return queue_enrichment(registration.id)
+    registration.status = REGISTRATION_FAILED
+    registration.error = "msg_registration_profile_failed"
+    await db.commit()
+    return False
+
+
+async def _registration_closed(db: AsyncSession) -> bool:
+    # Те же флаги, что у формы регистрации: пока заявка ждала профиль, турнир мог начаться или приём закрыться.
+    tournament_started = await db.scalar(select(SiteSetting.value).where(SiteSetting.key == "tournament_started"))
+    registration_open = await db.scalar(select(SiteSetting.value).where(SiteSetting.key == "registration_open"))
+    return tournament_started == "1" or (registration_open is not None and registration_open != "1")
+
+
+async def _finish_registration(db: AsyncSession, registration: PendingRegistration, steam_id: str, profile: dict) -> None:
+    error = None
+    if await _registration_closed(db):
+        error = "registration_closed"
+    elif await db.scalar(select(User.id).where(User.steam_id == steam_id)):
+        error = "already_registered"
+    if error:
+        registration.status = REGISTRATION_FAILED
+        registration.error = error
+        registration.updated_at = datetime.utcnow()
+        await db.commit()
+        return
+
+    basket = await reserve_basket(db, pick_basket(profile["highest_rank"], profile["current_rank"]))
+    user = User(
+        nickname=registration.nickname,
+        steam_input=registration.steam_input,
+        steam_id=steam_id,
+        game_nickname=profile["game_nickname"],
+        current_rank=profile["current_rank"],
+        highest_rank=profile["highest_rank"],
+        telegram=registration.telegram,
+        basket=basket,
+        extra_data=json.dumps(profile["raw"], ensure_ascii=False),
+    )
+    apply_rank_sort_columns(user)
+    db.add(user)
+    await db.flush()
+    registration.steam_id = steam_id
+    registration.user_id = user.id
+    registration.status = REGISTRATION_DONE
+    registration.updated_at = datetime.utcnow()
+    await db.commit()
+    refresh_user_directory_entry(user)
+
+
+async def _claim_registration(db: AsyncSession, registration_id: int) -> tuple[str, str | None] | None:
+    """Захватывает заявку одним условным UPDATE: ещё не начатую или брошенную дольше STALE_PENDING_AFTER.
+
+    Дубли задачи (повторный опрос, другой воркер) получают None и не ходят во внешние API.
+    """
+    now = datetime.utcnow()
+    claimed = await db.execute(
+        update(PendingRegistration)
+        .where(
+            PendingRegistration.id == registration_id,
+            PendingRegistration.status == REGISTRATION_PENDING,
+            or_(PendingRegistration.attempts == 0, PendingRegistration.updated_at < now - STALE_PENDING_AFTER),
+        )
+        .values(attempts=PendingRegistration.attempts + 1, updated_at=now)
+        .returning(PendingRegistration.steam_input, PendingRegistration.steam_id)
+    )
+    row = claimed.first()
+    await db.commit()
+    return (row[0], row[1]) if row else None
+
+
+async def _enrich_claimed_registration(session_factory: Callable[[], AsyncSession], registration_id: int) -> str | None:
+    async with session_factory() as db:
+        claimed = await _claim_registration(db, registration_id)
+    if claimed is None:
+        return None
+    steam_input, steam_id = claimed
+
+    # Соединение с БД уже возвращено в пул: медленный внешний API его не держит.
+    error = None
+    profile = None
+    try:
+        steam_id = steam_id or await normalize_steam_id(steam_input)
+        if not steam_id:
+            error = "msg_invalid_steam_id"
+        else:
+            profile = await fetch_autochess_data(steam_id)
+    except Exception:  # noqa: BLE001
+        logger.warning("Registration enrichment failed", extra={"registration_id": registration_id}, exc_info=True)
+        error = "msg_registration_profile_failed"
+
+    async with session_factory() as db:
+        registration = await db.get(PendingRegistration, registration_id)
+        if not registration or registration.status != REGISTRATION_PENDING:
+            return None
+        if error:
+            registration.status = REGISTRATION_FAILED
+            registration.error = error
+            registration.updated_at = datetime.utcnow()
+            await db.commit()
+            return registration.status
+        try:
+            await _finish_registration(db, registration, steam_id, profile)
+        except IntegrityError:
+            # Тот же steam_id успел зарегистрироваться параллельно.
+            await db.rollback()
+            registration = await db.get(PendingRegistration, registration_id)
+            if not registration or registration.status != REGISTRATION_PENDING:
+                return None
+            registration.status = REGISTRATION_FAILED
+            registration.error = "already_registered"
+            await db.commit()
+        return registration.status
+
+
+async def enrich_pending_registration(session_factory: Callable[[], AsyncSession], registration_id: int) -> str | None:
+    """Фоновая фаза: Steam/AutoChess вне транзакции, затем короткая транзакция с корзиной и пользователем.
+
+    Возвращает итоговый статус заявки или None, если обрабатывать было нечего.
+    """
+    try:
+        async with _enrichment_slots:
+            return await _enrich_claimed_registration(session_factory, registration_id)
+    finally:
+        _queued_registrations.discard(registration_id)
+
+
+REGISTRATION_STATUS_MESSAGES = {
+    REGISTRATION_PENDING: "msg_registration_pending",
+    REGISTRATION_DONE: "registered_ok",
+}
+
+
+def registration_status_message(registration: PendingRegistration) -> str:
+    """Ключ i18n для показа статуса заявки."""
+    if registration.status == REGISTRATION_FAILED:
+        return registration.error or "msg_registration_profile_failed"
+    return REGISTRATION_STATUS_MESSAGES.get(registration.status, "msg_registration_pending")
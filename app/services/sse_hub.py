@@ -0,0 +1,133 @@
+"""Раздаёт события чата SSE-подписчикам: очередь на подключение, лимиты подключений и общий heartbeat."""
+
+import asyncio
+from collections.abc import AsyncIterator
+import json
+
+# События чата идемпотентны («что-то изменилось — перечитай»), поэтому переполненная очередь
+# медленного клиента схлопывается в одно событие пересинхронизации вместо накопления кадров.
+RESYNC_EVENT = "chat_update"
+# Точечные события: клиент применяет их к уже показанному списку без запроса к серверу.
+CHAT_CREATED_EVENT = "chat_created"
+CHAT_UPDATED_EVENT = "chat_updated"
+CHAT_DELETED_EVENT = "chat_deleted"
+CHAT_CLEARED_EVENT = "chat_cleared"
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_CONNECTIONS = 5000
+DEFAULT_MAX_CONNECTIONS_PER_IP = 20
+DEFAULT_HEARTBEAT_SECONDS = 25.0
+
+
+def format_sse_frame(event: str, data: object = None) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data if data is not None else {}, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+PING_FRAME = format_sse_frame("ping")
+RESYNC_FRAME = format_sse_frame(RESYNC_EVENT)
+
+
+class SseSubscription:
+    """Одно SSE-подключение: ограниченная очередь готовых кадров и IP для учёта лимита."""
+
+    __slots__ = ("queue", "ip_address", "dropped")
+
+    def __init__(self, ip_address: str, queue_size: int) -> None:
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.ip_address = ip_address
+        # Сколько раз очередь схлопывалась из-за медленного чтения.
+        self.dropped = 0
+
+    def offer(self, frame: str) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: выбрасываем накопленное, он перечитает чат целиком.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+            self.dropped += 1
+
+
+class SseHub:
+    """Процессный хаб SSE: публикация кладёт кадр в очередь каждого подписчика без пробуждения всех сразу.
+
+    Heartbeat — одна фоновая задача на воркер, она живёт, пока есть подписчики, и пишет ``ping``
+    только в пустые очереди. Отключение клиента обнаруживает StreamingResponse, опрос не нужен.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_ip: int = DEFAULT_MAX_CONNECTIONS_PER_IP,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS,
+    ) -> None:
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.max_connections_per_ip = max_connections_per_ip
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: set[SseSubscription] = set()
+        self._connections_by_ip: dict[str, int] = {}
+        self._heartbeat_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, ip_address: str) -> SseSubscription | None:
+        """Регистрирует подключение; None — исчерпан лимит воркера или IP."""
+        if len(self._subscribers) >= self.max_connections:
+            return None
+        if self._connections_by_ip.get(ip_address, 0) >= self.max_connections_per_ip:
+            return None
+        subscription = SseSubscription(ip_address, self.queue_size)
+        # Первый кадр сразу: клиент подтягивает сообщения, пропущенные между загрузкой страницы и подпиской.
+        subscription.offer(RESYNC_FRAME)
+        self._subscribers.add(subscription)
+        self._connections_by_ip[ip_address] = self._connections_by_ip.get(ip_address, 0) + 1
+        self._ensure_heartbeat()
+        return subscription
+
+    def unsubscribe(self, subscription: SseSubscription) -> None:
+        if subscription not in self._subscribers:
+            return
+        self._subscribers.discard(subscription)
+        remaining = self._connections_by_ip.get(subscription.ip_address, 1) - 1
+        if remaining > 0:
+            self._connections_by_ip[subscription.ip_address] = remaining
+        else:
+            self._connections_by_ip.pop(subscription.ip_address, None)
+
+    async def publish(self, event: str = RESYNC_EVENT, data: object = None) -> None:
+        self.broadcast(format_sse_frame(event, data))
+
+    def broadcast(self, frame: str) -> None:
+        for subscription in tuple(self._subscribers):
+            subscription.offer(frame)
+
+    async def events(self, subscription: SseSubscription) -> AsyncIterator[str]:
+        try:
+            while True:
+                yield await subscription.queue.get()
+        finally:
+            self.unsubscribe(subscription)
+
+    def _ensure_heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        task = self._heartbeat_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._heartbeat_task = loop.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for subscription in tuple(self._subscribers):
+                if subscription.queue.empty():
+                    subscription.queue.put_nowait(PING_FRAME)
+
+    def reset(self) -> None:
+        # Задача heartbeat сама завершится на следующем тике: подписчиков больше нет.
+        self._subscribers = set()
+        self._connections_by_ip = {}
+        self._heartbeat_task = None
@@ -0,0 +1,354 @@
+"""Хранит готовые таблицы групп: порядок, статус выхода и равенства считаются один раз при записи результата."""
+
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from typing import TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tournament import (
+    GroupManualTieBreak,
+    GroupMember,
+    PlayoffManualTieBreak,
+    PlayoffMatch,
+    PlayoffParticipant,
+    PlayoffStage,
+    TournamentGroup,
+)
+from app.services.tournament_stage_config import GROUP_STAGE_GAME_LIMIT, get_promote_top_n, is_limited_stage
+
+GROUP_STAGE_SCOPE = "group_stage"
+# Сколько игроков группы I этапа подсвечиваются как вышедшие после трёх игр.
+GROUP_STAGE_PROMOTE_COUNT = 3
+# Игроки без ручного тай-брейка стоят после расставленных судьёй, между собой — по user_id.
+UNSET_TIE_BREAK_PRIORITY = 1_000_000
+
+RowT = TypeVar("RowT")
+TieBreaks = Mapping[int, int]
+
+
+def group_member_sort_key(
+    member: GroupMember, tie_breaks: TieBreaks | None = None
+) -> tuple[int, int, int, int, int, int, int, int]:
+    # По возрастанию: очки, победы, топ-4 и топ-8 по убыванию, 8-е места и последнее место по возрастанию,
+    # затем ручной приоритет судьи.
+    return (
+        -member.total_points,
+        -member.first_places,
+        -member.top4_finishes,
+        -member.top8_finishes,
+        member.eighth_places,
+        member.last_game_place,
+        (tie_breaks or {}).get(member.user_id, UNSET_TIE_BREAK_PRIORITY),
+        member.user_id,
+    )
+
+
+def playoff_sort_key(
+    participant: PlayoffParticipant, tie_breaks: TieBreaks | None = None
+) -> tuple[int, int, int, int, int, int, int]:
+    return (
+        participant.points,
+        participant.wins,
+        participant.top4_finishes,
+        participant.top8_finishes,
+        -participant.last_place,
+        -(tie_breaks or {}).get(participant.user_id, UNSET_TIE_BREAK_PRIORITY),
+        -participant.user_id,
+    )
+
+
+def playoff_tie_key(participant: PlayoffParticipant) -> tuple[int, int, int, int, int]:
+    """Ключ равенства результатов без учета seed (seed используется только как стабильный fallback)."""
+    return (
+        participant.points,
+        participant.wins,
+        participant.top4_finishes,
+        participant.top8_finishes,
+        -participant.last_place,
+    )
+
+
+class GroupStandings:
+    """Упорядоченная таблица одной группы: позиции, ранги с учётом равенств и статусы выхода."""
+
+    __slots__ = ("user_ids", "tie_ranks", "statuses", "_positions")
+
+    def __init__(self, user_ids: tuple[int, ...], tie_ranks: tuple[int, ...], statuses: tuple[str, ...]) -> None:
+        self.user_ids = user_ids
+        # Ранг как в спорте: равные по показателям и не разведённые судьёй игроки делят наименьшее место.
+        self.tie_ranks = tie_ranks
+        self.statuses = statuses
+        self._positions = {user_id: index for index, user_id in enumerate(user_ids)}
+
+    def position(self, user_id: int) -> int:
+        """Место игрока в таблице, начиная с 1."""
+        return self._positions[user_id] + 1
+
+    def status(self, user_id: int) -> str:
+        return self.statuses[self._positions[user_id]]
+
+    def is_tied(self, user_id: int) -> bool:
+        """Делит ли игрок ранг с соседом по таблице — порядок между ними решил только user_id."""
+        index = self._positions[user_id]
+        tie_rank = self.tie_ranks[index]
+        return (index > 0 and self.tie_ranks[index - 1] == tie_rank) or (
+            index + 1 < len(self.tie_ranks) and self.tie_ranks[index + 1] == tie_rank
+        )
+
+    def covers(self, user_ids: set[int]) -> bool:
+        return user_ids == self._positions.keys()
+
+    def order(self, rows: Sequence[RowT], user_id_of: Callable[[RowT], int] = lambda row: row.user_id) -> list[RowT]:
+        """Раскладывает строки группы в порядке таблицы без повторной сортировки по ключам."""
+        return sorted(rows, key=lambda row: self._positions[user_id_of(row)])
+
+
+def _rank(
+    ranked: Sequence[object],
+    user_ids: tuple[int, ...],
+    tie_key: Callable[[object], Hashable],
+    *,
+    finished: bool,
+    promote_count: int,
+) -> GroupStandings:
+    # Один проход по отсортированной группе: соседи с одинаковым ключом образуют группу равенства.
+    tie_ranks: list[int] = []
+    previous_key: Hashable = None
+    for index, item in enumerate(ranked):
+        key = tie_key(item)
+        tie_ranks.append(tie_ranks[-1] if index and key == previous_key else index + 1)
+        previous_key = key
+    statuses = tuple(
+        "normal" if not finished or promote_count <= 0 else "promoted" if position <= promote_count else "eliminated"
+        for position in range(1, len(ranked) + 1)
+    )
+    return GroupStandings(user_ids, tuple(tie_ranks), statuses)
+
+
+def rank_group_members(
+    group: TournamentGroup, members: Sequence[GroupMember], tie_breaks: TieBreaks | None = None
+) -> GroupStandings:
+    ranked = sorted(members, key=lambda member: group_member_sort_key(member, tie_breaks))
+    return _rank(
+        ranked,
+        tuple(member.user_id for member in ranked),
+        # Без последнего разряда (user_id): приоритет судьи различает игроков, а user_id — нет.
+        lambda member: group_member_sort_key(member, tie_breaks)[:-1],
+        finished=(getattr(group, "current_game", 1) or 1) > GROUP_STAGE_GAME_LIMIT,
+        promote_count=GROUP_STAGE_PROMOTE_COUNT,
+    )
+
+
+def rank_playoff_participants(
+    stage: PlayoffStage,
+    participants: Sequence[PlayoffParticipant],
+    match: PlayoffMatch | None,
+    tie_breaks: TieBreaks | None = None,
+) -> GroupStandings:
+    ranked = sorted(participants, key=lambda participant: playoff_sort_key(participant, tie_breaks), reverse=True)
+    return _rank(
+        ranked,
+        tuple(participant.user_id for participant in ranked),
+        lambda participant: playoff_sort_key(participant, tie_breaks)[:-1],
+        finished=bool(match) and is_limited_stage(stage.key) and match.game_number > GROUP_STAGE_GAME_LIMIT,
+        promote_count=get_promote_top_n(stage.key),
+    )
+
+
+class StandingsCache:
+    """Процессный кэш таблиц по этапам: ``{этап: {группа: GroupStandings}}`` и ручных тай-брейков этапов.
+
+    Запись результата пересчитывает таблицу своей группы, тай-брейки и ручные правки очков её сбрасывают.
+    Страницы только читают; пустое место заполняется первым просмотром, но не перетирает свежую запись
+    и не кладётся, если кэш менялся после того, как просмотр снял ``generation`` и начал читать строки.
+    """
+
+    def __init__(self) -> None:
+        self._stages: dict[Hashable, dict[int, GroupStandings]] = {}
+        self._tie_breaks: dict[Hashable, dict[int, dict[int, int]]] = {}
+        # Растёт при каждой записи и сбросе: таблица из строк, прочитанных до них, не кладётся в кэш.
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, stage_scope: Hashable, group_key: int, user_ids: set[int]) -> GroupStandings | None:
+        standings = self._stages.get(stage_scope, {}).get(group_key)
+        # Состав группы поменялся (замена, перенос) — запись относится к другой группе игроков.
+        if standings is None or not standings.covers(user_ids):
+            return None
+        return standings
+
+    def put(self, stage_scope: Hashable, group_key: int, standings: GroupStandings) -> None:
+        self._generation += 1
+        self._stages.setdefault(stage_scope, {})[group_key] = standings
+
+    def fill(
+        self, stage_scope: Hashable, group_key: int, standings: GroupStandings, generation: int
+    ) -> GroupStandings:
+        if generation != self._generation:
+            return standings
+        groups = self._stages.setdefault(stage_scope, {})
+        current = groups.get(group_key)
+        # Запись результата могла успеть раньше просмотра — её таблица свежее.
+        if current is not None and current.covers(set(standings.user_ids)):
+            return current
+        groups[group_key] = standings
+        return standings
+
+    def tie_breaks(self, stage_scope: Hashable) -> dict[int, dict[int, int]] | None:
+        return self._tie_breaks.get(stage_scope)
+
+    def group_tie_breaks(self, stage_scope: Hashable, group_key: int | None) -> TieBreaks:
+        return self._tie_breaks.get(stage_scope, {}).get(group_key, {})
+
+    def put_tie_breaks(self, stage_scope: Hashable, tie_breaks: dict[int, dict[int, int]], generation: int) -> None:
+        if generation != self._generation:
+            return
+        self._generation += 1
+        self._tie_breaks[stage_scope] = tie_breaks
+        # Таблицы групп с приоритетами могли быть посчитаны до загрузки — без них.
+        groups = self._stages.get(stage_scope, {})
+        for group_key in tie_breaks:
+            groups.pop(group_key, None)
+
+    def invalidate_tie_breaks(self, stage_scope: Hashable) -> None:
+        self._generation += 1
+        self._tie_breaks.pop(stage_scope, None)
+
+    def invalidate_group(self, stage_scope: Hashable, group_key: int) -> None:
+        self._generation += 1
+        self._stages.get(stage_scope, {}).pop(group_key, None)
+
+    def invalidate_stage(self, stage_scope: Hashable) -> None:
+        self._generation += 1
+        self._stages.pop(stage_scope, None)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._stages = {}
+        self._tie_breaks = {}
+
+
+standings_cache = StandingsCache()
+
+
+async def load_stage_tie_breaks(db: AsyncSession, stage_scope: Hashable) -> dict[int, dict[int, int]]:
+    """Ручные тай-брейки этапа одним запросом: ``{группа: {user_id: priority}}``, дальше — из кэша.
+
+    ``GROUP_STAGE_SCOPE`` — группы I этапа по ``group_id``; иначе ``stage_id`` плей-офф и номер группы.
+    """
+    cached = standings_cache.tie_breaks(stage_scope)
+    if cached is not None:
+        return cached
+
+    generation = standings_cache.generation
+    tie_breaks: dict[int, dict[int, int]] = {}
+    if stage_scope == GROUP_STAGE_SCOPE:
+        for row in (await db.scalars(select(GroupManualTieBreak))).all():
+            tie_breaks.setdefault(row.group_id, {})[row.user_id] = row.priority
+    else:
+        rows = await db.scalars(select(PlayoffManualTieBreak).where(PlayoffManualTieBreak.stage_id == stage_scope))
+        for row in rows.all():
+            tie_breaks.setdefault(row.group_number, {})[row.user_id] = row.priority
+    standings_cache.put_tie_breaks(stage_scope, tie_breaks, generation)
+    return tie_breaks
+
+
+async def preload_tie_breaks(db: AsyncSession, playoff_stages: Sequence[PlayoffStage] = ()) -> None:
+    """Загружает тай-брейки I этапа и переданных этапов плей-офф перед построением таблиц страницы."""
+    await load_stage_tie_breaks(db, GROUP_STAGE_SCOPE)
+    for stage in playoff_stages:
+        stage_id = getattr(stage, "id", None)
+        if stage_id is not None:
+            await load_stage_tie_breaks(db, stage_id)
+
+
+def standings_generation() -> int:
+    """Снимок версии кэша: берётся до чтения строк страницы и передаётся в ``get_*_standings``."""
+    return standings_cache.generation
+
+
+def get_group_stage_standings(
+    group: TournamentGroup, members: Sequence[GroupMember], *, generation: int | None = None
+) -> GroupStandings:
+    """Таблица группы I этапа из кэша; при промахе считается по переданным участникам.
+
+    Посчитанная таблица кладётся в кэш только со снимком ``generation``, снятым до чтения ``members``.
+    """
+    group_id = getattr(group, "id", None)
+    standings = standings_cache.get(GROUP_STAGE_SCOPE, group_id, {member.user_id for member in members})
+    if standings is None:
+        standings = rank_group_members(group, members, standings_cache.group_tie_breaks(GROUP_STAGE_SCOPE, group_id))
+        if generation is not None and group_id is not None:
+            standings = standings_cache.fill(GROUP_STAGE_SCOPE, group_id, standings, generation)
+    return standings
+
+
+def get_playoff_group_standings(
+    stage: PlayoffStage,
+    group_number: int,
+    participants: Sequence[PlayoffParticipant],
+    match: PlayoffMatch | None,
+    *,
+    generation: int | None = None,
+) -> GroupStandings:
+    """Таблица группы этапа плей-офф из кэша; при промахе считается по переданным участникам.
+
+    Посчитанная таблица кладётся в кэш только со снимком ``generation``, снятым до чтения ``participants``.
+    """
+    stage_id = getattr(stage, "id", None)
+    standings = standings_cache.get(stage_id, group_number, {participant.user_id for participant in participants})
+    if standings is None:
+        standings = rank_playoff_participants(
+            stage, participants, match, standings_cache.group_tie_breaks(stage_id, group_number)
+        )
+        if generation is not None and stage_id is not None:
+            standings = standings_cache.fill(stage_id, group_number, standings, generation)
+    return standings
+
+
+def store_group_stage_standings(group: TournamentGroup, members: Sequence[GroupMember]) -> GroupStandings:
+    """Пересчитывает и сохраняет таблицу группы I этапа после записи её результата."""
+    standings = rank_group_members(group, members, standings_cache.group_tie_breaks(GROUP_STAGE_SCOPE, group.id))
+    standings_cache.put(GROUP_STAGE_SCOPE, group.id, standings)
+    return standings
+
+
+def store_playoff_group_standings(
+    stage: PlayoffStage,
+    group_number: int,
+    participants: Sequence[PlayoffParticipant],
+    match: PlayoffMatch | None,
+) -> GroupStandings:
+    """Пересчитывает и сохраняет таблицу группы плей-офф после записи её результата."""
+    standings = rank_playoff_participants(
+        stage, participants, match, standings_cache.group_tie_breaks(stage.id, group_number)
+    )
+    standings_cache.put(stage.id, group_number, standings)
+    return standings
+
+
+def invalidate_group_stage_standings(group_id: int) -> None:
+    standings_cache.invalidate_group(GROUP_STAGE_SCOPE, group_id)
+
+
+def invalidate_playoff_standings(stage_id: int, group_number: int | None = None) -> None:
+    """Сбрасывает таблицу одной группы этапа или, без ``group_number``, всего этапа."""
+    if group_number is None:
+        standings_cache.invalidate_stage(stage_id)
+    else:
+        standings_cache.invalidate_group(stage_id, group_number)
+
+
+def invalidate_stage_tie_breaks(stage_scope: Hashable, group_key: int) -> None:
+    """После сохранения тай-брейка: перечитать приоритеты этапа и пересчитать таблицу группы."""
+    standings_cache.invalidate_tie_breaks(stage_scope)
+    standings_cache.invalidate_group(stage_scope, group_key)
+
+
+def invalidate_standings() -> None:
+    """Сбрасывает все таблицы после массовых изменений: сброс цикла, правка очков игрока во всех этапах."""
+    standings_cache.invalidate()
@@ -13,21 +13,17 @@ STEAM_ID2_RE = re.compile(r"^STEAM_0:([01]):(\d+)$", re.IGNORECASE)
 VANITY_RE = re.compile(r"^[a-zA-Z0-9_\-]+$")
 
 
-async def normalize_steam_id(raw_value: str) -> str | None:
-    """Нормализует пользовательский Steam идентификатор в Steam64 из числовых и vanity форматов."""
+def steam_id_without_lookup(raw_value: str) -> str | None:
+    """Steam64 из ввода, если его можно вывести без запросов к Steam (всё, кроме vanity)."""
     value = (raw_value or "").strip()
     # Возвращаем корректный Steam64 как есть.
     if STEAM64_RE.match(value):
         return value
 
-    # Пробуем извлечь профиль из полного URL.
+    # Профиль /profiles/<steam64> в полном URL.
     profile_candidate = _extract_profile_id_from_url(value)
     if profile_candidate:
-        if STEAM64_RE.match(profile_candidate):
-            return profile_candidate
-        resolved = await resolve_vanity(profile_candidate)
-        if resolved:
-            return resolved
+        return profile_candidate if STEAM64_RE.match(profile_candidate) else None
 
     # Конвертируем укороченный цифровой ID в Steam64.
     if value.isdigit() and len(value) < 17:
@@ -40,6 +36,21 @@ async def normalize_steam_id(raw_value: str) -> str | None:
         y = int(steam_id2.group(2))
         return str(76561197960265728 + y * 2 + x)
 
+    return None
+
+
+async def normalize_steam_id(raw_value: str) -> str | None:
+    """Нормализует пользовательский Steam идентификатор в Steam64 из числовых и vanity форматов."""
+    value = (raw_value or "").strip()
+    steam_id = steam_id_without_lookup(value)
+    if steam_id:
+        return steam_id
+
+    # Vanity из полного URL резолвим через Steam.
+    profile_candidate = _extract_profile_id_from_url(value)
+    if profile_candidate:
+        return await resolve_vanity(profile_candidate)
+
     # Пытаемся резолвить plain vanity nickname.
     if VANITY_RE.match(value):
         return await resolve_vanity(value)
@@ -1,12 +1,15 @@
 """Реализует основную бизнес-логику управления турниром и сеткой матчей."""
 
 from collections import defaultdict
+import csv
+import io
 import json
 import random
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import Integer, case, column, delete, func, insert, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.settings import SiteSetting
 from app.models.tournament_archive import TournamentArchive
@@ -14,12 +17,28 @@ from app.models.tournament import (
     GroupGameResult,
     GroupManualTieBreak,
     GroupMember,
+    PlayoffGameResult,
+    PlayoffManualTieBreak,
     PlayoffMatch,
     PlayoffParticipant,
+    PlayoffPointAdjustment,
     PlayoffStage,
     TournamentGroup,
 )
 from app.models.user import Basket, User
+from app.services.draw_engine import draw_groups
+from app.services.standings_cache import (
+    GROUP_STAGE_SCOPE,
+    group_member_sort_key,
+    invalidate_playoff_standings,
+    invalidate_stage_tie_breaks,
+    invalidate_standings,
+    load_stage_tie_breaks,
+    playoff_sort_key,
+    rank_playoff_participants,
+    store_group_stage_standings,
+    store_playoff_group_standings,
+)
 from app.services.tournament_stage_config import (
     DEFAULT_TOURNAMENT_PROFILE_KEY,
     FINAL_STAGE_SCORING_MODES,
@@ -71,8 +90,11 @@ async def clear_group_stage(db: AsyncSession) -> None:
         await db.execute(delete(TournamentGroup).where(TournamentGroup.id.in_(group_ids)))
 
 
-async def create_auto_draw(db: AsyncSession) -> tuple[bool, str]:
-    """Создает автоматическую жеребьевку для стартового этапа по активному профилю."""
+async def create_auto_draw(db: AsyncSession, seed: int | None = None) -> tuple[bool, str]:
+    """Создает автоматическую жеребьевку для стартового этапа по активному профилю.
+
+    `seed` фиксирует генератор случайных чисел, чтобы жеребьёвку можно было воспроизвести.
+    """
     users = list(
         (
             await db.scalars(
@@ -97,39 +119,17 @@ async def create_auto_draw(db: AsyncSession) -> tuple[bool, str]:
 
     try:
         await clear_group_stage(db)
-        by_basket: dict[str, list[User]] = defaultdict(list)
-        for user in users:
-            by_basket[user.basket].append(user)
-
-        for bucket in by_basket.values():
-            random.shuffle(bucket)
-
-        assigned_by_group: list[list[User]] = []
-        for _ in range(expected_group_count):
-            picked: list[User] = []
-            for basket, reserve_basket in PRIMARY_DRAW_BASKETS_WITH_RESERVE.items():
-                for _ in range(2):
-                    source_basket = basket
-                    if not by_basket[source_basket] and by_basket[reserve_basket]:
-                        source_basket = reserve_basket
-
-                    if by_basket[source_basket]:
-                        picked.append(by_basket[source_basket].pop())
-                if len(picked) >= stage_group_size:
-                    break
-
-            fallback_pool: list[User] = []
-            for basket in PRIMARY_BASKETS:
-                if basket == Basket.INVITED.value:
-                    continue
-                fallback_pool.extend(by_basket[basket])
-            random.shuffle(fallback_pool)
-            while len(picked) < stage_group_size and fallback_pool:
-                candidate = fallback_pool.pop()
-                if candidate not in picked and candidate in by_basket[candidate.basket]:
-                    by_basket[candidate.basket].remove(candidate)
-                    picked.append(candidate)
+        assigned_by_group = draw_groups(
+            users,
+            group_count=expected_group_count,
+            group_size=stage_group_size,
+            basket_of=lambda user: user.basket,
+            quota_baskets=PRIMARY_DRAW_BASKETS_WITH_RESERVE,
+            pool_baskets=[basket for basket in PRIMARY_BASKETS if basket != Basket.INVITED.value],
+            rng=random.Random(seed),
+        )
 
+        for picked in assigned_by_group:
             unique_ids = {player.id for player in picked}
             if len(picked) != stage_group_size or len(unique_ids) != stage_group_size:
                 raise ValueError(
@@ -138,8 +138,6 @@ async def create_auto_draw(db: AsyncSession) -> tuple[bool, str]:
                     "Доступна только ручная жеребьевка."
                 )
 
-            assigned_by_group.append(picked)
-
         assigned_players_count = sum(len(group_players) for group_players in assigned_by_group)
         if len(assigned_by_group) != expected_group_count or assigned_players_count != expected_participants:
             raise ValueError(
@@ -229,6 +227,55 @@ async def validate_group_member_constraints(
     return group
 
 
+async def validate_group_member_batch(
+    db: AsyncSession,
+    assignments: list[tuple[TournamentGroup, int]],
+) -> list[dict[str, int]]:
+    """Проверяет ограничения `validate_group_member_constraints` для всей раскладки двумя запросами.
+
+    Возвращает строки для вставки `GroupMember` с местами в порядке назначения.
+    """
+    if not assignments:
+        return []
+
+    user_ids = {user_id for _, user_id in assignments}
+    existing_user_ids = set((await db.scalars(select(User.id).where(User.id.in_(user_ids)))).all())
+
+    stages = {group.stage for group, _ in assignments}
+    stage_member_rows = (
+        await db.execute(
+            select(GroupMember.group_id, GroupMember.user_id, TournamentGroup.stage)
+            .join(TournamentGroup, TournamentGroup.id == GroupMember.group_id)
+            .where(TournamentGroup.stage.in_(stages))
+        )
+    ).all()
+    group_user_pairs: set[tuple[int, int]] = set()
+    stage_user_pairs: set[tuple[str, int]] = set()
+    member_counts: dict[int, int] = defaultdict(int)
+    for group_id, user_id, stage in stage_member_rows:
+        group_user_pairs.add((group_id, user_id))
+        stage_user_pairs.add((stage, user_id))
+        member_counts[group_id] += 1
+
+    rows: list[dict[str, int]] = []
+    for group, user_id in assignments:
+        # Порядок проверок и тексты ошибок совпадают с поштучной валидацией.
+        if user_id not in existing_user_ids:
+            raise ValueError("User not found")
+        if (group.id, user_id) in group_user_pairs:
+            raise ValueError("Игрок уже есть в этой группе")
+        if (group.stage, user_id) in stage_user_pairs:
+            raise ValueError("Игрок уже находится в другой группе этой стадии")
+        if member_counts[group.id] >= 8:
+            raise ValueError("Группа уже заполнена (максимум 8 участников)")
+
+        member_counts[group.id] += 1
+        group_user_pairs.add((group.id, user_id))
+        stage_user_pairs.add((group.stage, user_id))
+        rows.append({"group_id": group.id, "user_id": user_id, "seat": member_counts[group.id]})
+    return rows
+
+
 def parse_manual_draw_user_ids(raw_user_ids: str | list[str] | tuple[str, ...] | None) -> list[int]:
     if raw_user_ids is None:
         raise ValueError("Список ID участников обязателен")
@@ -287,17 +334,17 @@ async def create_manual_draw(
         if len(flattened_ids) != len(set(flattened_ids)):
             raise ValueError("ID участников в раскладке должны быть уникальны")
 
-        for group, members in zip(groups, layout_by_group, strict=True):
-            for seat, user_id in enumerate(members, start=1):
-                await validate_group_member_constraints(db, group_id=group.id, user_id=user_id)
-                db.add(GroupMember(group_id=group.id, user_id=user_id, seat=seat))
+        assignments = [
+            (group, user_id)
+            for group, members in zip(groups, layout_by_group, strict=True)
+            for user_id in members
+        ]
     else:
-        for offset, user_id in enumerate(user_ids):
-            group = groups[offset % group_count]
-            await validate_group_member_constraints(db, group_id=group.id, user_id=user_id)
-            seat = 1 + len(list((await db.scalars(select(GroupMember.id).where(GroupMember.group_id == group.id))).all()))
-            db.add(GroupMember(group_id=group.id, user_id=user_id, seat=seat))
+        assignments = [(groups[offset % group_count], user_id) for offset, user_id in enumerate(user_ids)]
 
+    member_rows = await validate_group_member_batch(db, assignments)
+    if member_rows:
+        await db.execute(insert(GroupMember), member_rows)
     await db.commit()
 
 
@@ -383,29 +430,115 @@ async def create_manual_draw_from_layout(db: AsyncSession, layout_payload: objec
         groups.append(group)
     await db.flush()
 
-    for group, members in zip(groups, normalized_layout, strict=True):
-        for seat, user_id in enumerate(members, start=1):
-            await validate_group_member_constraints(db, group_id=group.id, user_id=user_id)
-            db.add(GroupMember(group_id=group.id, user_id=user_id, seat=seat))
-
+    assignments = [
+        (group, user_id)
+        for group, members in zip(groups, normalized_layout, strict=True)
+        for user_id in members
+    ]
+    member_rows = await validate_group_member_batch(db, assignments)
+    if member_rows:
+        await db.execute(insert(GroupMember), member_rows)
     await db.commit()
 
-def sort_members_for_table(members: list[GroupMember]) -> list[GroupMember]:
-    # Сортируем таблицу по очкам и стабильным правилам. Финальный ключ — user_id для детерминированности.
-    return sorted(
-        members,
-        key=lambda m: (
-            -m.total_points,
-            -m.first_places,
-            -m.top4_finishes,
-            -m.top8_finishes,
-            m.eighth_places,
-            m.last_game_place,
-            m.user_id,
-        ),
+GROUP_MEMBER_COUNTER_FIELDS = (
+    "total_points",
+    "first_places",
+    "top4_finishes",
+    "top8_finishes",
+    "eighth_places",
+    "last_game_place",
+)
+PLAYOFF_PARTICIPANT_COUNTER_FIELDS = ("points", "wins", "top4_finishes", "top8_finishes", "eighth_places", "last_place")
+
+
+def _placements_values(ordered_user_ids: list[int]):
+    return values(column("user_id", Integer), column("place", Integer), name="placements").data(
+        [(user_id, place) for place, user_id in enumerate(ordered_user_ids, start=1)]
     )
 
 
+def _place_counter(place_column, predicate) -> object:
+    return case((predicate(place_column), 1), else_=0)
+
+
+def build_group_placements_update(group_id: int, ordered_user_ids: list[int]):
+    """Один UPDATE ... FROM (VALUES ...) с приростами счётчиков группы, вычисляемыми в БД."""
+    placements = _placements_values(ordered_user_ids)
+    place = placements.c.place
+    return (
+        update(GroupMember)
+        .where(GroupMember.group_id == group_id, GroupMember.user_id == placements.c.user_id)
+        .values(
+            total_points=GroupMember.total_points + case(POINTS_BY_PLACE, value=place, else_=0),
+            first_places=GroupMember.first_places + _place_counter(place, lambda value: value == 1),
+            top4_finishes=GroupMember.top4_finishes + _place_counter(place, lambda value: value <= 4),
+            top8_finishes=func.coalesce(GroupMember.top8_finishes, 0) + 1,
+            eighth_places=GroupMember.eighth_places + _place_counter(place, lambda value: value == 8),
+            last_game_place=place,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def build_playoff_placements_update(stage_id: int, ordered_user_ids: list[int]):
+    """Один UPDATE ... FROM (VALUES ...) с приростами счётчиков плей-офф, вычисляемыми в БД."""
+    placements = _placements_values(ordered_user_ids)
+    place = placements.c.place
+    return (
+        update(PlayoffParticipant)
+        .where(PlayoffParticipant.stage_id == stage_id, PlayoffParticipant.user_id == placements.c.user_id)
+        .values(
+            points=PlayoffParticipant.points + case(POINTS_BY_PLACE, value=place, else_=0),
+            wins=PlayoffParticipant.wins + _place_counter(place, lambda value: value == 1),
+            top4_finishes=PlayoffParticipant.top4_finishes + _place_counter(place, lambda value: value <= 4),
+            top8_finishes=func.coalesce(PlayoffParticipant.top8_finishes, 0) + 1,
+            eighth_places=func.coalesce(PlayoffParticipant.eighth_places, 0)
+            + _place_counter(place, lambda value: value == 8),
+            last_place=place,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def build_playoff_placements_revert(stage_id: int, game_rows: list[PlayoffGameResult]):
+    """Обратный к build_playoff_placements_update UPDATE по строкам журнала отменяемой игры."""
+    placements = values(
+        column("user_id", Integer),
+        column("place", Integer),
+        column("previous_last_place", Integer),
+        name="placements",
+    ).data([(row.user_id, row.place, row.previous_last_place) for row in game_rows])
+    place = placements.c.place
+    return (
+        update(PlayoffParticipant)
+        .where(PlayoffParticipant.stage_id == stage_id, PlayoffParticipant.user_id == placements.c.user_id)
+        .values(
+            points=PlayoffParticipant.points - case(POINTS_BY_PLACE, value=place, else_=0),
+            wins=PlayoffParticipant.wins - _place_counter(place, lambda value: value == 1),
+            top4_finishes=PlayoffParticipant.top4_finishes - _place_counter(place, lambda value: value <= 4),
+            top8_finishes=func.greatest(func.coalesce(PlayoffParticipant.top8_finishes, 0) - 1, 0),
+            eighth_places=func.greatest(
+                func.coalesce(PlayoffParticipant.eighth_places, 0) - _place_counter(place, lambda value: value == 8),
+                0,
+            ),
+            last_place=placements.c.previous_last_place,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _mirror_server_side_counters(instance: object, fields: tuple[str, ...]) -> None:
+    # Значения уже записаны UPDATE в БД: оставляем их в объекте, но не отдаём flush повторно.
+    for field in fields:
+        set_committed_value(instance, field, getattr(instance, field))
+
+
+def sort_members_for_table(members: list[GroupMember], tie_breaks: dict[int, int] | None = None) -> list[GroupMember]:
+    # Сортируем таблицу по очкам и стабильным правилам, затем по ручному тай-брейку группы.
+    # Финальный ключ — user_id для детерминированности.
+    return sorted(members, key=lambda member: group_member_sort_key(member, tie_breaks))
+
+
 async def apply_game_results(db: AsyncSession, group_id: int, ordered_user_ids: list[int]) -> None:
     """Проставляет результаты одной игры и пересчитывает агрегаты участникам группы."""
     group = await db.scalar(select(TournamentGroup).where(TournamentGroup.id == group_id))
@@ -437,10 +570,13 @@ async def apply_game_results(db: AsyncSession, group_id: int, ordered_user_ids:
         member.top8_finishes = (member.top8_finishes or 0) + 1
         member.eighth_places += 1 if place == 8 else 0
         member.last_game_place = place
+        _mirror_server_side_counters(member, GROUP_MEMBER_COUNTER_FIELDS)
+    await db.execute(build_group_placements_update(group_id, ordered_user_ids))
 
     if group.current_game <= GROUP_STAGE_GAME_LIMIT:
         group.current_game += 1
     await db.commit()
+    store_group_stage_standings(group, members)
 
 
 PLAYOFF_STAGE_SEQUENCE = [
@@ -500,28 +636,6 @@ def get_playoff_stage_blueprint(usable_count: int) -> list[tuple[str, str, int,
     return []
 
 
-def playoff_sort_key(participant: PlayoffParticipant) -> tuple[int, int, int, int, int, int]:
-    return (
-        participant.points,
-        participant.wins,
-        participant.top4_finishes,
-        participant.top8_finishes,
-        -participant.last_place,
-        -participant.user_id,
-    )
-
-
-def playoff_tie_key(participant: PlayoffParticipant) -> tuple[int, int, int, int, int]:
-    """Ключ равенства результатов без учета seed (seed используется только как стабильный fallback)."""
-    return (
-        participant.points,
-        participant.wins,
-        participant.top4_finishes,
-        participant.top8_finishes,
-        -participant.last_place,
-    )
-
-
 def apply_points_to_playoff_participant(participant: PlayoffParticipant, place: int, scoring_mode: str) -> None:
     participant.points += POINTS_BY_PLACE[place]
     if place == 1:
@@ -533,6 +647,18 @@ def apply_points_to_playoff_participant(participant: PlayoffParticipant, place:
     participant.last_place = place
 
 
+def revert_points_from_playoff_participant(participant: PlayoffParticipant, place: int, previous_last_place: int) -> None:
+    """Отменяет начисление apply_points_to_playoff_participant за одну игру."""
+    participant.points -= POINTS_BY_PLACE[place]
+    if place == 1:
+        participant.wins -= 1
+    if place <= 4:
+        participant.top4_finishes -= 1
+    participant.top8_finishes = max((participant.top8_finishes or 0) - 1, 0)
+    participant.eighth_places = max((participant.eighth_places or 0) - (1 if place == 8 else 0), 0)
+    participant.last_place = previous_last_place
+
+
 def get_group_count_for_stage(stage_size: int, stage_key: str | None = None) -> int:
     if stage_key:
         configured_groups_count = get_stage_group_count(stage_key)
@@ -704,6 +830,7 @@ async def shuffle_stage_2_participants(db: AsyncSession) -> None:
         participant.seed = seed
 
     await db.commit()
+    invalidate_playoff_standings(stage_2.id)
 
 
 async def rebuild_playoff_stages(db: AsyncSession, player_ids: list[int], *, stage_2_size: int) -> list[PlayoffStage]:
@@ -715,6 +842,7 @@ async def rebuild_playoff_stages(db: AsyncSession, player_ids: list[int], *, sta
     await db.execute(delete(PlayoffMatch))
     await db.execute(delete(PlayoffParticipant))
     await db.execute(delete(PlayoffStage))
+    invalidate_standings()
 
     stages: list[PlayoffStage] = []
     for order, (key, title, size, scoring_mode) in enumerate(stages_to_create):
@@ -789,9 +917,10 @@ async def generate_playoff_from_groups(db: AsyncSession) -> tuple[bool, str]:
     for member in members:
         by_group[member.group_id].append(member)
 
+    tie_breaks = await load_stage_tie_breaks(db, GROUP_STAGE_SCOPE)
     stage_1_promoted_ids: list[int] = []
     for group in groups:
-        ranked = sort_members_for_table(by_group.get(group.id, []))
+        ranked = sort_members_for_table(by_group.get(group.id, []), tie_breaks.get(group.id))
         per_group_promote_count = max(1, expected_promoted_count // expected_stage_1_groups)
         stage_1_promoted_ids.extend([member.user_id for member in ranked[:per_group_promote_count]])
 
@@ -882,6 +1011,8 @@ async def move_user_to_stage(db: AsyncSession, from_stage_id: int, to_stage_id:
     await db.delete(participant)
     db.add(PlayoffParticipant(stage_id=to_stage_id, user_id=user_id, seed=next_seed))
     await db.commit()
+    invalidate_playoff_standings(from_stage_id)
+    invalidate_playoff_standings(to_stage_id)
 
 
 async def promote_group_member_to_stage(db: AsyncSession, group_id: int, user_id: int, target_stage_id: int) -> None:
@@ -919,6 +1050,7 @@ async def promote_group_member_to_stage(db: AsyncSession, group_id: int, user_id
         )
     )
     await db.commit()
+    invalidate_playoff_standings(target_stage_id)
 
 
 async def replace_stage_player(db: AsyncSession, stage_id: int, from_user_id: int, to_user_id: int) -> None:
@@ -929,15 +1061,94 @@ async def replace_stage_player(db: AsyncSession, stage_id: int, from_user_id: in
     if exists:
         raise ValueError("Новый игрок уже присутствует на этапе")
     participant.user_id = to_user_id
+    await reassign_playoff_game_results(db, stage_id, from_user_id, to_user_id)
     await db.commit()
+    invalidate_playoff_standings(stage_id, get_stage_group_number_by_seed(participant.seed))
+
+
+async def reassign_playoff_game_results(db: AsyncSession, stage_id: int, from_user_id: int, to_user_id: int) -> None:
+    """Переносит журнал игр и ручные правки очков этапа на заменяющего игрока вместе с его агрегатами."""
+    await db.execute(
+        update(PlayoffGameResult)
+        .where(PlayoffGameResult.stage_id == stage_id, PlayoffGameResult.user_id == from_user_id)
+        .values(user_id=to_user_id)
+    )
+    await db.execute(
+        update(PlayoffPointAdjustment)
+        .where(PlayoffPointAdjustment.stage_id == stage_id, PlayoffPointAdjustment.user_id == from_user_id)
+        .values(user_id=to_user_id)
+    )
+
+
+async def clear_playoff_stage_log(db: AsyncSession, stage_id: int) -> None:
+    """Удаляет журнал игр и ручные правки этапа, когда его участники пересоздаются с нулевыми счётчиками."""
+    await db.execute(delete(PlayoffGameResult).where(PlayoffGameResult.stage_id == stage_id))
+    await db.execute(delete(PlayoffPointAdjustment).where(PlayoffPointAdjustment.stage_id == stage_id))
+
+
+def set_playoff_participant_points(db: AsyncSession, participant: PlayoffParticipant, points: int) -> None:
+    """Ручная правка очков участника: разница пишется в журнал правок, чтобы сверка с журналом игр её учитывала."""
+    points_delta = points - (participant.points or 0)
+    if points_delta:
+        db.add(PlayoffPointAdjustment(stage_id=participant.stage_id, user_id=participant.user_id, points_delta=points_delta))
+    participant.points = points
 
 
 async def adjust_stage_points(db: AsyncSession, stage_id: int, user_id: int, points_delta: int) -> None:
     participant = await db.scalar(select(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id, PlayoffParticipant.user_id == user_id))
     if not participant:
         raise ValueError("Участник этапа не найден")
-    participant.points += points_delta
+    set_playoff_participant_points(db, participant, (participant.points or 0) + points_delta)
+    await db.commit()
+    invalidate_playoff_standings(stage_id, get_stage_group_number_by_seed(participant.seed))
+
+
+def _validate_tie_break_user_ids(member_ids: set[int], ordered_user_ids: list[int]) -> None:
+    if len(ordered_user_ids) < 2 or len(set(ordered_user_ids)) != len(ordered_user_ids):
+        raise ValueError("Нужно передать минимум двух разных игроков")
+    if not set(ordered_user_ids) <= member_ids:
+        raise ValueError("Игрок не состоит в этой группе")
+
+
+async def save_group_manual_tie_break(db: AsyncSession, group_id: int, ordered_user_ids: list[int]) -> None:
+    """Сохраняет ручной порядок равных игроков группы I этапа: первый в списке стоит выше."""
+    group = await db.scalar(select(TournamentGroup).where(TournamentGroup.id == group_id))
+    if not group:
+        raise ValueError("Group not found")
+    members = list((await db.scalars(select(GroupMember).where(GroupMember.group_id == group_id))).all())
+    _validate_tie_break_user_ids({member.user_id for member in members}, ordered_user_ids)
+
+    await db.execute(delete(GroupManualTieBreak).where(GroupManualTieBreak.group_id == group_id))
+    for priority, user_id in enumerate(ordered_user_ids, start=1):
+        db.add(GroupManualTieBreak(group_id=group_id, user_id=user_id, priority=priority))
     await db.commit()
+    invalidate_stage_tie_breaks(GROUP_STAGE_SCOPE, group_id)
+
+
+async def save_playoff_manual_tie_break(
+    db: AsyncSession, stage_id: int, group_number: int, ordered_user_ids: list[int]
+) -> None:
+    """Сохраняет ручной порядок равных игроков группы этапа плей-офф: первый в списке стоит выше."""
+    stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.id == stage_id))
+    if not stage:
+        raise ValueError("Stage not found")
+    participants = list((await db.scalars(select(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id))).all())
+    group_ids = {
+        participant.user_id
+        for participant in participants
+        if get_stage_group_number_by_seed(participant.seed) == group_number
+    }
+    _validate_tie_break_user_ids(group_ids, ordered_user_ids)
+
+    await db.execute(
+        delete(PlayoffManualTieBreak).where(
+            PlayoffManualTieBreak.stage_id == stage_id, PlayoffManualTieBreak.group_number == group_number
+        )
+    )
+    for priority, user_id in enumerate(ordered_user_ids, start=1):
+        db.add(PlayoffManualTieBreak(stage_id=stage_id, group_number=group_number, user_id=user_id, priority=priority))
+    await db.commit()
+    invalidate_stage_tie_breaks(stage_id, group_number)
 
 
 async def apply_playoff_match_results(
@@ -949,7 +1160,8 @@ async def apply_playoff_match_results(
     """Применяет результат одной игры внутри группы плей-офф и фиксирует изменения в БД.
 
     Функция валидирует входные данные (ровно 8 уникальных игроков нужной группы этапа),
-    начисляет очки участникам, увеличивает ``match.game_number`` и обновляет ``match.state``.
+    начисляет очки участникам, пишет места в журнал ``PlayoffGameResult``,
+    увеличивает ``match.game_number`` и обновляет ``match.state``.
     Транзакция завершается внутри функции через ``db.commit()``.
     """
     stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.id == stage_id))
@@ -958,30 +1170,87 @@ async def apply_playoff_match_results(
     if len(ordered_user_ids) != 8 or len(set(ordered_user_ids)) != 8:
         raise ValueError("Нужно передать 8 уникальных участников")
 
-    participants = list((await db.scalars(select(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id))).all())
+    # Строка матча группы — блокировка судейского ввода: параллельные игры одной группы
+    # выстраиваются в очередь, а разные группы этапа не мешают друг другу.
+    match = await db.scalar(
+        select(PlayoffMatch)
+        .where(PlayoffMatch.stage_id == stage_id, PlayoffMatch.group_number == group_number)
+        .with_for_update()
+    )
+    participants = list((await db.scalars(_select_fresh_stage_participants(stage_id))).all())
     by_user = {p.user_id: p for p in participants}
-    expected_group = {p.user_id for p in participants if get_stage_group_number_by_seed(p.seed) == group_number}
+    _validate_playoff_game_user_ids(by_user, ordered_user_ids, group_number)
+
+    _validate_playoff_match_accepts_game(stage, match, group_number, match.game_number if match else 1)
+
+    game_rows = _record_playoff_game(stage, match, by_user, ordered_user_ids)
+    await db.execute(build_playoff_placements_update(stage_id, ordered_user_ids))
+    await db.execute(insert(PlayoffGameResult), game_rows)
+    await db.commit()
+    store_playoff_group_standings(stage, group_number, [by_user[user_id] for user_id in ordered_user_ids], match)
+
+
+def _select_fresh_stage_participants(stage_id: int):
+    # Агрегаты читаются уже под блокировкой матча, поэтому перечитываем строки поверх identity map.
+    return (
+        select(PlayoffParticipant)
+        .where(PlayoffParticipant.stage_id == stage_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _validate_playoff_game_user_ids(
+    by_user: dict[int, PlayoffParticipant],
+    ordered_user_ids: list[int],
+    group_number: int,
+) -> None:
     for uid in ordered_user_ids:
         if uid not in by_user:
             raise ValueError("В результатах есть игрок вне этапа")
-        if uid not in expected_group:
+        if get_stage_group_number_by_seed(by_user[uid].seed) != group_number:
             raise ValueError("В результатах есть игрок из другой группы этапа")
 
-    match = await db.scalar(
-        select(PlayoffMatch).where(PlayoffMatch.stage_id == stage_id, PlayoffMatch.group_number == group_number)
-    )
+
+def _validate_playoff_match_accepts_game(
+    stage: PlayoffStage,
+    match: PlayoffMatch | None,
+    group_number: int,
+    game_number: int,
+) -> None:
     if not match:
         raise ValueError("Матч/группа для этапа не найдена")
     if match.state == "finished":
         raise ValueError("Матч уже завершен")
 
-    if is_limited_stage(stage.key) and match.game_number > GROUP_STAGE_GAME_LIMIT:
+    if is_limited_stage(stage.key) and game_number > GROUP_STAGE_GAME_LIMIT:
         raise ValueError(
             f"Для этапа {stage.title} достигнут лимит в {GROUP_STAGE_GAME_LIMIT} игры для группы {group_number}"
         )
 
+
+def _record_playoff_game(
+    stage: PlayoffStage,
+    match: PlayoffMatch,
+    by_user: dict[int, PlayoffParticipant],
+    ordered_user_ids: list[int],
+) -> list[dict[str, int]]:
+    """Начисляет очки за одну проверенную игру, двигает счётчик матча и возвращает строки журнала."""
+    game_rows: list[dict[str, int]] = []
     for place, user_id in enumerate(ordered_user_ids, start=1):
-        apply_points_to_playoff_participant(by_user[user_id], place, stage.scoring_mode)
+        participant = by_user[user_id]
+        game_rows.append(
+            {
+                "stage_id": stage.id,
+                "group_number": match.group_number,
+                "game_number": match.game_number,
+                "user_id": user_id,
+                "place": place,
+                "points_awarded": POINTS_BY_PLACE[place],
+                "previous_last_place": participant.last_place,
+            }
+        )
+        apply_points_to_playoff_participant(participant, place, stage.scoring_mode)
+        _mirror_server_side_counters(participant, PLAYOFF_PARTICIPANT_COUNTER_FIELDS)
 
     match.game_number += 1
     should_finish_limited_stage = is_limited_stage(stage.key) and match.game_number > GROUP_STAGE_GAME_LIMIT
@@ -990,8 +1259,263 @@ async def apply_playoff_match_results(
         match.state = "finished"
     else:
         match.state = "in_progress"
+    return game_rows
+
+
+def parse_playoff_results_import(raw_payload: str) -> list[tuple[int, list[int]]]:
+    """Разбирает пакет результатов этапа из JSON или CSV в список (номер группы, id по местам).
+
+    JSON: ``[{"group_number": 1, "placements": [id1, ..., id8]}, ...]``.
+    CSV: по строке на игру ``group_number,id1,...,id8``; строка заголовка пропускается.
+    Игры одной группы применяются в порядке следования.
+    """
+    payload = (raw_payload or "").strip()
+    if not payload:
+        raise ValueError("Пакет результатов пуст")
+
+    games: list[tuple[int, list[int]]] = []
+    if payload[0] in "[{":
+        try:
+            parsed = json.loads(payload)
+        except json.JSONDecodeError as exc:
+            raise ValueError("Некорректный JSON пакета результатов") from exc
+        if isinstance(parsed, dict):
+            parsed = parsed.get("games")
+        if not isinstance(parsed, list):
+            raise ValueError("JSON должен содержать список игр")
+        for index, item in enumerate(parsed, start=1):
+            if not isinstance(item, dict) or not isinstance(item.get("placements"), list):
+                raise ValueError(f"Игра {index}: нужны поля group_number и placements")
+            try:
+                games.append((int(item.get("group_number", 1)), [int(user_id) for user_id in item["placements"]]))
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"Игра {index}: ID должны быть целыми числами") from exc
+    else:
+        rows = [row for row in csv.reader(io.StringIO(payload)) if any(cell.strip() for cell in row)]
+        if rows and not rows[0][0].strip().lstrip("-").isdigit():
+            rows = rows[1:]
+        for index, row in enumerate(rows, start=1):
+            try:
+                cells = [int(cell) for cell in row if cell.strip()]
+            except ValueError as exc:
+                raise ValueError(f"Игра {index}: ID должны быть целыми числами") from exc
+            if not cells:
+                continue
+            games.append((cells[0], cells[1:]))
+
+    if not games:
+        raise ValueError("Пакет результатов пуст")
+    return games
+
+
+async def import_playoff_stage_results(
+    db: AsyncSession,
+    stage_id: int,
+    games: list[tuple[int, list[int]]],
+) -> tuple[int, bool]:
+    """Применяет пакет игр этапа одной транзакцией и пробует завершить лимитированный этап.
+
+    Все игры проверяются до первого изменения: при любой ошибке ничего не записывается.
+    Возвращает число применённых игр и признак того, что этап завершился и следующий запущен.
+    """
+    stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.id == stage_id))
+    if not stage:
+        raise ValueError("Stage not found")
+
+    # Импорт затрагивает несколько групп: блокируем их матчи в порядке номеров, как и одиночный ввод.
+    matches = list(
+        (
+            await db.scalars(
+                select(PlayoffMatch)
+                .where(PlayoffMatch.stage_id == stage_id)
+                .order_by(PlayoffMatch.group_number)
+                .with_for_update()
+            )
+        ).all()
+    )
+    participants = list((await db.scalars(_select_fresh_stage_participants(stage_id))).all())
+    by_user = {participant.user_id: participant for participant in participants}
+    match_by_group = {match.group_number: match for match in matches}
+
+    planned_games: dict[int, int] = defaultdict(int)
+    for index, (group_number, ordered_user_ids) in enumerate(games, start=1):
+        try:
+            if len(ordered_user_ids) != 8 or len(set(ordered_user_ids)) != 8:
+                raise ValueError("Нужно передать 8 уникальных участников")
+            _validate_playoff_game_user_ids(by_user, ordered_user_ids, group_number)
+            match = match_by_group.get(group_number)
+            next_game_number = (match.game_number if match else 1) + planned_games[group_number]
+            _validate_playoff_match_accepts_game(stage, match, group_number, next_game_number)
+        except ValueError as exc:
+            raise ValueError(f"Игра {index} (группа {group_number}): {exc}") from exc
+        planned_games[group_number] += 1
+
+    game_rows: list[dict[str, int]] = []
+    for group_number, ordered_user_ids in games:
+        game_rows.extend(_record_playoff_game(stage, match_by_group[group_number], by_user, ordered_user_ids))
+        await db.execute(build_playoff_placements_update(stage_id, ordered_user_ids))
+    await db.execute(insert(PlayoffGameResult), game_rows)
+    await db.commit()
+    participants_by_group = split_participants_by_group(participants)
+    for group_number in planned_games:
+        store_playoff_group_standings(stage, group_number, participants_by_group[group_number], match_by_group[group_number])
+
+    finalized = False
+    if is_limited_stage(stage.key):
+        try:
+            finalized = await finalize_limited_playoff_stage_if_ready(db, stage.id)
+        except ValueError:
+            # Не все группы доиграны — результаты сохранены, этап завершится следующим импортом.
+            finalized = False
+    return len(games), finalized
+
+
+async def undo_last_playoff_game(db: AsyncSession, stage_id: int, group_number: int = 1) -> int:
+    """Отменяет последнюю записанную игру группы плей-офф по журналу ``PlayoffGameResult``.
+
+    Агрегаты участников уменьшаются на вклад этой игры без пересчёта всей истории,
+    ``match.game_number`` откатывается на номер отменённой игры. Возвращает этот номер.
+    """
+    stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.id == stage_id))
+    if not stage:
+        raise ValueError("Stage not found")
+    match = await db.scalar(
+        select(PlayoffMatch)
+        .where(PlayoffMatch.stage_id == stage_id, PlayoffMatch.group_number == group_number)
+        .with_for_update()
+    )
+    if not match:
+        raise ValueError("Матч/группа для этапа не найдена")
+    if match.manual_winner_user_id or match.winner_user_id:
+        raise ValueError("Для группы уже назначен победитель")
+    next_stage = await db.scalar(select(PlayoffStage).where(PlayoffStage.stage_order == stage.stage_order + 1))
+    if match.state == "finished" and next_stage and next_stage.is_started:
+        raise ValueError("Следующий этап уже запущен")
+    if next_stage:
+        # Выход в следующий этап уже решён по таблице с этой игрой: отмена разошлась бы с его составом.
+        promoted_count = await db.scalar(
+            select(func.count()).select_from(PlayoffParticipant).where(PlayoffParticipant.stage_id == next_stage.id)
+        )
+        if promoted_count:
+            raise ValueError("Игроки этапа уже переведены в следующий этап")
+
+    last_game_number = await db.scalar(
+        select(func.max(PlayoffGameResult.game_number)).where(
+            PlayoffGameResult.stage_id == stage_id,
+            PlayoffGameResult.group_number == group_number,
+        )
+    )
+    if last_game_number is None:
+        raise ValueError("Для группы нет записанных игр")
 
+    last_game_filter = (
+        PlayoffGameResult.stage_id == stage_id,
+        PlayoffGameResult.group_number == group_number,
+        PlayoffGameResult.game_number == last_game_number,
+    )
+    game_rows = list((await db.scalars(select(PlayoffGameResult).where(*last_game_filter))).all())
+    participants = list(
+        (
+            await db.scalars(
+                select(PlayoffParticipant)
+                .where(
+                    PlayoffParticipant.stage_id == stage_id,
+                    PlayoffParticipant.user_id.in_([row.user_id for row in game_rows]),
+                )
+                .execution_options(populate_existing=True)
+            )
+        ).all()
+    )
+    by_user = {participant.user_id: participant for participant in participants}
+    for row in game_rows:
+        participant = by_user.get(row.user_id)
+        if participant:
+            revert_points_from_playoff_participant(participant, row.place, row.previous_last_place)
+            _mirror_server_side_counters(participant, PLAYOFF_PARTICIPANT_COUNTER_FIELDS)
+            participant.is_eliminated = False
+    await db.execute(build_playoff_placements_revert(stage_id, game_rows))
+    await db.execute(delete(PlayoffGameResult).where(*last_game_filter))
+
+    match.game_number = last_game_number
+    match.state = "in_progress" if last_game_number > 1 else "pending"
     await db.commit()
+    invalidate_playoff_standings(stage_id, group_number)
+    return last_game_number
+
+
+async def replay_playoff_stage_standings(db: AsyncSession, stage_id: int) -> dict[int, PlayoffParticipant]:
+    """Восстанавливает агрегаты участников этапа из журнала игр и ручных правок очков за один проход.
+
+    Возвращает несохранённые ``PlayoffParticipant`` по ``user_id``; сессия не меняется.
+    """
+    game_rows = (
+        await db.scalars(
+            select(PlayoffGameResult)
+            .where(PlayoffGameResult.stage_id == stage_id)
+            .order_by(PlayoffGameResult.group_number, PlayoffGameResult.game_number, PlayoffGameResult.place)
+        )
+    ).all()
+    adjustment_rows = (
+        await db.execute(
+            select(PlayoffPointAdjustment.user_id, func.sum(PlayoffPointAdjustment.points_delta))
+            .where(PlayoffPointAdjustment.stage_id == stage_id)
+            .group_by(PlayoffPointAdjustment.user_id)
+        )
+    ).all()
+    replayed: dict[int, PlayoffParticipant] = {}
+
+    def replayed_participant(user_id: int) -> PlayoffParticipant:
+        participant = replayed.get(user_id)
+        if participant is None:
+            participant = PlayoffParticipant(
+                stage_id=stage_id,
+                user_id=user_id,
+                points=0,
+                wins=0,
+                top4_finishes=0,
+                top8_finishes=0,
+                eighth_places=0,
+                last_place=8,
+            )
+            replayed[user_id] = participant
+        return participant
+
+    for row in game_rows:
+        apply_points_to_playoff_participant(replayed_participant(row.user_id), row.place, "")
+    for user_id, points_delta in adjustment_rows:
+        replayed_participant(user_id).points += int(points_delta or 0)
+    return replayed
+
+
+PLAYOFF_REPLAY_FIELDS = ("points", "wins", "top4_finishes", "top8_finishes", "eighth_places", "last_place")
+
+
+async def find_playoff_standings_mismatches(db: AsyncSession, stage_id: int) -> list[dict[str, object]]:
+    """Сравнивает сохранённые агрегаты этапа с воспроизведением журнала игр и ручных правок очков.
+
+    Этапы без записей в журнале (сыгранные до его появления) не проверяются.
+    """
+    replayed = await replay_playoff_stage_standings(db, stage_id)
+    if not replayed:
+        return []
+
+    participants = (await db.scalars(select(PlayoffParticipant).where(PlayoffParticipant.stage_id == stage_id))).all()
+    mismatches: list[dict[str, object]] = []
+    for participant in participants:
+        expected = replayed.get(participant.user_id)
+        for field in PLAYOFF_REPLAY_FIELDS:
+            stored_value = getattr(participant, field) or 0
+            replayed_value = getattr(expected, field) if expected else (8 if field == "last_place" else 0)
+            if stored_value != replayed_value:
+                mismatches.append(
+                    {
+                        "user_id": participant.user_id,
+                        "field": field,
+                        "stored": stored_value,
+                        "replayed": replayed_value,
+                    }
+                )
+    return mismatches
 
 
 async def finalize_limited_playoff_stage_if_ready(db: AsyncSession, stage_id: int) -> bool:
@@ -1286,6 +1810,7 @@ async def reset_tournament_cycle_after_finish(db: AsyncSession) -> None:
     await db.execute(delete(GroupManualTieBreak))
     await db.execute(delete(GroupMember))
     await db.execute(delete(TournamentGroup))
+    invalidate_standings()
     await db.execute(delete(PlayoffMatch))
     await db.execute(delete(PlayoffParticipant))
     await db.execute(delete(PlayoffStage))
@@ -1329,39 +1854,13 @@ async def promote_top_between_stages(db: AsyncSession, stage_id: int, top_n: int
     if top_n != allowed_top_n:
         raise ValueError(f"Для этапа {stage.title} можно продвинуть только top-{allowed_top_n} из группы")
 
-    def _select_top_with_random_tie(group_ranked: list[PlayoffParticipant], limit: int) -> list[PlayoffParticipant]:
-        if len(group_ranked) <= limit:
-            return list(group_ranked)
-
-        selected = list(group_ranked[:limit])
-        cutoff = selected[-1]
-        tie_tail: list[PlayoffParticipant] = []
-        boundary_idx = limit - 1
-        cutoff_tie_key = playoff_tie_key(cutoff)
-        while boundary_idx >= 0 and playoff_tie_key(selected[boundary_idx]) == cutoff_tie_key:
-            tie_tail.append(selected[boundary_idx])
-            boundary_idx -= 1
-        tie_tail.reverse()
-
-        tie_candidates: list[PlayoffParticipant] = []
-        scan_idx = limit
-        while scan_idx < len(group_ranked) and playoff_tie_key(group_ranked[scan_idx]) == cutoff_tie_key:
-            tie_candidates.append(group_ranked[scan_idx])
-            scan_idx += 1
-
-        if not tie_candidates:
-            return selected
-
-        keep_before_tie = selected[: boundary_idx + 1]
-        tie_pool = [*tie_tail, *tie_candidates]
-        random.shuffle(tie_pool)
-        tie_slots = limit - len(keep_before_tie)
-        return [*keep_before_tie, *tie_pool[:tie_slots]]
-
+    # Приоритеты судьи одним запросом на этап: отсечка решается ими, оставшееся равенство — по user_id.
+    # Решение о выходе считается по только что прочитанным строкам, а не по кэшу страниц.
+    tie_breaks = await load_stage_tie_breaks(db, stage.id)
     top_players: list[PlayoffParticipant] = []
     for group_number in sorted(stage_grouped.keys()):
-        group_ranked = sorted(stage_grouped[group_number], key=playoff_sort_key, reverse=True)
-        top_players.extend(_select_top_with_random_tie(group_ranked, top_n))
+        standings = rank_playoff_participants(stage, stage_grouped[group_number], None, tie_breaks.get(group_number, {}))
+        top_players.extend(standings.order(stage_grouped[group_number])[:top_n])
 
     if len(top_players) < target_size:
         selected_ids = {participant.user_id for participant in top_players}
@@ -1396,3 +1895,5 @@ async def promote_top_between_stages(db: AsyncSession, stage_id: int, top_n: int
     for participant in ranked:
         participant.is_eliminated = participant.user_id not in promoted_ids
     await db.commit()
+    # Следующий этап пересобран с нулевыми счётчиками: прежние таблицы с тем же составом больше не верны.
+    invalidate_playoff_standings(next_stage.id)
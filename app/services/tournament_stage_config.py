@@ -5,6 +5,7 @@ from collections.abc import Mapping
 
 GROUP_STAGE_GAME_LIMIT = 3
 FINAL_STAGE_SCORING_MODE = "final_22_top1"
+FINAL_WIN_POINTS = 22
 DEFAULT_TOURNAMENT_PROFILE_KEY = "56"
 
 
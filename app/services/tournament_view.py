@@ -2,19 +2,18 @@
 
 from typing import Mapping, Sequence, TypedDict
 
-from app.models.tournament import GroupMember, PlayoffParticipant, PlayoffStage, TournamentGroup
+from app.models.tournament import PlayoffParticipant, PlayoffStage, TournamentGroup
 from app.models.user import User
 from app.services.i18n import t
+from app.services.standings_cache import get_group_stage_standings, get_playoff_group_standings, standings_cache
 from app.services.tournament import (
     build_stage_2_direct_invite_preview,
     get_playoff_stage_columns,
     get_stage_group_label,
     get_stage_group_number_by_seed,
     playoff_sort_key,
-    sort_members_for_table,
 )
 from app.services.tournament_stage_config import (
-    GROUP_STAGE_GAME_LIMIT,
     TOURNAMENT_FLOW_SPEC,
     get_promote_top_n,
     get_stage_spec,
@@ -34,6 +33,8 @@ class GroupStageStandingRow(TypedDict):
     top8_finishes: int
     eighth_places: int
     status: str
+    rank: int
+    is_tied: bool
 
 
 class BracketParticipantVM(TypedDict, total=False):
@@ -101,6 +102,8 @@ class PlayoffStandingRow(TypedDict):
     top8_finishes: int
     eighth_places: int
     status: str
+    rank: int
+    is_tied: bool
 
 
 class PlayoffStageStandingsVM(TypedDict):
@@ -126,16 +129,14 @@ def _normalize_schedule(value: str | None) -> str:
     return (value or "").strip() or "TBD"
 
 
-def build_group_stage_standings(groups: Sequence[TournamentGroup]) -> dict[int, list[GroupStageStandingRow]]:
+def build_group_stage_standings(
+    groups: Sequence[TournamentGroup], *, generation: int | None = None
+) -> dict[int, list[GroupStageStandingRow]]:
     standings: dict[int, list[GroupStageStandingRow]] = {}
     for group in groups:
-        ranked_members = sort_members_for_table(group.members)
-        group_done = getattr(group, "current_game", 1) > 3
+        group_standings = get_group_stage_standings(group, group.members, generation=generation)
         rows: list[GroupStageStandingRow] = []
-        for idx, member in enumerate(ranked_members, start=1):
-            status = "normal"
-            if group_done:
-                status = "promoted" if idx <= 3 else "eliminated"
+        for member in group_standings.order(group.members):
             rows.append(
                 {
                     "user_id": member.user_id,
@@ -146,14 +147,17 @@ def build_group_stage_standings(groups: Sequence[TournamentGroup]) -> dict[int,
                     "games_played": member.top8_finishes,
                     "top8_finishes": member.top8_finishes,
                     "eighth_places": member.eighth_places,
-                    "status": status,
+                    "status": group_standings.status(member.user_id),
+                    "rank": group_standings.tie_ranks[group_standings.position(member.user_id) - 1],
+                    "is_tied": group_standings.is_tied(member.user_id),
                 }
             )
         standings[group.id] = rows
     return standings
 
 
-def _participants_for_group_members(members: Sequence[GroupMember]) -> list[BracketParticipantVM]:
+def _participants_for_group_members(group: TournamentGroup, generation: int | None) -> list[BracketParticipantVM]:
+    members = list(group.members)
     participants = [
         {
             "user_id": member.user_id,
@@ -161,7 +165,7 @@ def _participants_for_group_members(members: Sequence[GroupMember]) -> list[Brac
             "points": member.total_points or 0,
             "is_direct_invite_preview": False,
         }
-        for member in sort_members_for_table(list(members))
+        for member in get_group_stage_standings(group, members, generation=generation).order(members)
     ]
     return _apply_stage_highlight_rules("group_stage", participants)
 
@@ -241,20 +245,23 @@ def _apply_stage_highlight_rules(
 
 
 def _participants_for_playoff_members(
-    participants: Sequence[PlayoffParticipant], user_by_id: Mapping[int, User]
+    stage: PlayoffStage, user_by_id: Mapping[int, User], generation: int | None
 ) -> dict[int, list[BracketParticipantVM]]:
     grouped_participants: dict[int, list[PlayoffParticipant]] = {}
-    for participant in participants:
+    for participant in stage.participants:
         group_number = get_stage_group_number_by_seed(participant.seed)
         grouped_participants.setdefault(group_number, []).append(participant)
+    match_by_group = {match.group_number: match for match in stage.matches}
 
     participants_by_group: dict[int, list[BracketParticipantVM]] = {}
     for group_number in sorted(grouped_participants):
-        group_participants = sorted(
+        group_participants = get_playoff_group_standings(
+            stage,
+            group_number,
             grouped_participants[group_number],
-            key=lambda participant: (*playoff_sort_key(participant), -participant.seed),
-            reverse=True,
-        )
+            match_by_group.get(group_number),
+            generation=generation,
+        ).order(grouped_participants[group_number])
         for participant in group_participants:
             user = user_by_id.get(participant.user_id)
             participants_by_group.setdefault(group_number, []).append(
@@ -283,6 +290,7 @@ def build_bracket_columns(
     stage_1_promoted_count: int | None = None,
     stage_2_size: int | None = None,
     direct_invite_groups: dict[int, int] | None = None,
+    standings_generation: int | None = None,
 ) -> list[BracketColumnVM]:
     def _empty_match(stage_key: str, group_number: int) -> BracketMatchVM:
         return {
@@ -316,7 +324,7 @@ def build_bracket_columns(
                 "game_number": 3 if current_game > 3 else current_game,
                 "schedule_text": _normalize_schedule(getattr(group, "schedule_text", "TBD")),
                 "lobby_password": getattr(group, "lobby_password", "TBD"),
-                "participants": _participants_for_group_members(group.members),
+                "participants": _participants_for_group_members(group, standings_generation),
                 "state": state,
             }
         )
@@ -364,7 +372,7 @@ def build_bracket_columns(
                 column["matches"] = [placeholder]
             continue
 
-        participants_by_group = _participants_for_playoff_members(stage.participants, user_by_id)
+        participants_by_group = _participants_for_playoff_members(stage, user_by_id, standings_generation)
         matches_by_group = {match.group_number: match for match in sorted(stage.matches, key=lambda item: item.group_number)}
         final_match_winner_user_id = tournament_winner_user_id
         if stage.key == "stage_final":
@@ -432,6 +440,7 @@ def build_tournament_tree_vm(
     stage_1_promoted_count: int | None = None,
     stage_2_size: int | None = None,
     direct_invite_groups: dict[int, int] | None = None,
+    standings_generation: int | None = None,
 ) -> TournamentTreeVM:
     stage_columns = build_bracket_columns(
         groups=groups,
@@ -442,6 +451,7 @@ def build_tournament_tree_vm(
         stage_1_promoted_count=stage_1_promoted_count,
         stage_2_size=stage_2_size,
         direct_invite_groups=direct_invite_groups,
+        standings_generation=standings_generation,
     )
     columns_by_key = {column["key"]: column for column in stage_columns}
 
@@ -518,30 +528,33 @@ def build_tournament_tree_vm(
 
 
 def build_playoff_standings(
-    playoff_stages: Sequence[PlayoffStage], user_by_id: Mapping[int, User]
+    playoff_stages: Sequence[PlayoffStage], user_by_id: Mapping[int, User], *, generation: int | None = None
 ) -> list[PlayoffStageStandingsVM]:
     standings: list[PlayoffStageStandingsVM] = []
     for stage in playoff_stages:
-        participants_sorted = sorted(stage.participants, key=playoff_sort_key, reverse=True)
-        stage_group_done: set[int] = set()
-        for match in stage.matches:
-            if is_limited_stage(stage.key) and match.game_number > GROUP_STAGE_GAME_LIMIT:
-                stage_group_done.add(match.group_number)
-
-        promote_n = get_promote_top_n(stage.key)
-        by_group_rank: dict[int, dict[int, int]] = {}
-        for group_number in {get_stage_group_number_by_seed(p.seed) for p in participants_sorted}:
-            group_sorted = [p for p in participants_sorted if get_stage_group_number_by_seed(p.seed) == group_number]
-            by_group_rank[group_number] = {p.user_id: idx for idx, p in enumerate(group_sorted, start=1)}
+        # Общий список этапа: равных по показателям игроков разводит приоритет судьи из их группы.
+        participants_sorted = sorted(
+            stage.participants,
+            key=lambda participant: playoff_sort_key(
+                participant,
+                standings_cache.group_tie_breaks(stage.id, get_stage_group_number_by_seed(participant.seed)),
+            ),
+            reverse=True,
+        )
+        match_by_group = {match.group_number: match for match in stage.matches}
+        participants_by_group: dict[int, list[PlayoffParticipant]] = {}
+        for participant in stage.participants:
+            participants_by_group.setdefault(get_stage_group_number_by_seed(participant.seed), []).append(participant)
+        standings_by_group = {
+            group_number: get_playoff_group_standings(
+                stage, group_number, group_participants, match_by_group.get(group_number), generation=generation
+            )
+            for group_number, group_participants in participants_by_group.items()
+        }
 
         rows: list[PlayoffStandingRow] = []
         for participant in participants_sorted:
-            group_number = get_stage_group_number_by_seed(participant.seed)
-            status = "normal"
-            if group_number in stage_group_done and promote_n > 0:
-                rank = by_group_rank[group_number].get(participant.user_id, 99)
-                status = "promoted" if rank <= promote_n else "eliminated"
-
+            group_standings = standings_by_group[get_stage_group_number_by_seed(participant.seed)]
             rows.append(
                 {
                     "user_id": participant.user_id,
@@ -552,7 +565,9 @@ def build_playoff_standings(
                     "games_played": participant.top8_finishes,
                     "top8_finishes": participant.top8_finishes,
                     "eighth_places": getattr(participant, "eighth_places", 0),
-                    "status": status,
+                    "status": group_standings.status(participant.user_id),
+                    "rank": group_standings.tie_ranks[group_standings.position(participant.user_id) - 1],
+                    "is_tied": group_standings.is_tied(participant.user_id),
                 }
             )
         standings.append({"title": stage.title, "participants": rows})
@@ -0,0 +1,98 @@
+"""Хранит компактный кэш пользователей id → ник, игровой ник, ранг и корзина для турнирных и админских страниц."""
+
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.models.user import User
+
+
+class UserDirectoryEntry:
+    """Облегчённая запись пользователя: только поля, нужные для отображения ников в сетке и админке."""
+
+    __slots__ = ("id", "nickname", "game_nickname", "highest_rank", "basket")
+
+    def __init__(self, id: int, nickname: str, game_nickname: str, highest_rank: str, basket: str) -> None:
+        self.id = id
+        self.nickname = nickname
+        self.game_nickname = game_nickname
+        self.highest_rank = highest_rank
+        self.basket = basket
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserDirectoryEntry":
+        return cls(
+            id=user.id,
+            nickname=user.nickname,
+            game_nickname=user.game_nickname,
+            highest_rank=user.highest_rank,
+            basket=user.basket,
+        )
+
+
+class UserDirectory:
+    """Процессный кэш справочника пользователей с ленивой загрузкой и точечным обновлением."""
+
+    def __init__(self) -> None:
+        self._entries: dict[int, UserDirectoryEntry] = {}
+        self._loaded = False
+        # Растёт при каждой записи: загрузка, пересекшаяся с изменением, не помечает кэш актуальным.
+        self._generation = 0
+
+    async def get(self, db: AsyncSession) -> Mapping[int, UserDirectoryEntry]:
+        if self._loaded:
+            return MappingProxyType(self._entries)
+
+        generation = self._generation
+        users = (
+            await db.scalars(
+                select(User).options(
+                    load_only(User.id, User.nickname, User.game_nickname, User.highest_rank, User.basket)
+                )
+            )
+        ).all()
+        entries = {user.id: UserDirectoryEntry.from_user(user) for user in users}
+        if generation == self._generation:
+            self._entries = entries
+            self._loaded = True
+        return MappingProxyType(entries)
+
+    def refresh(self, user: User) -> None:
+        self._generation += 1
+        if self._loaded:
+            self._entries[user.id] = UserDirectoryEntry.from_user(user)
+
+    def remove(self, user_id: int) -> None:
+        self._generation += 1
+        self._entries.pop(user_id, None)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entries = {}
+        self._loaded = False
+
+
+user_directory = UserDirectory()
+
+
+async def get_user_directory(db: AsyncSession) -> Mapping[int, UserDirectoryEntry]:
+    """Возвращает справочник id → запись пользователя, загружая его из БД при первом обращении."""
+    return await user_directory.get(db)
+
+
+def refresh_user_directory_entry(user: User) -> None:
+    """Обновляет запись пользователя после сохранения его ника, ранга или корзины."""
+    user_directory.refresh(user)
+
+
+def remove_user_directory_entry(user_id: int) -> None:
+    """Удаляет запись пользователя из справочника после удаления из БД."""
+    user_directory.remove(user_id)
+
+
+def invalidate_user_directory() -> None:
+    """Сбрасывает справочник целиком после массовых изменений таблицы users."""
+    user_directory.invalidate()
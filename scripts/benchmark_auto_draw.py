@@ -0,0 +1,44 @@
+"""Замеряет время автоматической жеребьёвки без БД для стандартного и открытого отборочного формата."""
+
+import argparse
+import random
+import time
+
+from app.services.draw_engine import draw_groups
+from app.services.tournament import PRIMARY_BASKETS, PRIMARY_DRAW_BASKETS_WITH_RESERVE
+
+DRAW_BASKETS = [*PRIMARY_BASKETS, *PRIMARY_DRAW_BASKETS_WITH_RESERVE.values()]
+
+
+def _players(count: int) -> list[tuple[int, str]]:
+    return [(player_id, random.choice(DRAW_BASKETS)) for player_id in range(count)]
+
+
+def _measure(players: list[tuple[int, str]], group_count: int, group_size: int, repeats: int) -> float:
+    started = time.perf_counter()
+    for seed in range(repeats):
+        draw_groups(
+            players,
+            group_count=group_count,
+            group_size=group_size,
+            basket_of=lambda player: player[1],
+            quota_baskets=PRIMARY_DRAW_BASKETS_WITH_RESERVE,
+            pool_baskets=PRIMARY_BASKETS,
+            rng=random.Random(seed),
+        )
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    for group_count, group_size in ((7, 8), (128, 8), (256, 8)):
+        players = _players(group_count * group_size + group_count)
+        elapsed_ms = _measure(players, group_count, group_size, args.repeats)
+        print(f"{len(players)} players -> {group_count}x{group_size}: {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
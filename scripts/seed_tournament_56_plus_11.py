@@ -8,7 +8,7 @@ import string
 from sqlalchemy import select
 
 from app.models.user import Basket, User
-from app.services.rank import mmr_to_rank
+from app.services.rank import apply_rank_sort_columns, mmr_to_rank
 
 MAIN_ROSTER_BASKETS = [
     Basket.QUEEN.value,
@@ -84,6 +84,7 @@ async def main() -> None:
                 discord=f"test_{player_index}",
                 basket=basket,
             )
+            apply_rank_sort_columns(user)
             db.add(user)
 
             main_created += 1
@@ -110,6 +111,7 @@ async def main() -> None:
                 discord=f"reserve_{reserve_index}",
                 basket=basket,
             )
+            apply_rank_sort_columns(user)
             db.add(user)
 
             reserve_created += 1
@@ -136,6 +138,7 @@ async def main() -> None:
                 basket="invited",
                 direct_invite_stage="stage_2",
             )
+            apply_rank_sort_columns(user)
             db.add(user)
             direct_invites_created += 1
 
@@ -14,6 +14,8 @@ class _FakeChatMessage:
         self.id = message_id
         self.temp_nick = temp_nick
         self.message = message
+        self.nick_color = None
+        self.created_at = datetime(2026, 3, 1, 12, 0)
 
 
 class _FakeChatSettings:
@@ -25,6 +27,7 @@ def test_admin_chat_message_update_success(monkeypatch) -> None:
     """Проверяет успешное обновление сообщения админом."""
     target_message = _FakeChatMessage(message_id=7, temp_nick="old", message="old message")
     state = {"committed": False}
+    published = []
 
     async def fake_get(self, model, pk):
         return target_message if pk == 7 else None
@@ -35,9 +38,13 @@ def test_admin_chat_message_update_success(monkeypatch) -> None:
     async def fake_commit(self):
         state["committed"] = True
 
+    async def fake_publish(event="chat_update", data=None):
+        published.append((event, data))
+
     monkeypatch.setattr(web.AsyncSession, "get", fake_get, raising=False)
     monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
     monkeypatch.setattr(web.AsyncSession, "commit", fake_commit, raising=False)
+    monkeypatch.setattr(web.chat_event_broker, "publish", fake_publish)
 
     with TestClient(app) as client:
         client.cookies.set(ADMIN_SESSION_COOKIE, create_admin_session_cookie())
@@ -52,6 +59,19 @@ def test_admin_chat_message_update_success(monkeypatch) -> None:
     assert target_message.temp_nick == "new nick"
     assert target_message.message == "new message"
     assert state["committed"] is True
+    assert published == [
+        (
+            "chat_updated",
+            {
+                "id": 7,
+                "temp_nick": "new nick",
+                "message": "new message",
+                "nick_color": web.CHAT_NICK_COLORS[0],
+                "is_admin": False,
+                "created_at_display": web.format_msk_datetime(target_message.created_at),
+            },
+        )
+    ]
 
 
 def test_admin_chat_message_update_rejects_too_long_text(monkeypatch) -> None:
@@ -90,7 +110,7 @@ def test_admin_chat_message_update_rejects_too_long_text(monkeypatch) -> None:
 def test_admin_chat_message_delete_success(monkeypatch) -> None:
     """Проверяет успешное удаление сообщения админом."""
     target_message = _FakeChatMessage(message_id=9, temp_nick="nick", message="msg")
-    state = {"deleted": False, "committed": False}
+    state = {"deleted": False, "committed": False, "published": None}
 
     async def fake_get(self, model, pk):
         return target_message if pk == 9 else None
@@ -101,9 +121,13 @@ def test_admin_chat_message_delete_success(monkeypatch) -> None:
     async def fake_commit(self):
         state["committed"] = True
 
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = (event, data)
+
     monkeypatch.setattr(web.AsyncSession, "get", fake_get, raising=False)
     monkeypatch.setattr(web.AsyncSession, "delete", fake_delete, raising=False)
     monkeypatch.setattr(web.AsyncSession, "commit", fake_commit, raising=False)
+    monkeypatch.setattr(web.chat_event_broker, "publish", fake_publish)
 
     with TestClient(app) as client:
         client.cookies.set(ADMIN_SESSION_COOKIE, create_admin_session_cookie())
@@ -115,7 +139,7 @@ def test_admin_chat_message_delete_success(monkeypatch) -> None:
 
     assert response.status_code == 303
     assert response.headers["location"] == "/admin?msg=msg_admin_chat_message_deleted"
-    assert state == {"deleted": True, "committed": True}
+    assert state == {"deleted": True, "committed": True, "published": ("chat_deleted", {"id": 9})}
 
 
 
@@ -206,8 +230,8 @@ def test_admin_send_chat_uses_selected_sender_and_sets_cookie(monkeypatch) -> No
     async def fake_commit(self):
         return None
 
-    async def fake_publish():
-        state["published"] = True
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = event
 
     monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
     monkeypatch.setattr(web.AsyncSession, "add", fake_add, raising=False)
@@ -224,7 +248,7 @@ def test_admin_send_chat_uses_selected_sender_and_sets_cookie(monkeypatch) -> No
 
     assert response.status_code == 303
     assert response.headers["location"] == "/admin?msg=msg_admin_chat_message_saved"
-    assert state["published"] is True
+    assert state["published"] == "chat_created"
     assert state["saved_message"] is not None
     assert state["saved_message"].temp_nick == "@Loyrensss"
     assert state["saved_message"].nick_color == "#b084ff"
@@ -242,8 +266,8 @@ def test_admin_clear_chat_messages_success(monkeypatch) -> None:
     async def fake_commit(self):
         state["committed"] = True
 
-    async def fake_publish():
-        state["published"] = True
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = event
 
     monkeypatch.setattr(web.AsyncSession, "execute", fake_execute, raising=False)
     monkeypatch.setattr(web.AsyncSession, "commit", fake_commit, raising=False)
@@ -255,7 +279,7 @@ def test_admin_clear_chat_messages_success(monkeypatch) -> None:
 
     assert response.status_code == 303
     assert response.headers["location"] == "/admin?msg=msg_admin_chat_messages_cleared"
-    assert state == {"executed": True, "committed": True, "published": True}
+    assert state == {"executed": True, "committed": True, "published": "chat_cleared"}
 
 
 def test_admin_send_chat_clear_command_clears_messages(monkeypatch) -> None:
@@ -275,8 +299,8 @@ def test_admin_send_chat_clear_command_clears_messages(monkeypatch) -> None:
     async def fake_commit(self):
         state["committed"] = True
 
-    async def fake_publish():
-        state["published"] = True
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = event
 
     def fake_add(self, instance):
         state["added"] = True
@@ -297,7 +321,7 @@ def test_admin_send_chat_clear_command_clears_messages(monkeypatch) -> None:
 
     assert response.status_code == 303
     assert response.headers["location"] == "/admin?msg=msg_admin_chat_messages_cleared"
-    assert state == {"executed": True, "committed": True, "published": True, "added": False}
+    assert state == {"executed": True, "committed": True, "published": "chat_cleared", "added": False}
 
 def test_send_chat_publishes_stream_event(monkeypatch) -> None:
     """Проверяет публикацию SSE-события после пользовательского сообщения."""
@@ -321,8 +345,8 @@ def test_send_chat_publishes_stream_event(monkeypatch) -> None:
     async def fake_commit(self):
         return None
 
-    async def fake_publish():
-        state["published"] = True
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = event
 
     monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
     monkeypatch.setattr(web.AsyncSession, "scalar", fake_scalar, raising=False)
@@ -338,7 +362,7 @@ def test_send_chat_publishes_stream_event(monkeypatch) -> None:
         )
 
     assert response.status_code == 303
-    assert state["published"] is True
+    assert state["published"] == "chat_created"
 
 
 def test_admin_send_chat_publishes_stream_event(monkeypatch) -> None:
@@ -358,8 +382,8 @@ def test_admin_send_chat_publishes_stream_event(monkeypatch) -> None:
     async def fake_commit(self):
         return None
 
-    async def fake_publish():
-        state["published"] = True
+    async def fake_publish(event="chat_update", data=None):
+        state["published"] = event
 
     monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
     monkeypatch.setattr(web.AsyncSession, "add", fake_add, raising=False)
@@ -376,7 +400,7 @@ def test_admin_send_chat_publishes_stream_event(monkeypatch) -> None:
 
     assert response.status_code == 303
     assert response.headers["location"] == "/admin?msg=msg_admin_chat_message_saved"
-    assert state["published"] is True
+    assert state["published"] == "chat_created"
 
 
 def test_format_chat_message_source_variants() -> None:
@@ -451,7 +475,7 @@ def test_send_chat_uses_forwarded_for_ip(monkeypatch) -> None:
     async def fake_commit(self):
         return None
 
-    async def fake_publish():
+    async def fake_publish(event="chat_update", data=None):
         return None
 
     monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
@@ -47,6 +47,8 @@ class _FakeContentDB:
             return max([item.sort_order for item in self.crypto_wallets], default=None)
         if "max(donors.sort_order)" in query:
             return max([item.sort_order for item in self.donors], default=None)
+        if "sum(donors.amount)" in query:
+            return sum(item.amount for item in self.donors)
         if "FROM rules_content" in query:
             return self.rules_content[0] if self.rules_content else None
         if "site_settings.key" in query:
@@ -4,7 +4,7 @@ import unittest
 from unittest.mock import AsyncMock, Mock, patch
 
 from app.models.settings import SiteSetting
-from app.models.tournament import PlayoffParticipant
+from app.models.tournament import PlayoffParticipant, PlayoffStage
 from app.routers import web
 
 
@@ -191,6 +191,50 @@ class AdminEmergencyRecoveryTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(log_entry.action_type, "group_move")
         db.commit.assert_awaited_once()
 
+    async def test_rebuild_stage_clears_game_log_of_zeroed_participants(self) -> None:
+        request = AsyncMock()
+        request.cookies = {}
+        db = AsyncMock()
+        db.add = Mock()
+        stage = PlayoffStage(id=11, key="stage_2", title="Stage 2", stage_size=8, stage_order=1)
+        db.scalar = AsyncMock(side_effect=[stage, SiteSetting(key="tournament_finished", value="0")])
+        db.scalars = AsyncMock(return_value=Mock(all=Mock(return_value=[])))
+
+        response = await web.admin_emergency_rebuild_stage(
+            request=request,
+            stage_id=11,
+            user_ids="1,2,3",
+            dry_run=False,
+            confirm_final=False,
+            db=db,
+        )
+
+        self.assertEqual(response.status_code, 303)
+        deleted_tables = [call.args[0].table.name for call in db.execute.await_args_list]
+        self.assertEqual(deleted_tables, ["playoff_game_results", "playoff_point_adjustments", "playoff_participants"])
+        db.commit.assert_awaited_once()
+
+    async def test_undo_last_game_reports_refusal_reason(self) -> None:
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[SiteSetting(key="tournament_finished", value="0"), 11])
+
+        with patch.object(
+            web, "undo_last_playoff_game", AsyncMock(side_effect=ValueError("Игроки этапа уже переведены в следующий этап"))
+        ):
+            response = await web.admin_playoff_undo_last_game(stage_id=11, group_number=1, confirm_final=False, db=db)
+
+        self.assertEqual(response.status_code, 303)
+        self.assertIn("msg_operation_failed", response.headers["location"])
+        self.assertIn("details=", response.headers["location"])
+
+    async def test_undo_last_game_does_not_swallow_unexpected_errors(self) -> None:
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[SiteSetting(key="tournament_finished", value="0"), 11])
+
+        with patch.object(web, "undo_last_playoff_game", AsyncMock(side_effect=RuntimeError("db down"))):
+            with self.assertRaises(RuntimeError):
+                await web.admin_playoff_undo_last_game(stage_id=11, group_number=1, confirm_final=False, db=db)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+"""Проверяет сессию администратора: срок в подписанном payload, LRU проверенных сессий и одну проверку на запрос."""
+
+from fastapi.testclient import TestClient
+
+from app.core import admin_session
+from app.core.admin_session import (
+    ADMIN_SESSION_CACHE_SIZE,
+    ADMIN_SESSION_COOKIE,
+    _b64_encode,
+    _sign,
+    clear_admin_session_cache,
+    create_admin_session_cookie,
+    is_admin_session,
+    read_admin_session,
+)
+from app.main import app
+from app.routers import web
+
+
+def _count_verifications(monkeypatch) -> list[int]:
+    calls = []
+    original = admin_session._verify_admin_session
+
+    def counting_verify(payload, signature):
+        calls.append(1)
+        return original(payload, signature)
+
+    monkeypatch.setattr(admin_session, "_verify_admin_session", counting_verify)
+    return calls
+
+
+def test_session_carries_expiry_and_legacy_or_expired_cookies_are_rejected() -> None:
+    assert read_admin_session(create_admin_session_cookie())["is_admin"] is True
+    assert is_admin_session(create_admin_session_cookie(ttl_seconds=-1)) is False
+
+    legacy_payload = _b64_encode('{"is_admin":true}')
+    assert is_admin_session(f"{legacy_payload}.{_sign(legacy_payload)}") is False
+
+
+def test_repeated_checks_hit_the_cache_and_tampered_payload_is_not_trusted(monkeypatch) -> None:
+    clear_admin_session_cache()
+    calls = _count_verifications(monkeypatch)
+    cookie = create_admin_session_cookie()
+
+    assert all(is_admin_session(cookie) for _ in range(50))
+    assert len(calls) == 1
+
+    # Подпись из кэша не подходит к чужому payload.
+    forged_payload = _b64_encode('{"is_admin":true,"expires_at":4102444800}')
+    assert is_admin_session(f"{forged_payload}.{cookie.rsplit('.', 1)[1]}") is False
+
+
+def test_session_cache_is_bounded() -> None:
+    clear_admin_session_cache()
+
+    for ttl in range(ADMIN_SESSION_CACHE_SIZE * 3):
+        assert is_admin_session(create_admin_session_cookie(ttl_seconds=3600 + ttl))
+
+    assert len(admin_session._verified_admin_sessions) == ADMIN_SESSION_CACHE_SIZE
+
+
+def test_admin_request_is_verified_once_between_middleware_and_handler(monkeypatch) -> None:
+    class _TinyChatSettings:
+        max_length = 1
+
+    async def fake_get_chat_settings(db):
+        return _TinyChatSettings()
+
+    clear_admin_session_cache()
+    calls = _count_verifications(monkeypatch)
+    monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
+
+    with TestClient(app) as client:
+        client.cookies.set(ADMIN_SESSION_COOKIE, create_admin_session_cookie())
+        response = client.post("/admin/chat/send", data={"message": "too long"}, follow_redirects=False)
+
+    assert response.headers["location"] == "/admin?msg=msg_message_too_long"
+    assert len(calls) == 1
@@ -0,0 +1,91 @@
+"""Проверяет общий загрузчик и кэш справочника пользователей для админки и турнирной сетки."""
+
+import asyncio
+
+from app.models.user import Basket, User
+from app.routers import web
+from app.services.user_directory import (
+    get_user_directory,
+    invalidate_user_directory,
+    refresh_user_directory_entry,
+    remove_user_directory_entry,
+)
+
+
+class _FakeScalarResult:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def all(self) -> list:
+        return self._rows
+
+
+class _FakeDB:
+    def __init__(self, users: list[User]) -> None:
+        self.users = users
+        self.statements = []
+
+    async def scalars(self, statement):
+        self.statements.append(statement)
+        if "users.basket !=" in str(statement):
+            return _FakeScalarResult([user for user in self.users if user.basket != Basket.INVITED.value])
+        return _FakeScalarResult(self.users)
+
+
+def _user(user_id: int, nickname: str, basket: str) -> User:
+    return User(
+        id=user_id,
+        nickname=nickname,
+        steam_input=f"steam_{user_id}",
+        steam_id=f"steam_{user_id}",
+        game_nickname=nickname,
+        current_rank="Pawn-1",
+        highest_rank="Pawn-1",
+        basket=basket,
+    )
+
+
+def test_load_admin_user_directory_excludes_invited_only_from_draw_list() -> None:
+    users = [
+        _user(1, "alpha", Basket.QUEEN.value),
+        _user(2, "bravo", Basket.INVITED.value),
+        _user(3, "charlie", Basket.KING_RESERVE.value),
+    ]
+    fake_db = _FakeDB(users)
+
+    manual_draw_users, users_by_id = asyncio.run(web._load_admin_user_directory(fake_db))
+
+    assert "users.basket !=" in str(fake_db.statements[0])
+    assert [user.id for user in manual_draw_users] == [1, 3]
+    assert users_by_id == {1: "alpha", 2: "bravo", 3: "charlie"}
+
+
+def test_user_directory_is_cached_and_refreshed_incrementally() -> None:
+    users = [_user(1, "alpha", Basket.QUEEN.value), _user(2, "bravo", Basket.KING.value)]
+    fake_db = _FakeDB(users)
+
+    directory = asyncio.run(get_user_directory(fake_db))
+    assert directory[1].nickname == "alpha"
+    assert "extra_data" not in str(fake_db.statements[0])
+
+    renamed = _user(1, "alpha_new", Basket.QUEEN_RESERVE.value)
+    refresh_user_directory_entry(renamed)
+    remove_user_directory_entry(2)
+    directory = asyncio.run(get_user_directory(fake_db))
+
+    assert len(fake_db.statements) == 1
+    assert directory[1].nickname == "alpha_new"
+    assert directory[1].basket == Basket.QUEEN_RESERVE.value
+    assert 2 not in directory
+
+
+def test_user_directory_reloads_after_invalidate() -> None:
+    fake_db = _FakeDB([_user(1, "alpha", Basket.QUEEN.value)])
+    asyncio.run(get_user_directory(fake_db))
+
+    fake_db.users = [_user(5, "echo", Basket.ROOK.value)]
+    invalidate_user_directory()
+    directory = asyncio.run(get_user_directory(fake_db))
+
+    assert len(fake_db.statements) == 2
+    assert list(directory.keys()) == [5]
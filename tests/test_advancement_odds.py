@@ -0,0 +1,141 @@
+"""Проверяет Монте-Карло оценку шансов выхода из группы."""
+
+import asyncio
+import random
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.tournament import GroupMember, PlayoffManualTieBreak, PlayoffMatch, PlayoffParticipant, PlayoffStage
+from app.services.advancement_odds import (
+    GROUP_ORDERING,
+    PLAYOFF_ORDERING,
+    load_advancement_inputs,
+    simulate_group_advancement,
+    simulate_stage_advancement,
+)
+from app.services.tournament import playoff_sort_key, sort_members_for_table
+
+
+def _random_counters(rng: random.Random, user_id: int) -> tuple[int, int, int, int, int, int, int]:
+    top8 = rng.randint(0, 3)
+    eighth = rng.randint(0, top8)
+    return (user_id, rng.randint(0, 8 * top8), rng.randint(0, top8), rng.randint(0, top8), top8, eighth, rng.randint(1, 8))
+
+
+def test_finished_group_matches_playoff_sort_key() -> None:
+    rng = random.Random(3)
+    for _ in range(50):
+        players = [_random_counters(rng, user_id) for user_id in rng.sample(range(1, 100), 8)]
+        participants = [
+            PlayoffParticipant(user_id=uid, points=points, wins=wins, top4_finishes=top4, top8_finishes=top8, eighth_places=eighth, last_place=last)
+            for uid, points, wins, top4, top8, eighth, last in players
+        ]
+        expected = {participant.user_id for participant in sorted(participants, key=playoff_sort_key, reverse=True)[:4]}
+
+        odds = simulate_group_advancement(players, remaining_games=0, advance_count=4, ordering=PLAYOFF_ORDERING)
+
+        assert {user_id for user_id, probability in odds.items() if probability == 1.0} == expected
+
+
+def test_finished_group_matches_group_table_order() -> None:
+    rng = random.Random(4)
+    for _ in range(50):
+        players = [_random_counters(rng, user_id) for user_id in rng.sample(range(1, 100), 8)]
+        members = [
+            GroupMember(user_id=uid, total_points=points, first_places=wins, top4_finishes=top4, top8_finishes=top8, eighth_places=eighth, last_game_place=last)
+            for uid, points, wins, top4, top8, eighth, last in players
+        ]
+        expected = {member.user_id for member in sort_members_for_table(members)[:3]}
+
+        odds = simulate_group_advancement(players, remaining_games=0, advance_count=3, ordering=GROUP_ORDERING)
+
+        assert {user_id for user_id, probability in odds.items() if probability == 1.0} == expected
+
+
+def test_finished_group_breaks_ties_by_judge_priority_like_the_tables() -> None:
+    # Все восемь равны по показателям: порядок решают только приоритеты судьи и user_id.
+    players = [(user_id, 12, 1, 2, 3, 0, 4) for user_id in range(1, 9)]
+    tie_breaks = {7: 1, 8: 2, 5: 3}
+    participants = [
+        PlayoffParticipant(user_id=uid, points=points, wins=wins, top4_finishes=top4, top8_finishes=top8, eighth_places=eighth, last_place=last)
+        for uid, points, wins, top4, top8, eighth, last in players
+    ]
+    members = [
+        GroupMember(user_id=uid, total_points=points, first_places=wins, top4_finishes=top4, top8_finishes=top8, eighth_places=eighth, last_game_place=last)
+        for uid, points, wins, top4, top8, eighth, last in players
+    ]
+    expected_playoff = sorted(participants, key=lambda participant: playoff_sort_key(participant, tie_breaks), reverse=True)[:4]
+    expected_group = sort_members_for_table(members, tie_breaks)[:3]
+
+    playoff_odds = simulate_group_advancement(
+        players, remaining_games=0, advance_count=4, ordering=PLAYOFF_ORDERING, tie_breaks=tie_breaks
+    )
+    group_odds = simulate_group_advancement(
+        players, remaining_games=0, advance_count=3, ordering=GROUP_ORDERING, tie_breaks=tie_breaks
+    )
+
+    assert {user_id for user_id, probability in playoff_odds.items() if probability == 1.0} == {7, 8, 5, 1}
+    assert {participant.user_id for participant in expected_playoff} == {7, 8, 5, 1}
+    assert {user_id for user_id, probability in group_odds.items() if probability == 1.0} == {
+        member.user_id for member in expected_group
+    }
+
+
+def test_equal_group_gives_equal_chances_and_clinched_leader_is_certain() -> None:
+    equal_players = [(user_id, 0, 0, 0, 0, 0, 8) for user_id in range(1, 9)]
+    odds = simulate_group_advancement(
+        equal_players, remaining_games=3, advance_count=4, ordering=PLAYOFF_ORDERING, simulations=20000, rng=random.Random(1)
+    )
+    assert abs(sum(odds.values()) - 4) < 1e-9
+    assert all(abs(probability - 0.5) < 0.03 for probability in odds.values())
+
+    # Лидер с отрывом больше 8 очков за оставшуюся игру в топ-4 проходит всегда.
+    leader_players = [(1, 30, 2, 2, 2, 0, 1)] + [(user_id, 8, 0, 1, 2, 0, 5) for user_id in range(2, 9)]
+    odds = simulate_group_advancement(
+        leader_players, remaining_games=1, advance_count=4, ordering=PLAYOFF_ORDERING, simulations=2000, rng=random.Random(2)
+    )
+    assert odds[1] == 1.0
+
+
+def test_stage_simulation_is_seeded_cached_and_fast() -> None:
+    rng = random.Random(5)
+    inputs = {
+        "stage_key": "group_stage",
+        "ordering": GROUP_ORDERING,
+        "advance_count": 3,
+        "groups": [
+            {
+                "group_number": group_number,
+                "name": chr(64 + group_number),
+                "remaining_games": 2,
+                "players": [_random_counters(rng, (group_number - 1) * 8 + index) for index in range(1, 9)],
+            }
+            for group_number in range(1, 8)
+        ],
+    }
+
+    started = time.perf_counter()
+    result = simulate_stage_advancement(inputs, simulations=10000, seed=11)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.5
+    assert [group["group_number"] for group in result["groups"]] == list(range(1, 8))
+    assert all(abs(sum(player["probability"] for player in group["players"]) - 3) < 0.01 for group in result["groups"])
+    assert simulate_stage_advancement(inputs, simulations=10000, seed=11) is result
+
+
+def test_playoff_inputs_carry_the_stage_tie_breaks_per_group() -> None:
+    stage = PlayoffStage(id=7, key="stage_2", title="Stage 2", stage_order=1, stage_size=16)
+    participants = [PlayoffParticipant(stage_id=7, user_id=user_id, seed=user_id, points=0) for user_id in range(1, 17)]
+    matches = [PlayoffMatch(stage_id=7, group_number=number, game_number=2, state="in_progress") for number in (1, 2)]
+    tie_breaks = [
+        PlayoffManualTieBreak(stage_id=7, group_number=2, user_id=12, priority=1),
+        PlayoffManualTieBreak(stage_id=7, group_number=2, user_id=10, priority=2),
+    ]
+    db = MagicMock()
+    db.scalar = AsyncMock(return_value=stage)
+    db.scalars = AsyncMock(side_effect=[MagicMock(all=lambda rows=rows: rows) for rows in (participants, matches, tie_breaks)])
+
+    inputs = asyncio.run(load_advancement_inputs(db, 7))
+
+    assert [group["tie_breaks"] for group in inputs["groups"]] == [{}, {12: 1, 10: 2}]
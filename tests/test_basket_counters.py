@@ -0,0 +1,136 @@
+"""Проверяет резервирование места в корзине под блокировкой счётчика при одновременных регистрациях."""
+
+import asyncio
+import random
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import Basket, PendingRegistration, User
+from app.services import registration_queue
+from app.services.basket_allocator import BASKET_LIMIT, reserve_basket
+from app.services.registration_queue import enrich_pending_registration
+
+
+class _CounterStore:
+    """Общее состояние «базы»: счётчики корзин и блокировки их строк (как FOR UPDATE в Postgres)."""
+
+    def __init__(self) -> None:
+        self.members: dict[str, int] = {}
+        self.row_locks: dict[str, asyncio.Lock] = {}
+        self.registrations: dict[int, PendingRegistration] = {}
+        self.users: list[User] = []
+
+
+class _FakeClaimResult:
+    def __init__(self, row) -> None:
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _FakeCounterSession:
+    def __init__(self, store: _CounterStore) -> None:
+        self.store = store
+        self.held: list[asyncio.Lock] = []
+        self.pending: list[User] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.rollback()
+
+    @staticmethod
+    def _basket(statement) -> str:
+        return next(iter(statement.compile(dialect=postgresql.dialect()).params.values()))
+
+    async def get(self, model, pk):
+        return self.store.registrations.get(pk)
+
+    async def execute(self, statement):
+        if statement.is_update:
+            # Захват заявки фоновой задачей: здесь каждая заявка обрабатывается ровно одной задачей.
+            registration = self.store.registrations[statement.compile(dialect=postgresql.dialect()).params["id_1"]]
+            registration.attempts += 1
+            return _FakeClaimResult((registration.steam_input, registration.steam_id))
+        # INSERT ... ON CONFLICT DO NOTHING: строка счётчика появляется один раз.
+        self.store.members.setdefault(self._basket(statement), 0)
+
+    async def scalar(self, statement):
+        if getattr(statement, "_for_update_arg", None) is None:
+            return None
+        basket = self._basket(statement)
+        lock = self.store.row_locks.setdefault(basket, asyncio.Lock())
+        await lock.acquire()
+        self.held.append(lock)
+        return self.store.members[basket]
+
+    def add(self, instance) -> None:
+        self.pending.append(instance)
+
+    async def flush(self) -> None:
+        await asyncio.sleep(random.random() / 1000)
+
+    async def commit(self) -> None:
+        await asyncio.sleep(random.random() / 1000)
+        # То, что делает триггер users_basket_counters в той же транзакции.
+        for user in self.pending:
+            self.store.members[user.basket] = self.store.members.get(user.basket, 0) + 1
+            self.store.users.append(user)
+        self.pending = []
+        await self.rollback()
+
+    async def rollback(self) -> None:
+        while self.held:
+            self.held.pop().release()
+
+
+def test_reserve_basket_skips_counters_for_unlimited_baskets() -> None:
+    store = _CounterStore()
+    session = _FakeCounterSession(store)
+
+    assert asyncio.run(reserve_basket(session, Basket.INVITED.value)) == Basket.INVITED.value
+    assert store.members == {}
+
+
+def test_simultaneous_registrations_do_not_overfill_limited_basket(monkeypatch) -> None:
+    store = _CounterStore()
+    registrations = 300
+    for index in range(registrations):
+        store.registrations[index] = PendingRegistration(
+            id=index,
+            token=f"{index:032x}",
+            steam_input=f"7656119800000{index:04d}",
+            steam_id=f"7656119800000{index:04d}",
+            nickname=f"P{index}",
+            status="pending",
+            attempts=0,
+        )
+
+    async def fake_fetch_autochess_data(steam_id):
+        # Профили приходят вразнобой, как от внешнего API под нагрузкой.
+        await asyncio.sleep(random.random() / 100)
+        return {"game_nickname": steam_id, "current_rank": "Queen", "highest_rank": "Queen", "raw": {}}
+
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", fake_fetch_autochess_data)
+    monkeypatch.setattr(registration_queue, "pick_basket", lambda *args, **kwargs: Basket.QUEEN.value)
+    monkeypatch.setattr(registration_queue, "refresh_user_directory_entry", lambda user: None)
+
+    async def enrich_all():
+        # Все заявки разом, без ограничения параллельности воркера.
+        monkeypatch.setattr(registration_queue, "_enrichment_slots", asyncio.Semaphore(registrations))
+        return await asyncio.gather(
+            *(enrich_pending_registration(lambda: _FakeCounterSession(store), index) for index in range(registrations))
+        )
+
+    statuses = asyncio.run(enrich_all())
+
+    assert statuses == ["done"] * registrations
+    placed = [user.basket for user in store.users]
+    assert placed.count(Basket.QUEEN.value) == BASKET_LIMIT
+    assert placed.count(Basket.QUEEN_RESERVE.value) == registrations - BASKET_LIMIT
+    assert store.members == {
+        Basket.QUEEN.value: BASKET_LIMIT,
+        Basket.QUEEN_RESERVE.value: registrations - BASKET_LIMIT,
+    }
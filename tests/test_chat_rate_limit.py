@@ -0,0 +1,131 @@
+"""Проверяет ограничитель частоты чата: окна по отправителю и IP, вытеснение и общий Postgres-бэкенд."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.main import app
+from app.routers import web
+from app.services import chat_rate_limit
+from app.services.chat_rate_limit import (
+    CHAT_IP_MESSAGES_PER_WINDOW,
+    MemoryChatCooldownLimiter,
+    PostgresChatCooldownLimiter,
+    chat_send_limits,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _acquire(limiter, sender: str, ip: str = "203.0.113.1", window: int = 10) -> bool:
+    return asyncio.run(limiter.try_acquire(None, chat_send_limits(sender, ip), window))
+
+
+def test_sender_window_rejects_until_cooldown_passes() -> None:
+    clock = _Clock()
+    limiter = MemoryChatCooldownLimiter(clock=clock)
+
+    assert _acquire(limiter, "a") is True
+    clock.now += 9.9
+    assert _acquire(limiter, "a") is False
+    clock.now += 0.1
+    assert _acquire(limiter, "a") is True
+    assert _acquire(limiter, "b", window=0) is True
+
+
+def test_ip_window_allows_a_few_senders_then_rejects_flood() -> None:
+    limiter = MemoryChatCooldownLimiter(clock=_Clock())
+
+    accepted = [_acquire(limiter, f"token-{index}") for index in range(CHAT_IP_MESSAGES_PER_WINDOW + 3)]
+
+    assert accepted == [True] * CHAT_IP_MESSAGES_PER_WINDOW + [False] * 3
+    # Отклонённая попытка не занимает окно отправителя на другом IP.
+    assert _acquire(limiter, f"token-{CHAT_IP_MESSAGES_PER_WINDOW}", ip="198.51.100.2") is True
+
+
+def test_expired_windows_are_evicted_and_key_count_is_bounded() -> None:
+    clock = _Clock()
+    limiter = MemoryChatCooldownLimiter(max_keys=6, clock=clock)
+
+    for index in range(3):
+        _acquire(limiter, f"token-{index}", ip=f"ip-{index}")
+    assert len(limiter) == 6
+    _acquire(limiter, "token-new", ip="ip-new")
+    assert len(limiter) == 6
+
+    clock.now += 11
+    _acquire(limiter, "late", ip="ip-late")
+    assert len(limiter) == 2
+
+
+def test_postgres_limiter_rolls_back_rejected_attempt_to_savepoint_only() -> None:
+    limiter = PostgresChatCooldownLimiter()
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    savepoint = MagicMock(rollback=AsyncMock(), commit=AsyncMock())
+    db.begin_nested = AsyncMock(return_value=savepoint)
+    result = MagicMock()
+    result.all.return_value = [("sender:a", 2), ("ip:203.0.113.1", 2)]
+    db.execute = AsyncMock(return_value=result)
+
+    assert asyncio.run(limiter.try_acquire(db, chat_send_limits("a", "203.0.113.1"), 10)) is False
+    savepoint.rollback.assert_awaited_once()
+    db.rollback.assert_not_awaited()
+    statement = db.execute.await_args.args[0]
+    assert "ON CONFLICT (key) DO UPDATE" in str(statement.compile(dialect=postgresql.dialect()))
+
+    result.all.return_value = [("sender:b", 1), ("ip:203.0.113.1", 3)]
+    assert asyncio.run(limiter.try_acquire(db, chat_send_limits("b", "203.0.113.1"), 10)) is True
+    savepoint.rollback.assert_awaited_once()
+    savepoint.commit.assert_awaited_once()
+    db.rollback.assert_not_awaited()
+
+
+def test_send_chat_enforces_cooldown_without_message_lookup(monkeypatch) -> None:
+    class _FakeSendChatSettings:
+        is_enabled = True
+        max_length = 100
+        cooldown_seconds = 10
+
+    saved: list[object] = []
+
+    async def fake_get_chat_settings(db):
+        return _FakeSendChatSettings()
+
+    async def fail_scalar(self, statement):
+        raise AssertionError("cooldown must not query chat history")
+
+    async def fake_commit(self):
+        return None
+
+    async def fake_publish(event="chat_update", data=None):
+        return None
+
+    monkeypatch.setattr(chat_rate_limit.settings, "chat_rate_limit_backend", "memory")
+    monkeypatch.setattr(web, "get_chat_settings", fake_get_chat_settings)
+    monkeypatch.setattr(web.AsyncSession, "scalar", fail_scalar, raising=False)
+    monkeypatch.setattr(web.AsyncSession, "add", lambda self, instance: saved.append(instance), raising=False)
+    monkeypatch.setattr(web.AsyncSession, "commit", fake_commit, raising=False)
+    monkeypatch.setattr(web.chat_event_broker, "publish", fake_publish)
+
+    with TestClient(app) as client:
+        client.cookies.set("chat_sender", "f" * 32)
+        responses = [
+            client.post("/chat/send", data={"temp_nick": "User", "message": "spam"}, follow_redirects=False)
+            for _ in range(3)
+        ]
+
+    assert [response.headers["location"] for response in responses] == [
+        "/#chat",
+        "/?msg=msg_cooldown_active",
+        "/?msg=msg_cooldown_active",
+    ]
+    assert len(saved) == 1
@@ -0,0 +1,105 @@
+"""Проверяет перенос старых сообщений чата в архив пачками и постраничный просмотр архива."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.admin_session import ADMIN_SESSION_COOKIE, create_admin_session_cookie
+from app.main import app
+from app.models.chat import ChatMessageArchive
+from app.routers import web
+from app.services.chat_retention import archive_expired_chat_messages, load_chat_archive_page
+
+
+class _FakeScalarResult:
+    def __init__(self, items):
+        self._items = items
+
+    def all(self):
+        return list(self._items)
+
+
+def _archive_db(rowcounts: list[int]) -> MagicMock:
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[MagicMock(rowcount=rowcount) for rowcount in rowcounts])
+    db.commit = AsyncMock()
+    return db
+
+
+def test_archive_moves_batches_until_a_short_one() -> None:
+    db = _archive_db([3, 3, 1, 3])
+
+    archived = asyncio.run(
+        archive_expired_chat_messages(db, retention_days=7, batch_size=3, now=datetime(2026, 3, 10))
+    )
+
+    assert archived == 7
+    assert db.execute.await_count == 3
+    # Каждая пачка — отдельная короткая транзакция.
+    assert db.commit.await_count == 3
+    sql = str(db.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH moved AS \n(DELETE FROM chat_messages")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "INSERT INTO chat_message_archive" in sql
+
+
+def test_archive_is_disabled_by_zero_retention_and_capped_per_run() -> None:
+    db = _archive_db([2] * 5)
+
+    assert asyncio.run(archive_expired_chat_messages(db, retention_days=0, batch_size=2)) == 0
+    assert db.execute.await_count == 0
+    assert asyncio.run(archive_expired_chat_messages(db, retention_days=1, batch_size=2, max_batches=4)) == 8
+
+
+def test_archive_page_uses_id_cursor() -> None:
+    rows = [ChatMessageArchive(id=message_id, temp_nick="n", message="m", ip_address="ip") for message_id in (9, 8, 7)]
+    db = MagicMock()
+    db.scalars = AsyncMock(return_value=_FakeScalarResult(rows))
+
+    page, next_before = asyncio.run(load_chat_archive_page(db, before_id=10, limit=2))
+
+    assert [row.id for row in page] == [9, 8]
+    assert next_before == 8
+    statement = db.scalars.await_args.args[0]
+    assert "chat_message_archive.id < " in str(statement)
+
+    db.scalars = AsyncMock(return_value=_FakeScalarResult(rows[2:]))
+    assert asyncio.run(load_chat_archive_page(db, before_id=8, limit=2)) == (rows[2:], None)
+
+
+def test_admin_chat_page_shows_archive_page_with_older_link(monkeypatch) -> None:
+    class _FakeChatSettingsPage:
+        cooldown_seconds = 0
+        max_length = 120
+        is_enabled = True
+        retention_days = 30
+        archive_batch_size = 500
+
+    archived = [
+        ChatMessageArchive(id=500 - index, temp_nick="Old", message=f"archived {index}", ip_address="203.0.113.5", created_at=datetime(2025, 1, 1))
+        for index in range(51)
+    ]
+
+    async def fake_get_or_create_chat_settings(db):
+        return _FakeChatSettingsPage()
+
+    async def fake_scalars(self, statement):
+        if statement.column_descriptions[0]["entity"] is ChatMessageArchive:
+            return _FakeScalarResult(archived)
+        return _FakeScalarResult([])
+
+    monkeypatch.setattr(web, "get_or_create_chat_settings", fake_get_or_create_chat_settings)
+    monkeypatch.setattr(web.AsyncSession, "scalars", fake_scalars, raising=False)
+
+    with TestClient(app) as client:
+        client.cookies.set(ADMIN_SESSION_COOKIE, create_admin_session_cookie())
+        client.cookies.set(web.ADMIN_CHAT_SENDER_COOKIE, "@Loyrensss")
+        response = client.get("/admin/chat?archive_before=501")
+
+    assert response.status_code == 200
+    assert "archived 49" in response.text
+    assert "archived 50" not in response.text
+    assert "/admin/chat?archive_before=451" in response.text
@@ -0,0 +1,57 @@
+"""Проверяет кэш очищенного HTML контента: ключ по содержимому, ограничение размера и прогрев при сохранении."""
+
+from unittest.mock import AsyncMock
+
+from fastapi.testclient import TestClient
+
+from app.core.admin_session import ADMIN_SESSION_COOKIE, create_admin_session_cookie
+from app.main import app
+from app.models.settings import RulesContent
+from app.routers import web
+from app.services.content_html_cache import SanitizedHtmlCache, sanitized_content_cache
+
+
+def test_sanitized_html_is_computed_once_per_content() -> None:
+    cache = SanitizedHtmlCache(max_entries=2)
+    calls = []
+
+    def sanitize(raw: str) -> str:
+        calls.append(raw)
+        return raw.upper()
+
+    assert cache.get_or_compute("<p>a</p>", sanitize) == "<P>A</P>"
+    assert cache.get_or_compute("<p>a</p>", sanitize) == "<P>A</P>"
+    assert cache.get_or_compute("<p>b</p>", sanitize) == "<P>B</P>"
+    assert cache.get_or_compute("<p>c</p>", sanitize) == "<P>C</P>"
+
+    assert calls == ["<p>a</p>", "<p>b</p>", "<p>c</p>"]
+    assert len(cache) == 2
+
+
+def test_sanitize_content_html_serves_cached_markup(monkeypatch) -> None:
+    raw = '<p onclick="x()">Hi<script>alert(1)</script></p>'
+    first = web.sanitize_content_html(raw)
+
+    monkeypatch.setattr(web, "_sanitize_content_html_uncached", lambda raw_html: "must not be called")
+
+    assert first == "<p>Hialert(1)</p>"
+    assert web.sanitize_content_html(raw) == first
+    assert web.sanitize_content_html("") == ""
+
+
+def test_saving_rules_warms_sanitized_cache(monkeypatch) -> None:
+    rules = RulesContent(id=1, body_ru="", body_en="", body_zh="")
+
+    async def fake_get_or_create_rules_content(db):
+        return rules
+
+    monkeypatch.setattr(web, "get_or_create_rules_content", fake_get_or_create_rules_content)
+    monkeypatch.setattr(web.AsyncSession, "commit", AsyncMock(), raising=False)
+
+    with TestClient(app) as client:
+        client.cookies.set(ADMIN_SESSION_COOKIE, create_admin_session_cookie())
+        response = client.post("/admin/rules", data={"content_lang": "en", "body": "<h2>Rules</h2>"}, follow_redirects=False)
+
+    assert response.status_code == 303
+    assert rules.body_en == "<h2>Rules</h2>"
+    assert len(sanitized_content_cache) == 1
@@ -31,6 +31,8 @@ class _FakeDonateDB:
 
     async def scalar(self, statement):
         query = str(statement)
+        if "sum(donors.amount)" in query:
+            return sum(donor.amount for donor in self.donors)
         if "site_settings.key" in query:
             for row in self.site_settings:
                 if row.key == "donate_support_author_visible":
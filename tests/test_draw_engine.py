@@ -0,0 +1,72 @@
+"""Проверяет движок жеребьёвки: равномерность корзин, воспроизводимость и большие форматы."""
+
+import random
+from collections import Counter
+
+from app.models.user import Basket
+from app.services.draw_engine import draw_groups
+from app.services.tournament import PRIMARY_BASKETS, PRIMARY_DRAW_BASKETS_WITH_RESERVE
+
+
+def _players(count: int) -> list[tuple[int, str]]:
+    return [(player_id, PRIMARY_BASKETS[player_id % len(PRIMARY_BASKETS)]) for player_id in range(count)]
+
+
+def _draw(players: list[tuple[int, str]], group_count: int, group_size: int, seed: int | None) -> list[list[tuple[int, str]]]:
+    return draw_groups(
+        players,
+        group_count=group_count,
+        group_size=group_size,
+        basket_of=lambda player: player[1],
+        quota_baskets=PRIMARY_DRAW_BASKETS_WITH_RESERVE,
+        pool_baskets=PRIMARY_BASKETS,
+        rng=random.Random(seed),
+    )
+
+
+def test_draw_groups_is_reproducible_with_same_seed() -> None:
+    players = _players(80)
+
+    assert _draw(players, 7, 8, seed=42) == _draw(players, 7, 8, seed=42)
+    assert _draw(players, 7, 8, seed=42) != _draw(players, 7, 8, seed=43)
+
+
+def test_draw_groups_spreads_each_quota_basket_evenly_across_groups() -> None:
+    players = [
+        (basket_index * 100 + offset, basket)
+        for basket_index, basket in enumerate(PRIMARY_DRAW_BASKETS_WITH_RESERVE)
+        for offset in range(15)
+    ]
+
+    groups = _draw(players, 7, 8, seed=1)
+
+    assert [len(group) for group in groups] == [8] * 7
+    assert len({player_id for group in groups for player_id, _ in group}) == 56
+    for basket in PRIMARY_DRAW_BASKETS_WITH_RESERVE:
+        assert [sum(1 for _, player_basket in group if player_basket == basket) for group in groups] == [2] * 7
+
+
+def test_draw_groups_uses_reserve_only_when_main_basket_is_empty() -> None:
+    players = [(1, Basket.QUEEN.value), (2, Basket.QUEEN_RESERVE.value), (3, Basket.QUEEN_RESERVE.value)]
+
+    groups = draw_groups(
+        players,
+        group_count=1,
+        group_size=8,
+        basket_of=lambda player: player[1],
+        quota_baskets=PRIMARY_DRAW_BASKETS_WITH_RESERVE,
+        pool_baskets=PRIMARY_BASKETS,
+        rng=random.Random(0),
+    )
+
+    assert Counter(basket for _, basket in groups[0]) == {Basket.QUEEN.value: 1, Basket.QUEEN_RESERVE.value: 1}
+
+
+def test_draw_groups_handles_open_qualifier_of_1024_players() -> None:
+    players = _players(1100)
+
+    groups = _draw(players, 128, 8, seed=7)
+
+    assert len(groups) == 128
+    assert all(len(group) == 8 for group in groups)
+    assert len({player_id for group in groups for player_id, _ in group}) == 1024
@@ -0,0 +1,157 @@
+"""Проверяет аналитику финала «22 + топ-1»: минимум игр до победы и гарантированный топ-3."""
+
+import asyncio
+import random
+from types import SimpleNamespace
+
+from app.models.tournament import PlayoffMatch, PlayoffParticipant, PlayoffStage
+from app.routers import web
+from app.services import final_stage_analytics
+from app.services.final_stage_analytics import (
+    analyze_final_standings,
+    can_be_pushed_out_of_top3,
+    get_final_stage_analytics,
+    min_games_to_win,
+)
+from app.services.tournament import POINTS_BY_PLACE
+
+
+def _participants(points: list[int]) -> list[PlayoffParticipant]:
+    return [
+        PlayoffParticipant(user_id=index, seed=index, points=value, wins=0, top4_finishes=0, top8_finishes=0, last_place=8)
+        for index, value in enumerate(points, start=1)
+    ]
+
+
+def _final_stage(points: list[int], *, game_number: int = 4, winner_user_id: int | None = None) -> PlayoffStage:
+    stage = PlayoffStage(id=5, key="stage_final", scoring_mode="final_22_top1")
+    stage.participants = _participants(points)
+    stage.matches = [PlayoffMatch(group_number=1, game_number=game_number, winner_user_id=winner_user_id)]
+    return stage
+
+
+def _play_random_final(rng: random.Random, points: list[int]) -> list[int]:
+    # Разыгрывает финал по правилам до победы игрока, занявшего 1-е место с 22+ очками до игры.
+    points = list(points)
+    while True:
+        order = rng.sample(range(len(points)), len(points))
+        winner_had = points[order[0]]
+        for place, index in enumerate(order, start=1):
+            points[index] += POINTS_BY_PLACE[place]
+        if winner_had >= 22:
+            return [order[0], *points]
+
+
+def test_min_games_to_win_counts_threshold_wins_and_final_win() -> None:
+    assert min_games_to_win(0) == 4
+    assert min_games_to_win(14) == 2
+    assert min_games_to_win(21) == 2
+    assert min_games_to_win(13) == 3
+    assert min_games_to_win(22) == 1
+    assert min_games_to_win(40) == 1
+
+
+def test_clinch_search_handles_forced_last_game() -> None:
+    # Все соперники уже на 22+: следующая игра финальная, никто не доберёт 40.
+    assert can_be_pushed_out_of_top3(40, [22] * 7) is False
+    # Игрок с 10 очками может тянуть финал, пока двое других не догонят лидера.
+    assert can_be_pushed_out_of_top3(30, [22] * 6 + [10]) is True
+    assert can_be_pushed_out_of_top3(5, [5, 5, 5, 0, 0, 0, 0]) is True
+
+
+def test_clinched_players_stay_in_top3_in_random_finals() -> None:
+    rng = random.Random(11)
+    checked = 0
+    while checked < 10:
+        points = [rng.randint(30, 50), rng.randint(22, 40)] + [rng.randint(16, 30) for _ in range(6)]
+        result = analyze_final_standings(_participants(points))
+        clinched = [player["user_id"] - 1 for player in result["players"] if player["clinched_top3"]]
+        if not clinched:
+            continue
+        checked += 1
+        for _ in range(50):
+            winner, *final_points = _play_random_final(rng, points)
+            for index in clinched:
+                if index == winner:
+                    continue
+                ahead = sum(1 for other, value in enumerate(final_points) if other not in (index, winner) and value >= final_points[index])
+                assert ahead < 2, (points, index, final_points)
+
+
+def test_analyze_final_standings_reports_bounds() -> None:
+    result = analyze_final_standings(_participants([40, 22, 22, 22, 22, 22, 22, 22]))
+
+    assert result["is_finished"] is False
+    assert result["min_games_remaining"] == 1
+    by_user = {player["user_id"]: player for player in result["players"]}
+    assert by_user[1]["clinched_top3"] is True
+    assert by_user[1]["can_win_next_game"] is True
+    assert all(player["can_still_win"] for player in result["players"])
+    assert by_user[2]["clinched_top3"] is False
+
+
+def test_exhausted_search_budget_is_not_reported_as_clinched() -> None:
+    assert can_be_pushed_out_of_top3(40, [22] * 7, budget=0) is None
+
+    result = analyze_final_standings(_participants([40, 22, 22, 22, 22, 22, 22, 22]), budget=0)
+
+    assert not any(player["clinched_top3"] for player in result["players"])
+
+
+def test_finished_final_reports_winner_and_podium() -> None:
+    result = analyze_final_standings(_participants([30, 26, 24, 10, 9, 8, 7, 6]), winner_user_id=2)
+
+    assert result["is_finished"] is True
+    assert result["min_games_remaining"] == 0
+    assert {player["user_id"] for player in result["players"] if player["clinched_top3"]} == {1, 2, 3}
+    assert [player["user_id"] for player in result["players"] if player["can_still_win"]] == [2]
+
+
+def test_stage_analytics_is_cached_per_game_number(monkeypatch) -> None:
+    final_stage_analytics._analytics_cache.clear()
+    calls: list[int] = []
+    original = final_stage_analytics.analyze_final_standings
+
+    def counting_analyze(participants, **kwargs):
+        calls.append(len(participants))
+        return original(participants, **kwargs)
+
+    monkeypatch.setattr(final_stage_analytics, "analyze_final_standings", counting_analyze)
+    stage = _final_stage([40, 22, 22, 22, 22, 22, 22, 22])
+
+    first = get_final_stage_analytics(stage)
+    assert get_final_stage_analytics(stage) is first
+    assert first["games_played"] == 3
+    assert len(calls) == 1
+
+    stage.matches[0].game_number = 5
+    get_final_stage_analytics(stage)
+    assert len(calls) == 2
+
+    assert get_final_stage_analytics(PlayoffStage(id=6, key="stage_1_4", scoring_mode="standard")) is None
+
+
+def test_tree_json_exposes_final_analytics_with_nicknames(monkeypatch) -> None:
+    final_stage_analytics._analytics_cache.clear()
+    stage = _final_stage([40, 22, 22, 22, 22, 22, 22, 22])
+
+    async def fake_load_public_tournament_tree(db, lang):
+        return {
+            "tournament_tree": {"stages": [{"key": "stage_final", "matches": []}]},
+            "current_stage_display": "Финал",
+            "final_stage_analytics": get_final_stage_analytics(stage),
+            "user_by_id": {1: SimpleNamespace(nickname="leader")},
+            "winner_user_id": None,
+            "winner_nickname": "",
+        }
+
+    monkeypatch.setattr(web, "_load_public_tournament_tree", fake_load_public_tournament_tree)
+
+    payload = asyncio.run(web.tournament_tree_json(SimpleNamespace(cookies={}), db=None))
+
+    assert payload["stages"][0]["key"] == "stage_final"
+    assert payload["final_analytics"]["min_games_remaining"] == 1
+    leader = payload["final_analytics"]["players"][0]
+    assert leader["nickname"] == "leader"
+    assert leader["clinched_top3"] is True
+    assert "nickname" not in get_final_stage_analytics(stage)["players"][0]
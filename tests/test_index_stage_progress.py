@@ -42,6 +42,8 @@ class _FakeIndexDB:
             return None
         if "FROM chat_settings" in sql:
             return None
+        if "sum(donors.amount)" in sql:
+            return 0
         if "count(users.id)" in sql:
             return self.total_participants
         if "FROM group_members" in sql and "tournament_groups.stage" in sql:
@@ -0,0 +1,111 @@
+"""Проверяет одноразовость judge-токенов: хранилища nonce в памяти и общее для воркеров."""
+
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.admin_session import create_judge_login_token, read_judge_login_token
+from app.services import judge_nonces
+from app.services.judge_nonces import (
+    MemoryJudgeNonceStore,
+    PostgresJudgeNonceStore,
+    consume_judge_login_token,
+)
+
+
+class _FakeClock:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeInsertResult:
+    def __init__(self, row) -> None:
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _SharedNonceTable:
+    """Таблица used_judge_nonces, общая для «воркеров»: INSERT ... ON CONFLICT DO NOTHING RETURNING."""
+
+    def __init__(self) -> None:
+        self.nonces: dict[str, object] = {}
+        self.statements: list[str] = []
+
+    async def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if sql.startswith("DELETE"):
+            return _FakeInsertResult(None)
+        params = statement.compile(dialect=postgresql.dialect()).params
+        if params["nonce"] in self.nonces:
+            return _FakeInsertResult(None)
+        self.nonces[params["nonce"]] = params["expires_at"]
+        return _FakeInsertResult((params["nonce"],))
+
+
+def test_token_is_accepted_once_and_forged_or_expired_tokens_are_rejected() -> None:
+    token = create_judge_login_token()
+
+    assert asyncio.run(consume_judge_login_token(None, token)) is True
+    assert asyncio.run(consume_judge_login_token(None, token)) is False
+    assert asyncio.run(consume_judge_login_token(None, token[:-2] + "xx")) is False
+    assert read_judge_login_token(create_judge_login_token(ttl_seconds=-1)) is None
+
+
+def test_replay_on_another_worker_is_rejected_only_with_shared_backend() -> None:
+    token = create_judge_login_token()
+    nonce, expires_at = read_judge_login_token(token)
+
+    # Хранилища в памяти у каждого воркера свои: повтор на соседнем воркере проходит.
+    worker_a, worker_b = MemoryJudgeNonceStore(), MemoryJudgeNonceStore()
+    assert asyncio.run(worker_a.try_consume(None, nonce, expires_at)) is True
+    assert asyncio.run(worker_b.try_consume(None, nonce, expires_at)) is True
+
+    table = _SharedNonceTable()
+    worker_a, worker_b = PostgresJudgeNonceStore(), PostgresJudgeNonceStore()
+    assert asyncio.run(worker_a.try_consume(table, nonce, expires_at)) is True
+    assert asyncio.run(worker_b.try_consume(table, nonce, expires_at)) is False
+    assert "ON CONFLICT (nonce) DO NOTHING" in table.statements[0]
+
+
+def test_shared_backend_is_selected_by_settings(monkeypatch) -> None:
+    table = _SharedNonceTable()
+    token = create_judge_login_token()
+    monkeypatch.setattr(judge_nonces.settings, "judge_nonce_backend", "postgres")
+
+    assert asyncio.run(consume_judge_login_token(table, token)) is True
+    assert asyncio.run(consume_judge_login_token(table, token)) is False
+    assert len(judge_nonces.memory_judge_nonce_store) == 0
+
+
+def test_memory_store_stays_bounded_under_many_logins() -> None:
+    clock = _FakeClock()
+    store = MemoryJudgeNonceStore(max_keys=500, clock=clock)
+
+    async def login_wave(count: int) -> None:
+        for index in range(count):
+            clock.now += 1
+            assert await store.try_consume(None, f"nonce-{clock.now}-{index}", int(clock.now) + 600)
+
+    asyncio.run(login_wave(20_000))
+    assert len(store) == 500
+
+    # Через срок жизни токенов все записи истекают и снимаются при следующем входе.
+    clock.now += 601
+    asyncio.run(store.try_consume(None, "late", int(clock.now) + 600))
+    assert len(store) == 1
+
+
+def test_shared_backend_cleans_expired_nonces_periodically() -> None:
+    table = _SharedNonceTable()
+    store = PostgresJudgeNonceStore(cleanup_every=3)
+
+    for index in range(3):
+        asyncio.run(store.try_consume(table, f"nonce-{index}", 2_000_000_000))
+
+    assert table.statements[-1].startswith("DELETE FROM used_judge_nonces WHERE used_judge_nonces.expires_at <")
@@ -0,0 +1,112 @@
+"""Проверяет пакетную валидацию ручной жеребьёвки и запись участников одним insert."""
+
+import asyncio
+
+import pytest
+
+from app.models.tournament import TournamentGroup
+from app.services import tournament
+
+
+class _FakeResult:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def all(self) -> list:
+        return self._rows
+
+
+class _FakeManualDrawDB:
+    def __init__(self, existing_user_ids: set[int], stage_rows: list[tuple[int, int, str]] | None = None) -> None:
+        self.existing_user_ids = existing_user_ids
+        self.stage_rows = stage_rows or []
+        self.select_count = 0
+        self.inserted_rows: list[dict[str, int]] = []
+        self.added: list[TournamentGroup] = []
+        self.committed = False
+
+    async def scalars(self, statement):
+        self.select_count += 1
+        compiled = str(statement)
+        if "FROM users" in compiled:
+            params = statement.compile().params
+            requested = next(value for value in params.values() if isinstance(value, (list, tuple, set)))
+            return _FakeResult([user_id for user_id in requested if user_id in self.existing_user_ids])
+        return _FakeResult([])
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.inserted_rows.extend(params)
+            return _FakeResult([])
+        if str(statement).startswith("SELECT"):
+            self.select_count += 1
+            return _FakeResult(self.stage_rows)
+        return _FakeResult([])
+
+    def add(self, instance) -> None:
+        self.added.append(instance)
+
+    async def flush(self) -> None:
+        for index, group in enumerate(self.added, start=1):
+            group.id = 100 + index
+            group.stage = group.stage or "group_stage"
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+def test_manual_draw_validates_in_two_queries_and_bulk_inserts_round_robin_seats() -> None:
+    user_ids = list(range(1, 17))
+    fake_db = _FakeManualDrawDB(existing_user_ids=set(user_ids))
+
+    asyncio.run(tournament.create_manual_draw(fake_db, 2, user_ids))
+
+    # Один запрос clear_group_stage, два запроса пакетной проверки.
+    assert fake_db.select_count == 3
+    assert fake_db.committed
+    assert len(fake_db.inserted_rows) == 16
+    assert fake_db.inserted_rows[:4] == [
+        {"group_id": 101, "user_id": 1, "seat": 1},
+        {"group_id": 102, "user_id": 2, "seat": 1},
+        {"group_id": 101, "user_id": 3, "seat": 2},
+        {"group_id": 102, "user_id": 4, "seat": 2},
+    ]
+
+
+def test_manual_draw_from_layout_keeps_member_order_as_seats() -> None:
+    fake_db = _FakeManualDrawDB(existing_user_ids={11, 12, 13})
+
+    asyncio.run(tournament.create_manual_draw_from_layout(fake_db, [["13", "11"], ["12"]]))
+
+    assert fake_db.inserted_rows == [
+        {"group_id": 101, "user_id": 13, "seat": 1},
+        {"group_id": 101, "user_id": 11, "seat": 2},
+        {"group_id": 102, "user_id": 12, "seat": 1},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("group_count", "user_ids", "existing_user_ids", "stage_rows", "expected_message"),
+    [
+        (2, [1, 2, 3], {1, 2}, [], "User not found"),
+        (1, [1, 1], {1}, [], "Игрок уже есть в этой группе"),
+        (2, [1, 2, 3, 1], {1, 2, 3}, [], "Игрок уже находится в другой группе этой стадии"),
+        (1, [5], {5}, [(900, 5, "group_stage")], "Игрок уже находится в другой группе этой стадии"),
+        (1, [9], {9}, [(101, user_id, "group_stage") for user_id in range(20, 28)], "Группа уже заполнена (максимум 8 участников)"),
+    ],
+)
+def test_manual_draw_batch_validation_keeps_error_messages(
+    group_count: int,
+    user_ids: list[int],
+    existing_user_ids: set[int],
+    stage_rows: list[tuple[int, int, str]],
+    expected_message: str,
+) -> None:
+    fake_db = _FakeManualDrawDB(existing_user_ids=existing_user_ids, stage_rows=stage_rows)
+
+    with pytest.raises(ValueError) as exc_info:
+        asyncio.run(tournament.create_manual_draw(fake_db, group_count, user_ids))
+
+    assert str(exc_info.value) == expected_message
+    assert not fake_db.inserted_rows
+    assert not fake_db.committed
@@ -1,10 +1,13 @@
 """Проверяет сортировку участников на странице participants по приоритету ранга."""
 
 import asyncio
+from datetime import datetime, timedelta
+import json
 from types import SimpleNamespace
 
 from app.models.user import Basket, User
 from app.routers import web
+from app.services.rank import rank_sort_key
 
 
 class _FakeScalarResult:
@@ -26,7 +29,7 @@ class _FakeDB:
 
 
 def _fake_request():
-    return SimpleNamespace(cookies={}, query_params={})
+    return SimpleNamespace(cookies={}, query_params={}, headers={})
 
 
 def test_participants_baskets_mode_queries_all_users_without_basket_filter() -> None:
@@ -50,7 +53,7 @@ def test_participants_baskets_mode_queries_all_users_without_basket_filter() ->
     compiled = str(fake_db.last_statement)
     assert "FROM users" in compiled
     assert "WHERE users.basket" not in compiled
-    assert "ORDER BY CASE" in compiled
+    assert "ORDER BY users.rank_tier" in compiled
 
 
 def test_participants_rank_priority_queen_places_queen_pair_first_in_order_by() -> None:
@@ -84,22 +87,27 @@ def test_participants_rank_priority_other_ranks_place_corresponding_pair_first()
         assert params["basket_3"] not in [rank_priority, f"{rank_priority}_reserve"]
 
 
-def test_participants_rank_priority_uses_universal_highest_rank_sort_keys() -> None:
+def test_participants_rank_priority_uses_materialized_rank_sort_columns() -> None:
     fake_db = _FakeDB(users=[])
 
     asyncio.run(web.participants(request=_fake_request(), view="baskets", rank_priority=Basket.QUEEN.value, db=fake_db))
 
     compiled = str(fake_db.last_statement)
-    assert "users.highest_rank LIKE :highest_rank_1" in compiled
-    assert "users.highest_rank LIKE :highest_rank_2" in compiled
-    assert "users.highest_rank LIKE :highest_rank_3" in compiled
-    assert "users.highest_rank LIKE :highest_rank_4" in compiled
-    assert "users.highest_rank LIKE :highest_rank_5" in compiled
-    assert "users.highest_rank LIKE :highest_rank_6" in compiled
-    assert "users.highest_rank = " in compiled
-    assert compiled.count("replace(users.highest_rank, :replace_") >= 6
+    order_by = compiled[compiled.find("ORDER BY"):]
+    assert order_by.startswith("ORDER BY users.rank_tier, users.rank_division")
+    assert "users.highest_rank" not in order_by
 
 
+def test_participants_rank_priority_rotates_rank_tier_for_non_queen_priority() -> None:
+    fake_db = _FakeDB(users=[])
+
+    asyncio.run(web.participants(request=_fake_request(), view="baskets", rank_priority=Basket.ROOK.value, db=fake_db))
+
+    compiled = str(fake_db.last_statement)
+    order_by_idx = compiled.find("ORDER BY")
+    assert compiled.find("users.rank_tier", order_by_idx) > order_by_idx
+    assert "users.highest_rank" not in compiled[order_by_idx:]
+
 
 def test_participants_rank_priority_orders_rank_sort_before_created_at() -> None:
     fake_db = _FakeDB(users=[])
@@ -109,10 +117,10 @@ def test_participants_rank_priority_orders_rank_sort_before_created_at() -> None
     compiled = str(fake_db.last_statement)
     order_by_idx = compiled.find("ORDER BY")
     created_at_idx = compiled.find("users.created_at", order_by_idx)
-    highest_rank_idx = compiled.find("users.highest_rank LIKE :highest_rank_1", order_by_idx)
+    rank_division_idx = compiled.find("users.rank_division", order_by_idx)
     assert order_by_idx >= 0
-    assert highest_rank_idx > order_by_idx
-    assert created_at_idx > highest_rank_idx
+    assert rank_division_idx > order_by_idx
+    assert created_at_idx > rank_division_idx
 
 
 def test_participants_invalid_rank_priority_falls_back_to_queen() -> None:
@@ -123,3 +131,72 @@ def test_participants_invalid_rank_priority_falls_back_to_queen() -> None:
     params = fake_db.last_statement.compile().params
     assert params["basket_1"] == Basket.QUEEN.value
     assert params["basket_2"] == Basket.QUEEN_RESERVE.value
+
+
+def _ranked_user(user_id: int, highest_rank: str, basket: str) -> User:
+    tier, division = rank_sort_key(highest_rank)
+    return User(
+        id=user_id,
+        nickname=f"user_{user_id}",
+        steam_input=f"steam_{user_id}",
+        steam_id=f"steam_{user_id}",
+        game_nickname=f"game_{user_id}",
+        current_rank=highest_rank,
+        highest_rank=highest_rank,
+        basket=basket,
+        rank_tier=tier,
+        rank_division=division,
+        created_at=datetime(2026, 3, 1, 12, 0, 0) + timedelta(minutes=user_id),
+    )
+
+
+def test_participants_first_page_is_limited_without_cursor_filter() -> None:
+    fake_db = _FakeDB(users=[])
+
+    asyncio.run(web.participants(request=_fake_request(), view="baskets", db=fake_db))
+
+    compiled = str(fake_db.last_statement)
+    assert "WHERE" not in compiled
+    assert fake_db.last_statement._limit == web.PARTICIPANTS_PAGE_SIZE + 1
+
+
+def test_participants_list_api_returns_next_cursor_from_last_row() -> None:
+    users = [_ranked_user(user_id, "Rook-3", Basket.ROOK.value) for user_id in range(1, web.PARTICIPANTS_PAGE_SIZE + 2)]
+    fake_db = _FakeDB(users=users)
+
+    payload = asyncio.run(web.participants_list_api(rank_priority=Basket.ROOK.value, cursor=None, db=fake_db))
+
+    assert len(payload["users"]) == web.PARTICIPANTS_PAGE_SIZE
+    assert payload["users"][0]["nickname"] == "user_1"
+    last_user = users[web.PARTICIPANTS_PAGE_SIZE - 1]
+    assert web._decode_participants_cursor(payload["next_cursor"]) == (
+        0,
+        3,
+        0,
+        last_user.created_at,
+        last_user.id,
+    )
+
+
+def test_participants_list_api_applies_keyset_cursor_with_full_ordering_tuple() -> None:
+    fake_db = _FakeDB(users=[_ranked_user(7, "Queen#5", Basket.QUEEN.value)])
+    cursor = web._encode_participants_cursor((0, 5, 0, datetime(2026, 3, 1, 12, 0, 0), 6))
+
+    payload = asyncio.run(web.participants_list_api(rank_priority=Basket.QUEEN.value, cursor=cursor, db=fake_db))
+
+    compiled = str(fake_db.last_statement)
+    where_clause = compiled[compiled.find("WHERE"):compiled.find("ORDER BY")]
+    assert where_clause.startswith("WHERE (users.rank_tier, users.rank_division, CASE")
+    assert "users.created_at, users.id) >" in where_clause
+    assert payload["next_cursor"] is None
+    assert [user["nickname"] for user in payload["users"]] == ["user_7"]
+
+
+def test_participants_list_api_rejects_malformed_cursor() -> None:
+    fake_db = _FakeDB(users=[])
+
+    response = asyncio.run(web.participants_list_api(rank_priority=None, cursor="not-a-cursor", db=fake_db))
+
+    assert response.status_code == 400
+    assert json.loads(response.body) == {"error": "invalid_cursor"}
+    assert fake_db.last_statement is None
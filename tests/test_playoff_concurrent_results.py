@@ -0,0 +1,147 @@
+"""Проверяет, что параллельный ввод результатов плей-офф не теряет очки и не блокирует чужие группы."""
+
+import asyncio
+import random
+import unittest
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.expression import Values
+from sqlalchemy.sql.visitors import iterate
+
+from app.models.tournament import PlayoffMatch, PlayoffParticipant, PlayoffStage
+from app.services.tournament import POINTS_BY_PLACE, apply_playoff_match_results
+
+PARTICIPANT_FIELDS = ("points", "wins", "top4_finishes", "top8_finishes", "eighth_places", "last_place")
+
+
+class _FakeServer:
+    """Общие строки БД и построчные блокировки, как у Postgres при SELECT ... FOR UPDATE."""
+
+    def __init__(self, group_count: int) -> None:
+        self.stage = {"id": 1, "key": "stage_final", "title": "Final", "stage_size": 8 * group_count, "stage_order": 1, "scoring_mode": "standard"}
+        self.matches = {
+            group_number: {"game_number": 1, "state": "pending"} for group_number in range(1, group_count + 1)
+        }
+        self.participants = {
+            user_id: {"points": 0, "wins": 0, "top4_finishes": 0, "top8_finishes": 0, "eighth_places": 0, "last_place": 8}
+            for user_id in range(1, 8 * group_count + 1)
+        }
+        self.locks = {group_number: asyncio.Lock() for group_number in self.matches}
+        self.log_rows: list[dict[str, int]] = []
+        self.active_lock_holders = 0
+        self.max_active_lock_holders = 0
+
+
+class _ScalarResult:
+    def __init__(self, items):
+        self._items = items
+
+    def all(self):
+        return self._items
+
+
+class _FakeSession:
+    """Отдельная транзакция: читает снимок строк, UPDATE применяет сразу, грязные атрибуты — на commit."""
+
+    def __init__(self, server: _FakeServer) -> None:
+        self.server = server
+        self.held_locks: list[asyncio.Lock] = []
+        self.match: PlayoffMatch | None = None
+        self.participants: list[PlayoffParticipant] = []
+
+    async def scalar(self, statement):
+        await asyncio.sleep(0)
+        entity = statement.column_descriptions[0]["entity"]
+        if entity is PlayoffStage:
+            return PlayoffStage(**self.server.stage)
+        group_number = statement.compile().params["group_number_1"]
+        if statement._for_update_arg is not None:
+            lock = self.server.locks[group_number]
+            await lock.acquire()
+            self.held_locks.append(lock)
+            self.server.active_lock_holders += 1
+            self.server.max_active_lock_holders = max(self.server.max_active_lock_holders, self.server.active_lock_holders)
+        row = self.server.matches[group_number]
+        self.match = PlayoffMatch(stage_id=1, match_number=group_number, group_number=group_number, **row)
+        return self.match
+
+    async def scalars(self, statement):
+        await asyncio.sleep(0)
+        self.participants = []
+        for user_id, row in self.server.participants.items():
+            participant = PlayoffParticipant(stage_id=1, user_id=user_id, seed=user_id)
+            for field, value in row.items():
+                set_committed_value(participant, field, value)
+            self.participants.append(participant)
+        return _ScalarResult(self.participants)
+
+    async def execute(self, statement, rows=None):
+        if rows is not None:
+            self.pending_log_rows = rows
+            return
+        # UPDATE ... FROM (VALUES) считает приросты в БД от текущих значений строк.
+        placements = next(
+            element.table for element in iterate(statement) if isinstance(getattr(element, "table", None), Values)
+        )
+        for user_id, place in placements._data[0]:
+            row = self.server.participants[user_id]
+            row["points"] += POINTS_BY_PLACE[place]
+            row["wins"] += 1 if place == 1 else 0
+            row["top4_finishes"] += 1 if place <= 4 else 0
+            row["top8_finishes"] += 1
+            row["eighth_places"] += 1 if place == 8 else 0
+            row["last_place"] = place
+
+    async def commit(self) -> None:
+        await asyncio.sleep(0)
+        self.server.matches[self.match.group_number] = {"game_number": self.match.game_number, "state": self.match.state}
+        # Как и flush ORM, пишем только атрибуты с историей изменений абсолютными значениями.
+        for participant in self.participants:
+            attributes = inspect(participant).attrs
+            for field in PARTICIPANT_FIELDS:
+                if attributes[field].history.has_changes():
+                    self.server.participants[participant.user_id][field] = getattr(participant, field)
+        self.server.log_rows.extend(self.pending_log_rows)
+        await self.close()
+
+    async def close(self) -> None:
+        while self.held_locks:
+            self.held_locks.pop().release()
+            self.server.active_lock_holders -= 1
+
+
+async def _submit(server: _FakeServer, group_number: int, ordered_user_ids: list[int]) -> None:
+    session = _FakeSession(server)
+    try:
+        await apply_playoff_match_results(session, 1, ordered_user_ids, group_number=group_number)
+    finally:
+        await session.close()
+
+
+class PlayoffConcurrentResultsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_simultaneous_submissions_keep_every_game(self) -> None:
+        group_count, games_per_group = 4, 6
+        server = _FakeServer(group_count)
+        rng = random.Random(5)
+        submissions: list[tuple[int, list[int]]] = []
+        for group_number in range(1, group_count + 1):
+            group_user_ids = list(range((group_number - 1) * 8 + 1, group_number * 8 + 1))
+            for _ in range(games_per_group):
+                rng.shuffle(group_user_ids)
+                submissions.append((group_number, list(group_user_ids)))
+        rng.shuffle(submissions)
+
+        await asyncio.gather(*(_submit(server, group_number, ordered) for group_number, ordered in submissions))
+
+        expected_points = {user_id: 0 for user_id in server.participants}
+        for _, ordered_user_ids in submissions:
+            for place, user_id in enumerate(ordered_user_ids, start=1):
+                expected_points[user_id] += POINTS_BY_PLACE[place]
+        self.assertEqual({user_id: row["points"] for user_id, row in server.participants.items()}, expected_points)
+        self.assertTrue(all(row["top8_finishes"] == games_per_group for row in server.participants.values()))
+        self.assertEqual({row["game_number"] for row in server.matches.values()}, {games_per_group + 1})
+        self.assertEqual(len(server.log_rows), len(submissions) * 8)
+        # Разные группы держат блокировки одновременно, судьи не выстраиваются в одну очередь.
+        self.assertGreater(server.max_active_lock_holders, 1)
+        self.assertLessEqual(server.max_active_lock_holders, group_count)
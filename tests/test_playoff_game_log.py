@@ -0,0 +1,186 @@
+"""Проверяет журнал игр плей-офф: запись мест, отмену последней игры и воспроизведение таблицы."""
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.tournament import PlayoffGameResult, PlayoffMatch, PlayoffParticipant, PlayoffPointAdjustment, PlayoffStage
+from app.services.tournament import (
+    POINTS_BY_PLACE,
+    adjust_stage_points,
+    apply_playoff_match_results,
+    find_playoff_standings_mismatches,
+    replay_playoff_stage_standings,
+    undo_last_playoff_game,
+)
+
+
+class _ScalarResult:
+    def __init__(self, items):
+        self._items = items
+
+    def all(self):
+        return self._items
+
+
+def _adjustment_totals(adjustments: list[PlayoffPointAdjustment]) -> MagicMock:
+    # SELECT user_id, sum(points_delta) ... GROUP BY user_id
+    totals: dict[int, int] = {}
+    for row in adjustments:
+        totals[row.user_id] = totals.get(row.user_id, 0) + row.points_delta
+    result = MagicMock()
+    result.all.return_value = list(totals.items())
+    return result
+
+
+def _participants() -> list[PlayoffParticipant]:
+    return [
+        PlayoffParticipant(
+            stage_id=1,
+            user_id=user_id,
+            seed=user_id,
+            points=0,
+            wins=0,
+            top4_finishes=0,
+            top8_finishes=0,
+            eighth_places=0,
+            last_place=8,
+        )
+        for user_id in range(1, 9)
+    ]
+
+
+def _stage() -> PlayoffStage:
+    return PlayoffStage(id=1, key="stage_2", title="Stage 2", stage_size=8, stage_order=1, scoring_mode="standard")
+
+
+def _log_rows(rows: list[dict[str, int]]) -> list[PlayoffGameResult]:
+    return [PlayoffGameResult(**row) for row in rows]
+
+
+class PlayoffGameLogTests(unittest.IsolatedAsyncioTestCase):
+    async def test_apply_results_writes_one_log_row_per_place(self) -> None:
+        participants = _participants()
+        participants[2].last_place = 5
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=2, state="in_progress")
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[_stage(), match])
+        db.scalars = AsyncMock(return_value=_ScalarResult(participants))
+
+        await apply_playoff_match_results(db, stage_id=1, ordered_user_ids=[3, 1, 2, 4, 5, 6, 7, 8], group_number=1)
+
+        statement, rows = db.execute.await_args.args
+        self.assertEqual(statement.table.name, "playoff_game_results")
+        self.assertEqual([row["user_id"] for row in rows], [3, 1, 2, 4, 5, 6, 7, 8])
+        self.assertEqual({row["game_number"] for row in rows}, {2})
+        self.assertEqual(rows[0]["points_awarded"], POINTS_BY_PLACE[1])
+        self.assertEqual(rows[0]["previous_last_place"], 5)
+
+    async def test_undo_last_game_reverts_aggregates_and_game_counter(self) -> None:
+        participants = _participants()
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=2, state="in_progress")
+        apply_db = AsyncMock()
+        apply_db.scalar = AsyncMock(side_effect=[_stage(), match, _stage(), match])
+        apply_db.scalars = AsyncMock(return_value=_ScalarResult(participants))
+        await apply_playoff_match_results(apply_db, stage_id=1, ordered_user_ids=[1, 2, 3, 4, 5, 6, 7, 8])
+        first_game_snapshot = [(p.points, p.wins, p.top4_finishes, p.top8_finishes, p.eighth_places, p.last_place) for p in participants]
+        await apply_playoff_match_results(apply_db, stage_id=1, ordered_user_ids=[8, 7, 6, 5, 4, 3, 2, 1])
+        last_game_rows = _log_rows(apply_db.execute.await_args.args[1])
+
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[_stage(), match, None, 3])
+        db.scalars = AsyncMock(side_effect=[_ScalarResult(last_game_rows), _ScalarResult(participants)])
+
+        undone_game = await undo_last_playoff_game(db, stage_id=1, group_number=1)
+
+        self.assertEqual(undone_game, 3)
+        self.assertEqual(match.game_number, 3)
+        self.assertEqual(match.state, "in_progress")
+        self.assertEqual(
+            [(p.points, p.wins, p.top4_finishes, p.top8_finishes, p.eighth_places, p.last_place) for p in participants],
+            first_game_snapshot,
+        )
+        delete_statement = db.execute.await_args.args[0]
+        self.assertIn("DELETE FROM playoff_game_results", str(delete_statement))
+        db.commit.assert_awaited_once()
+
+    async def test_undo_without_logged_games_fails(self) -> None:
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=1, state="pending")
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[_stage(), match, None, None])
+
+        with self.assertRaisesRegex(ValueError, "нет записанных игр"):
+            await undo_last_playoff_game(db, stage_id=1, group_number=1)
+
+        db.commit.assert_not_called()
+
+    async def test_undo_is_blocked_after_next_stage_started(self) -> None:
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=4, state="finished")
+        next_stage = PlayoffStage(id=2, key="stage_1_4", title="1/4", stage_size=16, stage_order=2, is_started=True)
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[_stage(), match, next_stage])
+
+        with self.assertRaisesRegex(ValueError, "Следующий этап"):
+            await undo_last_playoff_game(db, stage_id=1, group_number=1)
+
+    async def test_undo_is_blocked_after_players_were_promoted(self) -> None:
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=4, state="in_progress")
+        next_stage = PlayoffStage(id=2, key="stage_1_4", title="1/4", stage_size=16, stage_order=2, is_started=False)
+        db = AsyncMock()
+        db.scalar = AsyncMock(side_effect=[_stage(), match, next_stage, 8])
+
+        with self.assertRaisesRegex(ValueError, "переведены в следующий этап"):
+            await undo_last_playoff_game(db, stage_id=1, group_number=1)
+
+        db.commit.assert_not_called()
+
+    async def test_replay_matches_incremental_aggregates_and_reports_drift(self) -> None:
+        participants = _participants()
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=1, state="pending")
+        apply_db = AsyncMock()
+        apply_db.scalar = AsyncMock(side_effect=[_stage(), match] * 3)
+        apply_db.scalars = AsyncMock(return_value=_ScalarResult(participants))
+        log: list[PlayoffGameResult] = []
+        for ordered_user_ids in ([1, 2, 3, 4, 5, 6, 7, 8], [2, 1, 4, 3, 6, 5, 8, 7], [8, 1, 2, 3, 4, 5, 6, 7]):
+            await apply_playoff_match_results(apply_db, stage_id=1, ordered_user_ids=ordered_user_ids)
+            log.extend(_log_rows(apply_db.execute.await_args.args[1]))
+
+        replay_db = AsyncMock()
+        replay_db.scalars = AsyncMock(return_value=_ScalarResult(log))
+        replay_db.execute = AsyncMock(return_value=_adjustment_totals([]))
+        replayed = await replay_playoff_stage_standings(replay_db, stage_id=1)
+        for participant in participants:
+            self.assertEqual(replayed[participant.user_id].points, participant.points)
+            self.assertEqual(replayed[participant.user_id].last_place, participant.last_place)
+
+        participants[0].points += 3
+        diagnostics_db = AsyncMock()
+        diagnostics_db.scalars = AsyncMock(side_effect=[_ScalarResult(log), _ScalarResult(participants)])
+        diagnostics_db.execute = AsyncMock(return_value=_adjustment_totals([]))
+        mismatches = await find_playoff_standings_mismatches(diagnostics_db, stage_id=1)
+        self.assertEqual(
+            mismatches,
+            [{"user_id": 1, "field": "points", "stored": participants[0].points, "replayed": participants[0].points - 3}],
+        )
+
+    async def test_manual_point_adjustments_are_replayed_not_reported(self) -> None:
+        participants = _participants()
+        match = PlayoffMatch(stage_id=1, match_number=1, group_number=1, game_number=1, state="pending")
+        apply_db = AsyncMock()
+        apply_db.scalar = AsyncMock(side_effect=[_stage(), match])
+        apply_db.scalars = AsyncMock(return_value=_ScalarResult(participants))
+        await apply_playoff_match_results(apply_db, stage_id=1, ordered_user_ids=[1, 2, 3, 4, 5, 6, 7, 8])
+        log = _log_rows(apply_db.execute.await_args.args[1])
+
+        adjust_db = AsyncMock()
+        adjust_db.add = MagicMock()
+        adjust_db.scalar = AsyncMock(return_value=participants[7])
+        await adjust_stage_points(adjust_db, stage_id=1, user_id=8, points_delta=5)
+        adjust_db.scalar = AsyncMock(return_value=participants[0])
+        await adjust_stage_points(adjust_db, stage_id=1, user_id=1, points_delta=-2)
+        adjustments = [call.args[0] for call in adjust_db.add.call_args_list]
+        self.assertEqual([(row.user_id, row.points_delta) for row in adjustments], [(8, 5), (1, -2)])
+
+        diagnostics_db = AsyncMock()
+        diagnostics_db.scalars = AsyncMock(side_effect=[_ScalarResult(log), _ScalarResult(participants)])
+        diagnostics_db.execute = AsyncMock(return_value=_adjustment_totals(adjustments))
+        self.assertEqual(await find_playoff_standings_mismatches(diagnostics_db, stage_id=1), [])
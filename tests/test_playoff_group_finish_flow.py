@@ -84,7 +84,8 @@ class PlayoffGroupFinishFlowTests(unittest.IsolatedAsyncioTestCase):
         group_2_finished = PlayoffMatch(stage_id=10, group_number=2, game_number=4, state="finished")
 
         db = AsyncMock()
-        db.scalars = AsyncMock(return_value=_ScalarResult(participants))
+        # Второй запрос — ручные тай-брейки этапа, их нет.
+        db.scalars = AsyncMock(side_effect=[_ScalarResult(participants), _ScalarResult([])])
         db.scalar = AsyncMock(side_effect=[stage, group_2_match, group_1_match, group_2_finished, None])
 
         with (
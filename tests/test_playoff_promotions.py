@@ -1,9 +1,8 @@
 """Проверяет правила продвижения участников между стадиями плей-офф."""
 
 import unittest
-from unittest.mock import patch
 
-from app.models.tournament import PlayoffParticipant, PlayoffStage
+from app.models.tournament import PlayoffManualTieBreak, PlayoffParticipant, PlayoffStage
 from app.services.tournament import promote_top_between_stages
 
 
@@ -16,9 +15,10 @@ class _ScalarResult:
 
 
 class _FakeDB:
-    def __init__(self, scalar_items, participants):
+    def __init__(self, scalar_items, participants, tie_breaks=()):
         self._scalar_items = list(scalar_items)
         self._participants = participants
+        self._tie_breaks = list(tie_breaks)
         self.added: list[PlayoffParticipant] = []
         self.executed = 0
         self.commits = 0
@@ -26,7 +26,9 @@ class _FakeDB:
     async def scalar(self, _statement):
         return self._scalar_items.pop(0)
 
-    async def scalars(self, _statement):
+    async def scalars(self, statement):
+        if statement.column_descriptions[0]["entity"] is PlayoffManualTieBreak:
+            return _ScalarResult(self._tie_breaks)
         return _ScalarResult(self._participants)
 
     async def execute(self, _statement):
@@ -140,11 +142,8 @@ class PlayoffPromotionTests(unittest.IsolatedAsyncioTestCase):
         with self.assertRaisesRegex(ValueError, "top-4"):
             await promote_top_between_stages(db, stage_id=50, top_n=2)
 
-    async def test_promote_top_between_stages_breaks_cutoff_ties_randomly(self) -> None:
-        stage = PlayoffStage(id=70, key="stage_1_4", title="Stage 3", stage_order=2, stage_size=16)
-        next_stage = PlayoffStage(id=80, key="stage_final", title="Final", stage_order=3, stage_size=8)
-
-        participants = [
+    def _cutoff_tie_participants(self) -> list[PlayoffParticipant]:
+        return [
             PlayoffParticipant(stage_id=70, user_id=1, seed=1, points=100, wins=3, top4_finishes=3, top8_finishes=3, last_place=8),
             PlayoffParticipant(stage_id=70, user_id=2, seed=2, points=99, wins=3, top4_finishes=3, top8_finishes=3, last_place=8),
             PlayoffParticipant(stage_id=70, user_id=3, seed=3, points=98, wins=3, top4_finishes=3, top8_finishes=3, last_place=8),
@@ -157,18 +156,32 @@ class PlayoffPromotionTests(unittest.IsolatedAsyncioTestCase):
             PlayoffParticipant(stage_id=70, user_id=13, seed=13, points=97, wins=2, top4_finishes=2, top8_finishes=3, last_place=8),
         ]
 
-        db = _FakeDB([stage, next_stage], participants)
-
-        def _reverse_shuffle(items):
-            items.reverse()
+    async def test_promote_top_between_stages_resolves_unset_cutoff_tie_by_user_id(self) -> None:
+        stage = PlayoffStage(id=70, key="stage_1_4", title="Stage 3", stage_order=2, stage_size=16)
+        next_stage = PlayoffStage(id=80, key="stage_final", title="Final", stage_order=3, stage_size=8)
 
-        with patch("app.services.tournament.random.shuffle", side_effect=_reverse_shuffle) as shuffle_mock:
+        for _ in range(3):
+            db = _FakeDB([stage, next_stage], self._cutoff_tie_participants())
             await promote_top_between_stages(db, stage_id=70, top_n=4)
 
+            promoted_ids = [participant.user_id for participant in db.added]
+            self.assertIn(12, promoted_ids)
+            self.assertNotIn(13, promoted_ids)
+
+    async def test_promote_top_between_stages_applies_manual_tie_break_at_cutoff(self) -> None:
+        stage = PlayoffStage(id=71, key="stage_1_4", title="Stage 3", stage_order=2, stage_size=16)
+        next_stage = PlayoffStage(id=81, key="stage_final", title="Final", stage_order=3, stage_size=8)
+        tie_breaks = [
+            PlayoffManualTieBreak(stage_id=71, group_number=2, user_id=13, priority=1),
+            PlayoffManualTieBreak(stage_id=71, group_number=2, user_id=12, priority=2),
+        ]
+
+        db = _FakeDB([stage, next_stage], self._cutoff_tie_participants(), tie_breaks)
+        await promote_top_between_stages(db, stage_id=71, top_n=4)
+
         promoted_ids = [participant.user_id for participant in db.added]
         self.assertIn(13, promoted_ids)
         self.assertNotIn(12, promoted_ids)
-        self.assertGreaterEqual(shuffle_mock.call_count, 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+"""Проверяет пакетный импорт результатов плей-офф одной транзакцией."""
+
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.models.tournament import PlayoffMatch, PlayoffParticipant, PlayoffStage
+from app.services import tournament
+from app.services.tournament import import_playoff_stage_results, parse_playoff_results_import
+
+
+class _ScalarResult:
+    def __init__(self, items):
+        self._items = items
+
+    def all(self):
+        return self._items
+
+
+def _participants() -> list[PlayoffParticipant]:
+    return [
+        PlayoffParticipant(
+            stage_id=1,
+            user_id=user_id,
+            seed=user_id,
+            points=0,
+            wins=0,
+            top4_finishes=0,
+            top8_finishes=0,
+            eighth_places=0,
+            last_place=8,
+        )
+        for user_id in range(1, 17)
+    ]
+
+
+def _matches() -> list[PlayoffMatch]:
+    return [
+        PlayoffMatch(stage_id=1, match_number=group_number, group_number=group_number, game_number=1, state="pending")
+        for group_number in (1, 2)
+    ]
+
+
+def _db(participants, matches) -> AsyncMock:
+    db = AsyncMock()
+    stage = PlayoffStage(id=1, key="stage_2", title="Stage 2", stage_size=16, stage_order=1, scoring_mode="standard")
+    db.scalar = AsyncMock(return_value=stage)
+    db.scalars = AsyncMock(side_effect=[_ScalarResult(matches), _ScalarResult(participants)])
+    return db
+
+
+GROUP_1 = [1, 2, 3, 4, 5, 6, 7, 8]
+GROUP_2 = [9, 10, 11, 12, 13, 14, 15, 16]
+
+
+class ParsePlayoffResultsImportTests(unittest.TestCase):
+    def test_parses_csv_with_header(self) -> None:
+        payload = "group,p1,p2,p3,p4,p5,p6,p7,p8\n1,1,2,3,4,5,6,7,8\n\n2, 9,10,11,12,13,14,15,16\n"
+
+        self.assertEqual(parse_playoff_results_import(payload), [(1, GROUP_1), (2, GROUP_2)])
+
+    def test_parses_json_list(self) -> None:
+        payload = '[{"group_number": 2, "placements": [9, 10, 11, 12, 13, 14, 15, 16]}, {"placements": ["1", 2, 3, 4, 5, 6, 7, 8]}]'
+
+        self.assertEqual(parse_playoff_results_import(payload), [(2, GROUP_2), (1, GROUP_1)])
+
+    def test_rejects_non_numeric_ids(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Игра 1"):
+            parse_playoff_results_import("1,a,2,3,4,5,6,7,8")
+
+
+class ImportPlayoffStageResultsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_applies_all_games_in_one_commit_and_finalizes(self) -> None:
+        participants, matches = _participants(), _matches()
+        db = _db(participants, matches)
+        games = [(1, GROUP_1), (2, GROUP_2), (1, list(reversed(GROUP_1))), (2, GROUP_2), (1, GROUP_1), (2, GROUP_2)]
+
+        with patch.object(tournament, "finalize_limited_playoff_stage_if_ready", new=AsyncMock(return_value=True)) as finalize_mock:
+            imported_count, finalized = await import_playoff_stage_results(db, stage_id=1, games=games)
+
+        self.assertEqual((imported_count, finalized), (6, True))
+        self.assertEqual([match.game_number for match in matches], [4, 4])
+        self.assertEqual([match.state for match in matches], ["finished", "finished"])
+        self.assertEqual(participants[0].points, 8 + 0 + 8)
+        # По одному UPDATE ... FROM (VALUES) на игру и одна вставка журнала на весь пакет.
+        self.assertEqual(db.execute.await_count, len(games) + 1)
+        self.assertEqual(len(db.execute.await_args.args[1]), 48)
+        db.commit.assert_awaited_once()
+        finalize_mock.assert_awaited_once_with(db, 1)
+
+    async def test_invalid_game_rejects_whole_batch_before_changes(self) -> None:
+        participants, matches = _participants(), _matches()
+        db = _db(participants, matches)
+        games = [(1, GROUP_1), (2, [9, 10, 11, 12, 13, 14, 15, 1])]
+
+        with self.assertRaisesRegex(ValueError, "Игра 2 \\(группа 2\\): В результатах есть игрок из другой группы"):
+            await import_playoff_stage_results(db, stage_id=1, games=games)
+
+        self.assertEqual(participants[0].points, 0)
+        self.assertEqual(matches[0].game_number, 1)
+        db.execute.assert_not_called()
+        db.commit.assert_not_called()
+
+    async def test_counts_planned_games_against_group_limit(self) -> None:
+        participants, matches = _participants(), _matches()
+        db = _db(participants, matches)
+
+        with self.assertRaisesRegex(ValueError, "Игра 4 \\(группа 1\\): .*достигнут лимит"):
+            await import_playoff_stage_results(db, stage_id=1, games=[(1, GROUP_1)] * 4)
+
+        db.commit.assert_not_called()
+
+    async def test_unfinished_stage_keeps_results_without_finalizing(self) -> None:
+        db = _db(_participants(), _matches())
+
+        with patch.object(
+            tournament,
+            "finalize_limited_playoff_stage_if_ready",
+            new=AsyncMock(side_effect=ValueError("group_games_not_completed")),
+        ):
+            imported_count, finalized = await import_playoff_stage_results(db, stage_id=1, games=[(1, GROUP_1)])
+
+        self.assertEqual((imported_count, finalized), (1, False))
+        db.commit.assert_awaited_once()
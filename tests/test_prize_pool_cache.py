@@ -0,0 +1,82 @@
+"""Проверяет кэш призового фонда: сумма доноров считается в SQL один раз и сбрасывается правками доноров."""
+
+import asyncio
+from decimal import Decimal
+
+from app.models.settings import Donor, SiteSetting
+from app.routers import web
+from app.services.prize_pool_cache import get_prize_pool_totals, prize_pool_totals_cache
+
+
+class _FakeDonorsDB:
+    def __init__(self, donors, highlight_amount=None) -> None:
+        self.donors = donors
+        self.site_settings = [SiteSetting(key="donate_highlight_amount", value=highlight_amount)] if highlight_amount else []
+        self.queries: list[str] = []
+        self.before_sum = None
+
+    async def scalars(self, statement):
+        raise AssertionError(f"Unexpected row scan: {statement}")
+
+    async def scalar(self, statement):
+        query = str(statement)
+        self.queries.append(query)
+        if "sum(donors.amount)" in query:
+            if self.before_sum:
+                self.before_sum()
+            return sum(donor.amount for donor in self.donors)
+        if "max(donors.sort_order)" in query:
+            return max((donor.sort_order for donor in self.donors), default=None)
+        if "site_settings.key" in query:
+            return self.site_settings[0] if self.site_settings else None
+        raise AssertionError(f"Unexpected scalar query: {query}")
+
+    async def get(self, model, row_id):
+        return next((donor for donor in self.donors if donor.id == row_id), None)
+
+    def add(self, row) -> None:
+        row.id = len(self.donors) + 1
+        self.donors.append(row)
+
+    async def delete(self, row) -> None:
+        self.donors.remove(row)
+
+    async def commit(self) -> None:
+        return None
+
+
+def test_totals_are_summed_in_sql_once_and_cached_with_highlight_amount() -> None:
+    db = _FakeDonorsDB([Donor(id=1, amount=700), Donor(id=2, amount=300)], highlight_amount=" 5 000 ")
+
+    for _ in range(20):
+        totals = asyncio.run(get_prize_pool_totals(db))
+
+    assert totals.donor_total == Decimal("1000")
+    assert totals.highlight_amount == "5 000"
+    assert len(db.queries) == 2
+    assert "sum(donors.amount)" in db.queries[0]
+
+
+def test_sponsor_endpoints_invalidate_cached_total() -> None:
+    db = _FakeDonorsDB([Donor(id=1, amount=700, sort_order=0)])
+    assert asyncio.run(get_prize_pool_totals(db)).donor_total == Decimal("700")
+
+    asyncio.run(web.admin_create_sponsor(name="Bob", amount=300, db=db))
+    assert asyncio.run(get_prize_pool_totals(db)).donor_total == Decimal("1000")
+
+    asyncio.run(web.admin_update_sponsor(sponsor_id=1, name="Alice", amount=100, db=db))
+    assert asyncio.run(get_prize_pool_totals(db)).donor_total == Decimal("400")
+
+    asyncio.run(web.admin_delete_sponsor(sponsor_id=2, db=db))
+    assert asyncio.run(get_prize_pool_totals(db)).donor_total == Decimal("100")
+
+
+def test_load_racing_with_invalidation_is_not_cached() -> None:
+    db = _FakeDonorsDB([Donor(id=1, amount=700)])
+    db.before_sum = prize_pool_totals_cache.invalidate
+
+    asyncio.run(get_prize_pool_totals(db))
+    db.before_sum = None
+    asyncio.run(get_prize_pool_totals(db))
+
+    assert sum("sum(donors.amount)" in query for query in db.queries) == 2
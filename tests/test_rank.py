@@ -2,7 +2,7 @@
 
 import unittest
 
-from app.services.rank import mmr_to_rank
+from app.services.rank import RANK_DIVISION_UNKNOWN, RANK_TIER_UNKNOWN, mmr_to_rank, rank_sort_key
 
 
 class MmrToRankTests(unittest.TestCase):
@@ -53,5 +53,27 @@ class MmrToRankTests(unittest.TestCase):
                 self.assertEqual(mmr_to_rank(mmr), expected)
 
 
+class RankSortKeyTests(unittest.TestCase):
+    def test_rank_sort_key_matches_legacy_sql_ordering(self) -> None:
+        """Проверяет, что материализованный ключ повторяет прежние CASE-выражения сортировки participants."""
+        cases: list[tuple[str | None, tuple[int, int]]] = [
+            ("Queen#7", (0, 7)),
+            ("Queen", (0, RANK_DIVISION_UNKNOWN)),
+            ("Queen#abc", (0, RANK_DIVISION_UNKNOWN)),
+            ("King", (1, 0)),
+            ("Rook-9", (2, 9)),
+            ("Bishop-1", (3, 1)),
+            ("Knight-4", (4, 4)),
+            ("Pawn-2", (4, 2)),
+            ("Pawn-x", (4, 0)),
+            ("", (RANK_TIER_UNKNOWN, RANK_DIVISION_UNKNOWN)),
+            (None, (RANK_TIER_UNKNOWN, RANK_DIVISION_UNKNOWN)),
+        ]
+
+        for highest_rank, expected in cases:
+            with self.subTest(highest_rank=highest_rank):
+                self.assertEqual(rank_sort_key(highest_rank), expected)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,8 @@
-import json
-
 from fastapi.testclient import TestClient
 
 from app.db.session import get_db
 from app.main import app
+from app.models.user import PendingRegistration
 from app.routers import web
 
 
@@ -30,8 +29,9 @@ class _FakeRegisterDB:
         self.committed = True
 
 
-def test_register_uses_input_nickname(monkeypatch):
+def test_register_accepts_pending_registration_and_schedules_enrichment(monkeypatch):
     fake_db = _FakeRegisterDB()
+    scheduled = []
 
     async def override_get_db():
         yield fake_db
@@ -42,23 +42,12 @@ def test_register_uses_input_nickname(monkeypatch):
     async def fake_registration_open(db):
         return True
 
-    async def fake_normalize_steam_id(steam_input):
-        return "76561198000000000"
-
-    async def fake_fetch_autochess_data(steam_id):
-        return {
-            "game_nickname": "AutoNick",
-            "current_rank": "Knight",
-            "highest_rank": "King",
-            "raw": {"source": "test"},
-        }
+    async def fake_enrich(session_factory, registration_id):
+        scheduled.append(registration_id)
 
     monkeypatch.setattr(web, "get_tournament_started", fake_tournament_started)
     monkeypatch.setattr(web, "get_registration_open", fake_registration_open)
-    monkeypatch.setattr(web, "normalize_steam_id", fake_normalize_steam_id)
-    monkeypatch.setattr(web, "fetch_autochess_data", fake_fetch_autochess_data)
-    monkeypatch.setattr(web, "pick_basket", lambda *args, **kwargs: "new")
-    monkeypatch.setattr(web, "allocate_basket", lambda *args, **kwargs: "new")
+    monkeypatch.setattr(web, "enrich_pending_registration", fake_enrich)
 
     app.dependency_overrides[get_db] = override_get_db
     try:
@@ -77,14 +66,19 @@ def test_register_uses_input_nickname(monkeypatch):
         app.dependency_overrides.pop(get_db, None)
 
     assert response.status_code == 303
+    assert response.headers["location"].endswith("msg=msg_registration_pending")
     assert fake_db.committed is True
     assert len(fake_db.added) == 1
 
-    user = fake_db.added[0]
-    assert user.nickname == "ManualNick"
-    assert user.discord is None
-    assert user.telegram == "@telegram"
-    assert json.loads(user.extra_data) == {"source": "test"}
+    registration = fake_db.added[0]
+    assert isinstance(registration, PendingRegistration)
+    assert registration.nickname == "ManualNick"
+    assert registration.telegram == "@telegram"
+    # Steam64 из URL профиля выводится без запросов к Steam.
+    assert registration.steam_id == "76561198000000000"
+    assert registration.status == "pending"
+    assert f"{web.REGISTRATION_TOKEN_COOKIE}={registration.token}" in response.headers["set-cookie"]
+    assert scheduled == [registration.id]
 
 
 def test_register_requires_nickname(monkeypatch):
@@ -114,8 +108,6 @@ def test_register_requires_nickname(monkeypatch):
     monkeypatch.setattr(web, "get_registration_open", fake_registration_open)
     monkeypatch.setattr(web, "normalize_steam_id", fake_normalize_steam_id)
     monkeypatch.setattr(web, "fetch_autochess_data", fake_fetch_autochess_data)
-    monkeypatch.setattr(web, "pick_basket", lambda *args, **kwargs: "new")
-    monkeypatch.setattr(web, "allocate_basket", lambda *args, **kwargs: "new")
 
     app.dependency_overrides[get_db] = override_get_db
     try:
@@ -158,8 +150,6 @@ def test_register_rejects_blank_nickname(monkeypatch):
     monkeypatch.setattr(web, "get_registration_open", fake_registration_open)
     monkeypatch.setattr(web, "normalize_steam_id", fake_normalize_steam_id)
     monkeypatch.setattr(web, "fetch_autochess_data", fake_fetch_autochess_data)
-    monkeypatch.setattr(web, "pick_basket", lambda *args, **kwargs: "new")
-    monkeypatch.setattr(web, "allocate_basket", lambda *args, **kwargs: "new")
 
     app.dependency_overrides[get_db] = override_get_db
     try:
@@ -204,8 +194,6 @@ def test_register_rejects_too_long_nickname(monkeypatch):
     monkeypatch.setattr(web, "get_registration_open", fake_registration_open)
     monkeypatch.setattr(web, "normalize_steam_id", fake_normalize_steam_id)
     monkeypatch.setattr(web, "fetch_autochess_data", fake_fetch_autochess_data)
-    monkeypatch.setattr(web, "pick_basket", lambda *args, **kwargs: "new")
-    monkeypatch.setattr(web, "allocate_basket", lambda *args, **kwargs: "new")
 
     app.dependency_overrides[get_db] = override_get_db
     try:
@@ -221,3 +209,11 @@ def test_register_rejects_too_long_nickname(monkeypatch):
     assert response.status_code == 303
     assert response.headers["location"].endswith("msg=msg_invalid_request")
     assert not fake_db.added
+
+
+def test_user_select_defers_raw_autochess_profile() -> None:
+    from sqlalchemy import select
+
+    from app.models.user import User
+
+    assert "users.extra_data" not in str(select(User))
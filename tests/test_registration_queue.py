@@ -0,0 +1,279 @@
+"""Проверяет двухфазную регистрацию: приём заявки, фоновое обогащение профилем и опрос статуса."""
+
+import asyncio
+from datetime import datetime, timedelta
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from app import main as main_module
+from app.db.session import get_db
+from app.main import app
+from app.models.user import PendingRegistration, User
+from app.routers import web
+from app.services import registration_queue
+from app.services.registration_queue import (
+    accept_registration,
+    enrich_pending_registration,
+    queue_enrichment,
+    revive_stale_registration,
+)
+
+
+class _QueueStore:
+    def __init__(self, registration: PendingRegistration) -> None:
+        self.registration = registration
+        self.users: list[User] = []
+        self.site_settings: dict[str, str] = {}
+        self.open_sessions = 0
+
+
+class _FakeClaimResult:
+    def __init__(self, row) -> None:
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _FakeQueueSession:
+    def __init__(self, store: _QueueStore) -> None:
+        self.store = store
+
+    async def __aenter__(self):
+        self.store.open_sessions += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.store.open_sessions -= 1
+
+    async def get(self, model, pk):
+        return self.store.registration if pk == self.store.registration.id else None
+
+    async def scalar(self, statement):
+        if "site_settings" in str(statement):
+            return self.store.site_settings.get(statement.compile(dialect=postgresql.dialect()).params["key_1"])
+        return None
+
+    async def execute(self, statement):
+        # Условный захват: UPDATE ... WHERE id AND status AND (attempts = 0 OR updated_at < срок) RETURNING.
+        params = statement.compile(dialect=postgresql.dialect()).params
+        registration = self.store.registration
+        claimable = (
+            registration.id == params["id_1"]
+            and registration.status == params["status_1"]
+            and (registration.attempts == params["attempts_2"] or registration.updated_at < params["updated_at_1"])
+        )
+        if not claimable:
+            return _FakeClaimResult(None)
+        registration.attempts += params["attempts_1"]
+        registration.updated_at = params["updated_at"]
+        return _FakeClaimResult((registration.steam_input, registration.steam_id))
+
+    def add(self, instance) -> None:
+        self.store.users.append(instance)
+
+    async def flush(self) -> None:
+        for index, user in enumerate(self.store.users, start=100):
+            user.id = index
+
+    async def commit(self) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        return None
+
+
+def _pending(**overrides) -> PendingRegistration:
+    values = dict(
+        id=5,
+        token="a" * 32,
+        steam_input="76561198000000005",
+        steam_id="76561198000000005",
+        nickname="ManualNick",
+        telegram="@telegram",
+        status="pending",
+        attempts=0,
+    )
+    values.update(overrides)
+    return PendingRegistration(**values)
+
+
+def test_enrichment_creates_user_without_holding_a_session_during_fetch(monkeypatch) -> None:
+    store = _QueueStore(_pending())
+    sessions_during_fetch = []
+
+    async def fake_fetch_autochess_data(steam_id):
+        sessions_during_fetch.append(store.open_sessions)
+        return {"game_nickname": "AutoNick", "current_rank": "Knight", "highest_rank": "King-3", "raw": {"source": "test"}}
+
+    async def fake_reserve_basket(db, target_basket, limit=8):
+        return f"{target_basket}:reserved"
+
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", fake_fetch_autochess_data)
+    monkeypatch.setattr(registration_queue, "reserve_basket", fake_reserve_basket)
+    monkeypatch.setattr(registration_queue, "refresh_user_directory_entry", lambda user: None)
+
+    status = asyncio.run(enrich_pending_registration(lambda: _FakeQueueSession(store), 5))
+
+    assert status == "done"
+    assert sessions_during_fetch == [0]
+    [user] = store.users
+    assert (user.nickname, user.telegram, user.steam_id) == ("ManualNick", "@telegram", "76561198000000005")
+    assert user.basket == "king:reserved"
+    assert json.loads(user.extra_data) == {"source": "test"}
+    assert store.registration.user_id == user.id
+    assert store.registration.attempts == 1
+
+
+def test_enrichment_marks_registration_failed_when_profile_is_unavailable(monkeypatch) -> None:
+    store = _QueueStore(_pending(steam_id=None, steam_input="some_vanity"))
+
+    async def fake_normalize_steam_id(steam_input):
+        return "76561198000000005"
+
+    async def failing_fetch(steam_id):
+        raise TimeoutError("AutoChess API is slow")
+
+    monkeypatch.setattr(registration_queue, "normalize_steam_id", fake_normalize_steam_id)
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", failing_fetch)
+
+    status = asyncio.run(enrich_pending_registration(lambda: _FakeQueueSession(store), 5))
+
+    assert status == "failed"
+    assert store.registration.error == "msg_registration_profile_failed"
+    assert store.users == []
+    # Повторный запуск по той же заявке ничего не делает.
+    assert asyncio.run(enrich_pending_registration(lambda: _FakeQueueSession(store), 5)) is None
+
+
+def test_enrichment_fails_registration_closed_while_profile_was_fetched(monkeypatch) -> None:
+    store = _QueueStore(_pending())
+
+    async def fake_fetch_autochess_data(steam_id):
+        # Админ закрыл приём, пока заявка ждала ответа AutoChess.
+        store.site_settings["registration_open"] = "0"
+        return {"game_nickname": "AutoNick", "current_rank": "Knight", "highest_rank": "King-3", "raw": {}}
+
+    async def fail_reserve_basket(db, target_basket, limit=8):
+        raise AssertionError("closed registration must not take a basket slot")
+
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", fake_fetch_autochess_data)
+    monkeypatch.setattr(registration_queue, "reserve_basket", fail_reserve_basket)
+
+    status = asyncio.run(enrich_pending_registration(lambda: _FakeQueueSession(store), 5))
+
+    assert status == "failed"
+    assert store.registration.error == "registration_closed"
+    assert store.users == []
+
+
+def test_integrity_error_does_not_overwrite_registration_resolved_elsewhere(monkeypatch) -> None:
+    store = _QueueStore(_pending())
+
+    async def fake_fetch_autochess_data(steam_id):
+        return {"game_nickname": "AutoNick", "current_rank": "Knight", "highest_rank": "King-3", "raw": {}}
+
+    async def conflicting_reserve_basket(db, target_basket, limit=8):
+        # Параллельная задача уже довела заявку до конца, наша вставка упирается в уникальность steam_id.
+        store.registration.status = "done"
+        raise IntegrityError("INSERT INTO users", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", fake_fetch_autochess_data)
+    monkeypatch.setattr(registration_queue, "reserve_basket", conflicting_reserve_basket)
+
+    status = asyncio.run(enrich_pending_registration(lambda: _FakeQueueSession(store), 5))
+
+    assert status is None
+    assert store.registration.status == "done"
+    assert store.registration.error is None
+
+
+def test_repeated_polls_of_a_queued_registration_run_one_enrichment(monkeypatch) -> None:
+    # Заявка ждёт слота дольше STALE_PENDING_AFTER: до первого запуска updated_at равен created_at.
+    accepted_at = datetime.utcnow() - timedelta(minutes=10)
+    store = _QueueStore(_pending(created_at=accepted_at, updated_at=accepted_at))
+    fetched = []
+
+    async def fake_fetch_autochess_data(steam_id):
+        fetched.append(steam_id)
+        return {"game_nickname": "AutoNick", "current_rank": "Knight", "highest_rank": "King-3", "raw": {}}
+
+    async def fake_reserve_basket(db, target_basket, limit=8):
+        return target_basket
+
+    monkeypatch.setattr(registration_queue, "fetch_autochess_data", fake_fetch_autochess_data)
+    monkeypatch.setattr(registration_queue, "reserve_basket", fake_reserve_basket)
+    monkeypatch.setattr(registration_queue, "refresh_user_directory_entry", lambda user: None)
+
+    assert queue_enrichment(5)
+    polls = [asyncio.run(revive_stale_registration(None, store.registration)) for _ in range(20)]
+    assert not any(polls)
+
+    async def queued_task_and_duplicate_from_another_worker():
+        session_factory = lambda: _FakeQueueSession(store)  # noqa: E731
+        return await asyncio.gather(
+            enrich_pending_registration(session_factory, 5),
+            enrich_pending_registration(session_factory, 5),
+        )
+
+    statuses = asyncio.run(queued_task_and_duplicate_from_another_worker())
+
+    assert statuses.count("done") == 1 and statuses.count(None) == 1
+    assert fetched == ["76561198000000005"]
+    assert store.registration.attempts == 1
+    assert len(store.users) == 1
+
+
+def test_accept_registration_rejects_known_steam_id_without_external_calls() -> None:
+    class _ExistingUserDB:
+        async def scalar(self, statement):
+            return 1
+
+    result = asyncio.run(
+        accept_registration(_ExistingUserDB(), steam_input="76561198000000005", nickname="N", telegram="")
+    )
+
+    assert result == "already_registered"
+
+
+def test_register_status_reports_result_and_requeues_stale_pending(monkeypatch) -> None:
+    registration = _pending(updated_at=datetime.utcnow() - timedelta(minutes=10), attempts=1)
+    scheduled = []
+
+    class _StatusDB:
+        async def scalar(self, statement):
+            return registration
+
+        async def commit(self):
+            return None
+
+    async def override_get_db():
+        yield _StatusDB()
+
+    async def fake_enabled() -> bool:
+        return False
+
+    async def fake_enrich(session_factory, registration_id):
+        scheduled.append(registration_id)
+
+    monkeypatch.setattr(main_module, "is_technical_works_enabled", fake_enabled)
+    monkeypatch.setattr(web, "enrich_pending_registration", fake_enrich)
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            client.cookies.set(web.REGISTRATION_TOKEN_COOKIE, registration.token)
+            pending_response = client.get("/register/status")
+            registration.status = "failed"
+            registration.error = "already_registered"
+            failed_response = client.get("/register/status")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert pending_response.json()["status"] == "pending"
+    assert scheduled == [5]
+    assert failed_response.json() == {"status": "failed", "message": web.t("en", "already_registered")}
+    assert f'{web.REGISTRATION_TOKEN_COOKIE}=""' in failed_response.headers["set-cookie"]
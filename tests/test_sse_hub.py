@@ -0,0 +1,98 @@
+"""Проверяет SSE-хаб чата: очереди подписчиков, схлопывание для медленных клиентов, лимиты и heartbeat."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.main import app
+from app.routers import web
+from app.services.sse_hub import PING_FRAME, RESYNC_FRAME, SseHub, format_sse_frame
+
+
+def _drain(subscription) -> list[str]:
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait())
+    return frames
+
+
+def test_publish_fans_out_and_slow_consumer_is_coalesced() -> None:
+    async def scenario():
+        hub = SseHub(queue_size=3, heartbeat_seconds=60)
+        fast = hub.subscribe("203.0.113.1")
+        slow = hub.subscribe("203.0.113.2")
+        assert _drain(fast) == [RESYNC_FRAME]
+
+        await hub.publish("chat_update", {"id": 1})
+        assert _drain(fast) == [format_sse_frame("chat_update", {"id": 1})]
+
+        for index in range(5):
+            await hub.publish("chat_update", {"id": index})
+        return fast, slow, hub
+
+    fast, slow, hub = asyncio.run(scenario())
+
+    # Переполненная очередь схлопывается в одну команду перечитать чат, а не копит хвост событий.
+    assert _drain(fast) == [RESYNC_FRAME, format_sse_frame("chat_update", {"id": 4})]
+    assert fast.dropped == 1
+    assert _drain(slow) == [RESYNC_FRAME]
+    assert slow.dropped == 2
+
+
+def test_connection_caps_per_worker_and_per_ip() -> None:
+    async def scenario():
+        hub = SseHub(max_connections=3, max_connections_per_ip=2, heartbeat_seconds=60)
+        first = hub.subscribe("198.51.100.1")
+        assert hub.subscribe("198.51.100.1") is not None
+        assert hub.subscribe("198.51.100.1") is None
+        assert hub.subscribe("198.51.100.2") is not None
+        assert hub.subscribe("198.51.100.3") is None
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(first)
+        assert len(hub) == 2
+        assert hub.subscribe("198.51.100.1") is not None
+
+    asyncio.run(scenario())
+
+
+def test_single_heartbeat_pings_only_idle_queues_and_stream_close_unsubscribes() -> None:
+    async def scenario():
+        hub = SseHub(heartbeat_seconds=0.01)
+        subscribers = [hub.subscribe(f"192.0.2.{index}") for index in range(3)]
+        heartbeat_task = hub._heartbeat_task
+        for subscription in subscribers:
+            _drain(subscription)
+        subscribers[0].offer(format_sse_frame("chat_update"))
+        await asyncio.sleep(0.035)
+
+        assert hub._heartbeat_task is heartbeat_task
+        # Непрочитанный кадр уже держит соединение живым, ping туда не добавляется.
+        assert _drain(subscribers[0]) == [format_sse_frame("chat_update")]
+        assert _drain(subscribers[1]) == [PING_FRAME]
+
+        stream = hub.events(subscribers[2])
+        assert await stream.__anext__() == PING_FRAME
+        await stream.aclose()
+        assert len(hub) == 2
+
+        hub.reset()
+        await asyncio.sleep(0.03)
+        assert heartbeat_task.done()
+
+    asyncio.run(scenario())
+
+
+def test_chat_stream_returns_503_when_worker_is_full(monkeypatch) -> None:
+    async def fake_enabled() -> bool:
+        return False
+
+    monkeypatch.setattr(main_module, "is_technical_works_enabled", fake_enabled)
+    monkeypatch.setattr(web, "chat_event_broker", SseHub(max_connections=0))
+
+    with TestClient(app) as client:
+        response = client.get("/chat/stream")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
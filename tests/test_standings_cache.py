@@ -0,0 +1,261 @@
+"""Проверяет кэш таблиц групп: пересчёт при записи результата, чтение страницами и сброс."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.tournament import (
+    GroupManualTieBreak,
+    GroupMember,
+    PlayoffManualTieBreak,
+    PlayoffMatch,
+    PlayoffParticipant,
+    PlayoffStage,
+    TournamentGroup,
+)
+from app.routers import web
+from app.services import standings_cache
+from app.services.standings_cache import (
+    GROUP_STAGE_SCOPE,
+    get_group_stage_standings,
+    get_playoff_group_standings,
+    load_stage_tie_breaks,
+    standings_generation,
+    store_playoff_group_standings,
+)
+from app.services.tournament import (
+    adjust_stage_points,
+    apply_game_results,
+    promote_top_between_stages,
+    save_group_manual_tie_break,
+    sort_members_for_table,
+)
+from app.services.tournament_view import build_group_stage_standings, build_playoff_standings
+
+
+class _FakeScalarsResult:
+    def __init__(self, items):
+        self._items = items
+
+    def all(self):
+        return list(self._items)
+
+
+def _members(group_id: int = 1) -> list[GroupMember]:
+    return [
+        GroupMember(group_id=group_id, user_id=i, seat=i, total_points=0, first_places=0, top4_finishes=0, top8_finishes=0, eighth_places=0, last_game_place=8)
+        for i in range(1, 9)
+    ]
+
+
+def _stage_with_participants(points: list[int], *, game_number: int = 4) -> PlayoffStage:
+    stage = PlayoffStage(id=7, key="stage_1_4", title="Stage 3", stage_order=2, stage_size=8, scoring_mode="standard")
+    stage.matches = [PlayoffMatch(stage_id=7, group_number=1, game_number=game_number, state="in_progress")]
+    stage.participants = [
+        PlayoffParticipant(stage_id=7, user_id=index, seed=index, points=value, wins=0, top4_finishes=0, top8_finishes=0, last_place=8)
+        for index, value in enumerate(points, start=1)
+    ]
+    return stage
+
+
+def _forbid_ranking(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("standings must be read from the cache")
+
+    monkeypatch.setattr(standings_cache, "rank_group_members", fail)
+    monkeypatch.setattr(standings_cache, "rank_playoff_participants", fail)
+
+
+def test_apply_game_results_stores_group_order_read_by_views(monkeypatch) -> None:
+    group = TournamentGroup(id=1, name="Group A", lobby_password="1234", schedule_text="TBD", current_game=3)
+    members = _members()
+    group.members = members
+    db = MagicMock()
+    db.scalar = AsyncMock(side_effect=[group, None])
+    db.scalars = AsyncMock(return_value=_FakeScalarsResult(members))
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    asyncio.run(apply_game_results(db, group_id=1, ordered_user_ids=[5, 3, 1, 2, 4, 6, 7, 8]))
+    _forbid_ranking(monkeypatch)
+    rows = build_group_stage_standings([group])[1]
+
+    assert [row["user_id"] for row in rows] == [member.user_id for member in sort_members_for_table(members)]
+    assert [row["status"] for row in rows] == ["promoted"] * 3 + ["eliminated"] * 5
+    assert rows[0]["rank"] == 1 and rows[0]["is_tied"] is False
+
+
+def test_playoff_standings_mark_ties_and_statuses() -> None:
+    stage = _stage_with_participants([20, 15, 15, 15, 10, 5, 5, 0])
+
+    rows = build_playoff_standings([stage], user_by_id={})[0]["participants"]
+
+    assert [row["rank"] for row in rows] == [1, 2, 2, 2, 5, 6, 6, 8]
+    assert [row["is_tied"] for row in rows] == [False, True, True, True, False, True, True, False]
+    assert [row["status"] for row in rows] == ["promoted"] * 4 + ["eliminated"] * 4
+
+
+def test_view_fill_does_not_overwrite_fresh_result_write() -> None:
+    stage = _stage_with_participants([20, 15, 10, 5, 4, 3, 2, 1])
+    store_playoff_group_standings(stage, 1, stage.participants, stage.matches[0])
+    stale_view_participants = [
+        PlayoffParticipant(user_id=participant.user_id, seed=participant.seed, points=0, wins=0, top4_finishes=0, top8_finishes=0, last_place=8)
+        for participant in stage.participants
+    ]
+
+    standings = get_playoff_group_standings(stage, 1, stale_view_participants, stage.matches[0])
+
+    assert standings.user_ids == (1, 2, 3, 4, 5, 6, 7, 8)
+
+
+def test_changed_group_membership_is_recomputed() -> None:
+    group = TournamentGroup(id=3, current_game=1)
+    members = _members(group_id=3)
+    get_group_stage_standings(group, members, generation=standings_generation())
+
+    members[0].user_id = 42
+    members[0].total_points = 30
+
+    assert get_group_stage_standings(group, members).user_ids[0] == 42
+
+
+def test_point_adjustment_invalidates_only_its_group() -> None:
+    stage = _stage_with_participants([20, 15, 10, 5, 4, 3, 2, 1])
+    store_playoff_group_standings(stage, 1, stage.participants, stage.matches[0])
+    store_playoff_group_standings(stage, 2, [], None)
+    participant = stage.participants[-1]
+    db = MagicMock()
+    db.scalar = AsyncMock(return_value=participant)
+    db.commit = AsyncMock()
+
+    asyncio.run(adjust_stage_points(db, stage_id=7, user_id=participant.user_id, points_delta=50))
+
+    assert standings_cache.standings_cache.get(7, 2, set()) is not None
+    assert get_playoff_group_standings(stage, 1, stage.participants, stage.matches[0]).user_ids[0] == participant.user_id
+
+
+@pytest.mark.parametrize("with_generation", [True, False])
+def test_lookup_fills_cache_only_with_generation_snapshot(with_generation: bool) -> None:
+    stage = _stage_with_participants([20, 15, 10, 5, 4, 3, 2, 1])
+    generation = standings_generation() if with_generation else None
+
+    get_playoff_group_standings(stage, 1, stage.participants, stage.matches[0], generation=generation)
+
+    cached = standings_cache.standings_cache.get(7, 1, {participant.user_id for participant in stage.participants})
+    assert (cached is not None) is with_generation
+
+
+def test_view_rows_read_before_invalidation_are_not_cached() -> None:
+    stage = _stage_with_participants([20, 15, 10, 5, 4, 3, 2, 1])
+    generation = standings_generation()
+    # Пока страница читала строки, судья поправил очки — прочитанная таблица уже устарела.
+    standings_cache.invalidate_playoff_standings(7, 1)
+
+    get_playoff_group_standings(stage, 1, stage.participants, stage.matches[0], generation=generation)
+
+    assert standings_cache.standings_cache.get(7, 1, {participant.user_id for participant in stage.participants}) is None
+
+
+def test_promotion_ranks_fresh_rows_instead_of_cached_standings() -> None:
+    stage = _stage_with_participants([20, 15, 10, 5, 4, 3, 2, 1])
+    store_playoff_group_standings(stage, 1, stage.participants, stage.matches[0])
+    standings_cache.standings_cache.put_tie_breaks(7, {}, standings_generation())
+    # Те же игроки с другими очками: запись кэша их составу соответствует, но порядок в ней устарел.
+    fresh = [
+        PlayoffParticipant(stage_id=7, user_id=user_id, seed=user_id, points=user_id, wins=0, top4_finishes=0, top8_finishes=0, last_place=8)
+        for user_id in range(1, 9)
+    ]
+    next_stage = PlayoffStage(id=8, key="final", title="Final", stage_order=3, stage_size=8)
+    db = MagicMock()
+    db.scalar = AsyncMock(side_effect=[stage, next_stage])
+    db.scalars = AsyncMock(return_value=_FakeScalarsResult(fresh))
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    asyncio.run(promote_top_between_stages(db, stage_id=7, top_n=4))
+
+    promoted = [call.args[0].user_id for call in db.add.call_args_list]
+    assert promoted[:4] == [8, 7, 6, 5]
+
+
+def test_manual_tie_breaks_order_tied_players_and_resolve_ties() -> None:
+    stage = _stage_with_participants([20, 15, 15, 15, 10, 5, 5, 0])
+    standings_cache.standings_cache.put_tie_breaks(7, {1: {4: 1, 2: 2}}, standings_generation())
+
+    rows = build_playoff_standings([stage], user_by_id={})[0]["participants"]
+
+    assert [row["user_id"] for row in rows] == [1, 4, 2, 3, 5, 6, 7, 8]
+    assert [row["rank"] for row in rows] == [1, 2, 3, 4, 5, 6, 6, 8]
+    assert [row["is_tied"] for row in rows][:4] == [False] * 4
+
+
+def test_loading_tie_breaks_drops_standings_ranked_without_them() -> None:
+    stage = _stage_with_participants([20, 15, 15, 15, 10, 5, 5, 0])
+    generation = standings_generation()
+    assert get_playoff_group_standings(stage, 1, stage.participants, stage.matches[0], generation=generation).user_ids[1] == 2
+    db = MagicMock()
+    db.scalars = AsyncMock(
+        return_value=_FakeScalarsResult([PlayoffManualTieBreak(stage_id=7, group_number=1, user_id=3, priority=1)])
+    )
+
+    asyncio.run(load_stage_tie_breaks(db, 7))
+    asyncio.run(load_stage_tie_breaks(db, 7))
+
+    assert db.scalars.await_count == 1
+    assert get_playoff_group_standings(stage, 1, stage.participants, stage.matches[0]).user_ids[1] == 3
+
+
+def test_save_group_manual_tie_break_validates_members_and_reloads_priorities() -> None:
+    group = TournamentGroup(id=1, current_game=4)
+    members = _members()
+    standings_cache.standings_cache.put_tie_breaks(GROUP_STAGE_SCOPE, {}, standings_generation())
+    get_group_stage_standings(group, members, generation=standings_generation())
+    db = MagicMock()
+    db.scalar = AsyncMock(return_value=group)
+    db.scalars = AsyncMock(return_value=_FakeScalarsResult(members))
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    with pytest.raises(ValueError):
+        asyncio.run(save_group_manual_tie_break(db, 1, [3, 42]))
+    asyncio.run(save_group_manual_tie_break(db, 1, [3, 2]))
+
+    added = [call.args[0] for call in db.add.call_args_list]
+    assert [(row.user_id, row.priority) for row in added] == [(3, 1), (2, 2)]
+    assert all(isinstance(row, GroupManualTieBreak) for row in added)
+    assert standings_cache.standings_cache.tie_breaks(GROUP_STAGE_SCOPE) is None
+    assert standings_cache.standings_cache.get(GROUP_STAGE_SCOPE, 1, {member.user_id for member in members}) is None
+
+
+def test_rebuild_with_same_players_drops_standings_used_by_promotion() -> None:
+    stage = _stage_with_participants([1, 2, 3, 4, 5, 6, 7, 8])
+    store_playoff_group_standings(stage, 1, stage.participants, stage.matches[0])
+    db = MagicMock()
+    db.scalar = AsyncMock(side_effect=[stage, None])
+    db.scalars = AsyncMock(return_value=_FakeScalarsResult(stage.participants))
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    asyncio.run(
+        web.admin_emergency_rebuild_stage(
+            request=MagicMock(cookies={}), stage_id=7, user_ids="1,2,3,4,5,6,7,8", dry_run=False, confirm_final=False, db=db
+        )
+    )
+
+    # Пересобранный этап с тем же составом: счётчики обнулены, прежняя таблица 8..1 больше не верна.
+    rebuilt = [
+        PlayoffParticipant(stage_id=7, user_id=user_id, seed=user_id, points=0, wins=0, top4_finishes=0, top8_finishes=0, last_place=8)
+        for user_id in range(1, 9)
+    ]
+    next_stage = PlayoffStage(id=8, key="final", title="Final", stage_order=3, stage_size=8)
+    db = MagicMock()
+    db.scalar = AsyncMock(side_effect=[stage, next_stage])
+    db.scalars = AsyncMock(side_effect=[_FakeScalarsResult(rebuilt), _FakeScalarsResult([])])
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    asyncio.run(promote_top_between_stages(db, stage_id=7, top_n=4))
+
+    promoted = [call.args[0].user_id for call in db.add.call_args_list]
+    assert promoted[:4] == [1, 2, 3, 4]
@@ -24,6 +24,7 @@ class _FakeSession:
         self._members = members
         self._scalar_calls = 0
         self.added_results = []
+        self.executed = []
         self.committed = False
 
     async def scalar(self, _query):
@@ -40,6 +41,9 @@ class _FakeSession:
     def add(self, obj):
         self.added_results.append(obj)
 
+    async def execute(self, statement):
+        self.executed.append(statement)
+
     async def commit(self):
         self.committed = True
 
@@ -63,6 +67,9 @@ class TournamentPointsTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(points_by_place[1], 8)
         self.assertEqual(points_by_place[2], 6)
         self.assertEqual(points_by_place[8], 0)
+        self.assertEqual(members[0].total_points, 8)
+        self.assertEqual(len(session.executed), 1)
+        self.assertIn("FROM (VALUES", str(session.executed[0]))
 
     def test_apply_points_to_playoff_participant_standard_stage(self) -> None:
         """Проверяет позитивный сценарий `test_apply_points_to_playoff_participant_standard_stage`.